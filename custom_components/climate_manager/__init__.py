@@ -5,24 +5,44 @@ import os
 from pathlib import Path
 import asyncio
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+from homeassistant.helpers.start import async_at_started
 from homeassistant.config_entries import ConfigEntry as ConfigType
 
 from . import utils
 
 from .const import DOMAIN, PLATFORMS
 from .coordinator import ClimateManagerCoordinator
+from .storage import RuntimeStateStore
+from .websocket import async_register_websocket, async_rooms_changed
+
+DATA_CLIMATE_INDEX = "_climate_index"  # climate_entity -> entry_id
+DATA_GLOBAL_UNSUBS = "_global_unsubs"  # Rimozione dei listener di dominio (ultima entry scaricata)
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
   """Set up Climate Manager from yaml (not used)."""
   # Solo UI/config_flow
   
-  # Pulisci la vecchia installazione della card
-  await _cleanup_old_card_installation(hass)
-  
-  # Registra automaticamente la card Lovelace se esiste
-  await _register_lovelace_card_if_exists(hass)
+  # Servizi registrati una sola volta per dominio (non per ogni stanza)
+  _async_register_services(hass)
+
+  # Sottoscrizione websocket della card (stato compatto per stanza)
+  async_register_websocket(hass)
+
+  # File della card servito subito (varianti compresse costruite una volta sola)
+  await _register_card_static_path(hass)
+
+  # Card Lovelace: pulizia vecchia installazione e registrazione a Home Assistant avviato,
+  # quando lovelace ha già caricato le risorse (senza bloccare il setup)
+  async def _setup_lovelace_card(hass: HomeAssistant) -> None:
+    await _cleanup_old_card_installation(hass)
+    await _register_lovelace_card_if_exists(hass)
+
+  async_at_started(hass, _setup_lovelace_card)
   
   return True
 
@@ -42,14 +62,175 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     "coordinator": coordinator
   }
 
+  # Indice climate_entity -> entry_id per i servizi (registrati una sola volta in async_setup)
+  hass.data[DOMAIN].setdefault(DATA_CLIMATE_INDEX, {})[coordinator.climate_entity] = entry.entry_id
+
+  # Listener globali (azioni push, callback Telegram): uno solo per dominio, qualunque sia il numero di stanze
+  if DATA_GLOBAL_UNSUBS not in hass.data[DOMAIN]:
+    hass.data[DOMAIN][DATA_GLOBAL_UNSUBS] = _async_listen_global_events(hass)
+
+  # Stato runtime salvato prima del riavvio: applicato prima che le piattaforme aggiungano le entità
+  coordinator.apply_runtime_snapshot(await coordinator.runtime_store.async_load())
+
   await coordinator.async_config_entry_first_refresh()
 
   # NUOVA API multipiattaforma
   await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
   entry.async_on_unload(entry.add_update_listener(options_update_listener))
+  # Alla chiusura di HA le options in attesa vengono scritte prima del salvataggio finale
+  entry.async_on_unload(hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, coordinator.options_buffer.async_flush))
+
+  # Le card già iscritte ricevono lo snapshot con la nuova stanza
+  async_rooms_changed(hass)
+
+  return True
+
+
+
+CARD_URL = "/climate_manager/www/climate-manager-card.js"
+CARD_PATH = Path(__file__).parent / "www" / "climate-manager-card.js"
+
+
+async def _register_card_static_path(hass: HomeAssistant) -> None:
+  """Serve la card (gzip/br, ETag, cache immutabile per URL versionato) se il file esiste."""
+  try:
+    if hass.http is None or not CARD_PATH.exists():
+      return
+    await utils.async_register_static_path(hass, CARD_URL, CARD_PATH)
+  except Exception as e:
+    logging.getLogger(__name__).error(f"Errore registrazione percorso statico card: {e}")
+
+
+async def _register_lovelace_card_if_exists(hass: HomeAssistant) -> None:
+  """Registra automaticamente la card Lovelace se il file esiste."""
+  
+  try:
+    # Controlla se il file della card esiste
+    if not CARD_PATH.exists():
+      return
+    
+    # Add card to resources
+    version = getattr(hass.data["integrations"][DOMAIN], "version", 0)
+    await utils.init_resource(hass, CARD_URL, str(version))
+    
+    logging.getLogger(__name__).info(f"Climate Manager card registrata: {CARD_URL}")
+      
+  except Exception as e:
+    logging.getLogger(__name__).error(f"Errore registrazione risorsa Lovelace: {e}")
+    # Non interrompere il setup per errori di registrazione
+
+
+async def _cleanup_old_card_installation(hass: HomeAssistant) -> None:
+  """Rimuove la vecchia installazione della card da /config/www/ e pulisce le risorse."""
+  
+  try:
+    # Percorso del vecchio file nella cartella www globale
+    old_card_path = Path(hass.config.config_dir) / "www" / "climate-manager-card.js"
+    
+    # Se il vecchio file esiste, rimuovilo
+    if old_card_path.exists():
+      old_card_path.unlink()
+      logging.getLogger(__name__).info(f"Rimosso vecchio file card: {old_card_path}")
+    
+    # Pulisci le vecchie risorse Lovelace
+    try:
+      # Chiamata a Home Assistant avviato: lovelace è già caricato (se presente)
+      if "lovelace" in hass.data and hasattr(hass.data["lovelace"], "resources"):
+        resources = hass.data["lovelace"].resources
+        await resources.async_get_info()
+        
+        # Cerca e rimuovi le vecchie risorse
+        old_urls = [
+          "/local/climate-manager-card.js",
+          "/local/climate-manager-card.js?v=",
+        ]
+        
+        items_to_remove = []
+        for item in resources.async_items():
+          item_url = item.get("url", "")
+          for old_url in old_urls:
+            if item_url.startswith(old_url):
+              items_to_remove.append(item["id"])
+              break
+        
+        # Rimuovi le vecchie risorse
+        for item_id in items_to_remove:
+          await resources.async_delete_item(item_id)
+          logging.getLogger(__name__).info(f"Rimossa vecchia risorsa Lovelace: {item_id}")
+    
+    except Exception as e:
+      logging.getLogger(__name__).debug(f"Errore pulizia risorse Lovelace: {e}")
+      
+  except Exception as e:
+    logging.getLogger(__name__).debug(f"Errore pulizia vecchia installazione: {e}")
+
+
+async def options_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+  """Applica le options sul posto; reload completo solo per modifiche strutturali."""
+  if entry.state is not ConfigEntryState.LOADED:
+    # Scrittura delle options in attesa durante lo scaricamento/reload della entry
+    return
+  entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+  coordinator = entry_data.get("coordinator") if entry_data else None
+  if coordinator is None:
+    await hass.config_entries.async_reload(entry.entry_id)
+    return
+  # Le modifiche non ancora scritte restano valide, salvo le chiavi appena salvate da altri (es. options flow)
+  coordinator.options_buffer.async_discard_overwritten(entry.options)
+  options = coordinator.options_buffer.merged(entry.options)
+  if coordinator.needs_reload(options):
+    await hass.config_entries.async_reload(entry.entry_id)
+    return
+  await coordinator.async_set_options(options)
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+  """Unload a config entry."""
+  # Ultimo snapshot runtime prima che le entità fermino i loro timer (reload o riavvio)
+  entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+  if entry_data:
+    entry_data["coordinator"].options_buffer.async_flush()
+    await entry_data["coordinator"].runtime_store.async_flush()
+
+  unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+  if unloaded:
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+    
+    coordinator.remove_listeners()
+    coordinator.reconciler.cancel()
+    coordinator.commands.cancel()
+    coordinator._window_debouncer.cancel()
+    coordinator.notifier.cancel()
+    if coordinator._startup_task and not coordinator._startup_task.done():
+      coordinator._startup_task.cancel()
+    
+    hass.data[DOMAIN].pop(entry.entry_id)
+    climate_index = hass.data[DOMAIN].get(DATA_CLIMATE_INDEX, {})
+    if climate_index.get(coordinator.climate_entity) == entry.entry_id:
+      climate_index.pop(coordinator.climate_entity)
+
+    # Ultima stanza scaricata: rimuovi i listener di dominio
+    if not any(isinstance(d, dict) and "coordinator" in d for d in hass.data[DOMAIN].values()):
+      for unsub in hass.data[DOMAIN].pop(DATA_GLOBAL_UNSUBS, []):
+        unsub()
+
+    async_rooms_changed(hass)
 
-  # ---- REGISTRAZIONE SERVIZI CUSTOM ----
+  return unloaded
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+  """Rimuove lo stato runtime salvato della entry eliminata."""
+  await RuntimeStateStore(hass, entry.entry_id).async_remove()
+
+
+
+@callback
+def _async_register_services(hass: HomeAssistant) -> None:
+  """Registra i servizi climate_manager.* una sola volta per dominio."""
   async def _find_entry_id(call):
     # Permetti sia entity_id che entry_id
     entry_id = call.data.get("entry_id")
@@ -57,76 +238,113 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if entry_id:
       return entry_id
     if entity_id:
-      # entity_id -> entry_id
-      for eid, data in hass.data[DOMAIN].items():
-        # Salta le chiavi che non sono entry_id (es. _mobile_actions_processed)
-        if isinstance(data, dict) and "coordinator" in data:
-          coord = data["coordinator"]
-          if coord.climate_entity == entity_id:
-            return eid
+      # entity_id -> entry_id tramite l'indice mantenuto da setup/unload delle entry
+      entry_id = hass.data.get(DOMAIN, {}).get(DATA_CLIMATE_INDEX, {}).get(entity_id)
+      if entry_id:
+        return entry_id
     raise ValueError("entry_id o entity_id richiesto")
 
+  def _find_entry_ids(call):
+    """Stanze selezionate: entry_id ed entity_id (anche liste), area_id, device_id, label_id"""
+    domain_data = hass.data.get(DOMAIN, {})
+    entry_ids = []
+
+    def _add(entry_id):
+      data = domain_data.get(entry_id)
+      if isinstance(data, dict) and "coordinator" in data and entry_id not in entry_ids:
+        entry_ids.append(entry_id)
+
+    raw_entry_ids = call.data.get("entry_id")
+    for entry_id in [raw_entry_ids] if isinstance(raw_entry_ids, str) else (raw_entry_ids or []):
+      _add(entry_id)
+
+    if any(key in call.data for key in ("entity_id", "area_id", "device_id", "label_id")):
+      selected = async_extract_referenced_entity_ids(hass, call)
+      climate_index = domain_data.get(DATA_CLIMATE_INDEX, {})
+      registry = er.async_get(hass)
+      for entity_id in sorted(selected.referenced | selected.indirectly_referenced):
+        entry_id = climate_index.get(entity_id)
+        if entry_id is None:
+          # Entità della stanza stessa (switch, sensori...) -> la sua config entry
+          registry_entry = registry.async_get(entity_id)
+          if registry_entry and registry_entry.platform == DOMAIN:
+            entry_id = registry_entry.config_entry_id
+        _add(entry_id)
+
+    if not entry_ids:
+      raise ValueError("entry_id, entity_id, area_id o label_id richiesto")
+    return entry_ids
+
+  def _room_updates(call, entry_id, keys):
+    """Valori per la stanza: scalare uguale per tutte o mappa {climate_entity | entry_id: valore}"""
+    coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
+    updates = {}
+    for key in keys:
+      if key not in call.data:
+        continue
+      value = call.data[key]
+      if isinstance(value, dict):
+        value = value.get(coordinator.climate_entity, value.get(entry_id))
+      if value is not None:
+        updates[key] = value
+    return updates
+
+  async def _update_options_many(updates_by_entry):
+    """Una sola scrittura delle options per stanza; le stanze vengono aggiornate in parallelo"""
+    pending = {entry_id: updates for entry_id, updates in updates_by_entry.items() if updates}
+    results = await asyncio.gather(
+      *(_update_options(entry_id, updates) for entry_id, updates in pending.items()),
+      return_exceptions=True,
+    )
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors and len(errors) == len(results):
+      raise errors[0]
+    for entry_id, result in zip(pending, results):
+      if isinstance(result, Exception):
+        logging.getLogger(__name__).error(f"Climate Manager: errore aggiornamento options {entry_id}: {result}")
+    return [entry_id for entry_id, result in zip(pending, results) if not isinstance(result, Exception)]
+
+  async def _handle_bulk_options(call, keys):
+    entry_ids = _find_entry_ids(call)
+    return await _update_options_many({entry_id: _room_updates(call, entry_id, keys) for entry_id in entry_ids})
+
   async def _update_options(entry_id, updates):
     entry = next((e for e in hass.config_entries.async_entries(DOMAIN) if e.entry_id == entry_id), None)
     if not entry:
       raise ValueError(f"Config entry {entry_id} non trovata")
-    # Crea una copia mutabile delle opzioni
-    new_options = dict(entry.options) if entry.options else {}
-    new_options.update(updates)
-    hass.config_entries.async_update_entry(entry, options=new_options)
-    # Aggiorna anche il coordinator live
+    # Coordinator live aggiornato subito; la config entry viene scritta in modo accorpato
     coord = hass.data[DOMAIN][entry_id]["coordinator"]
+    new_options = coord.options_buffer.async_update(updates)
     await coord.async_set_options(new_options)
-    # Sincronizza con il sensore settings corrente per avere sempre i valori aggiornati
-    await coord.refresh_settings_from_sensor()
 
   # --- set_season ---
   async def handle_set_season(call):
-    entry_id = await _find_entry_id(call)
-    season = call.data["season"]
-    await _update_options(entry_id, {"season": season})
-    await hass.data[DOMAIN][entry_id]["coordinator"]._update_season()
+    updated = await _handle_bulk_options(call, ["season"])
+    await asyncio.gather(*(hass.data[DOMAIN][entry_id]["coordinator"]._update_season() for entry_id in updated))
 
   hass.services.async_register(DOMAIN, "set_season", handle_set_season)
 
   # --- set_timer ---
   async def handle_set_timer(call):
-    entry_id = await _find_entry_id(call)
-    updates = {}
-    for k in ["timeout", "delay_before_off", "delay_before_on"]:
-      if k in call.data:
-        updates[k] = call.data[k]
-    await _update_options(entry_id, updates)
+    await _handle_bulk_options(call, ["timeout", "delay_before_off", "delay_before_on"])
 
   hass.services.async_register(DOMAIN, "set_timer", handle_set_timer)
 
   # --- set_fan_mode ---
   async def handle_set_fan_mode(call):
-    entry_id = await _find_entry_id(call)
-    for season in ["summer", "winter"]:
-      key = f"fan_mode_{season}"
-      if key in call.data:
-        await _update_options(entry_id, {key: call.data[key]})
+    await _handle_bulk_options(call, ["fan_mode_summer", "fan_mode_winter"])
 
   hass.services.async_register(DOMAIN, "set_fan_mode", handle_set_fan_mode)
 
   # --- set_temperature ---
   async def handle_set_temperature(call):
-    entry_id = await _find_entry_id(call)
-    for season in ["summer", "winter"]:
-      key = f"temperature_{season}"
-      if key in call.data:
-        await _update_options(entry_id, {key: call.data[key]})
+    await _handle_bulk_options(call, ["temperature_summer", "temperature_winter"])
 
   hass.services.async_register(DOMAIN, "set_temperature", handle_set_temperature)
 
   # --- set_hvac_mode ---
   async def handle_set_hvac_mode(call):
-    entry_id = await _find_entry_id(call)
-    for season in ["summer", "winter"]:
-      key = f"hvac_mode_{season}"
-      if key in call.data:
-        await _update_options(entry_id, {key: call.data[key]})
+    await _handle_bulk_options(call, ["hvac_mode_summer", "hvac_mode_winter"])
 
   hass.services.async_register(DOMAIN, "set_hvac_mode", handle_set_hvac_mode)
 
@@ -137,11 +355,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     channel = call.data["channel"]    # "alexa" o "push"
     value = call.data["value"]        # True/False
     key = f"enable_msgs_{channel}"
-    entry = next((e for e in hass.config_entries.async_entries(DOMAIN) if e.entry_id == entry_id), None)
-    # Crea una copia mutabile delle opzioni
-    options = dict(entry.options) if entry.options else {}
-    # Ottieni il valore esistente, gestendo il caso di set errato
-    existing_value = options.get(key, {})
+    # Valore live del coordinator: include le modifiche non ancora scritte nella config entry
+    existing_value = hass.data[DOMAIN][entry_id]["coordinator"].get_option(key, {})
     if isinstance(existing_value, set):
         # Se è un set, inizializza con dizionario vuoto
         d = {}
@@ -238,108 +453,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
   hass.services.async_register(DOMAIN, "disable_automations", handle_disable_automations)
 
-  # --- GESTORE EVENTI NOTIFICHE INTERATTIVE ---
-  async def handle_mobile_app_notification_action(event):
-    """Gestisce le azioni delle notifiche interattive dall'app mobile"""
-    action = event.data.get("action", "")
-    
-    # Log per debug
-    logging.getLogger(__name__).info(f"Climate Manager: Ricevuta azione notifica: {action}, event data: {event.data}")
-    
-    # PROTEZIONE CONTRO EVENTI DUPLICATI
-    action_key = f"{action}_{event.data.get('actionData', {}).get('entity_id', 'unknown')}"
-    if '_mobile_actions_processed' not in hass.data[DOMAIN]:
-      hass.data[DOMAIN]['_mobile_actions_processed'] = {}
-    
-    import time
-    current_time = time.time()
-    
-    # Se la stessa azione è stata processata negli ultimi 2 secondi, ignora
-    if action_key in hass.data[DOMAIN]['_mobile_actions_processed']:
-      last_processed = hass.data[DOMAIN]['_mobile_actions_processed'][action_key]
-      if current_time - last_processed < 2.0:  # 2 secondi di debounce
-        logging.getLogger(__name__).info(f"Climate Manager: Azione già processata di recente, ignoro: {action_key}")
-        return
-    
-    # Marca questa azione come processata
-    hass.data[DOMAIN]['_mobile_actions_processed'][action_key] = current_time
-    
-    # Pulizia periodica delle azioni vecchie (mantieni solo gli ultimi 10 secondi)
-    keys_to_remove = []
-    for key, timestamp in hass.data[DOMAIN]['_mobile_actions_processed'].items():
-      if current_time - timestamp > 10.0:
-        keys_to_remove.append(key)
-    for key in keys_to_remove:
-      del hass.data[DOMAIN]['_mobile_actions_processed'][key]
-    
-    if action.startswith("TURN_OFF_CLIMATE_"):
-      entry_id = action.replace("TURN_OFF_CLIMATE_", "")
-      if entry_id in hass.data[DOMAIN]:
-        coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
-        try:
-          # Spegni il clima
-          await hass.services.async_call(
-            'climate', 'set_hvac_mode', 
-            {'entity_id': coordinator.climate_entity, 'hvac_mode': 'off'}
-          )
-          
-          # Ferma il timer di notifica
-          timer_sensor = await coordinator._get_timer_on_notification_sensor()
-          if timer_sensor:
-            await timer_sensor.stop_timer()
-          
-          # Invia notifica di conferma SOLO UNA VOLTA
-          room_name = coordinator.get_option("room_name", "Stanza")
-          
-          # Traduci il messaggio di conferma
-          lang = (coordinator.options.get("lingua") or 
-                 coordinator.config.get("lingua", "it"))
-          if lang == "en":
-            confirm_msg = f"✅ Climate turned off in {room_name}"
-          else:
-            confirm_msg = f"✅ Clima spento in {room_name}"
-          
-          await coordinator._notify_push_only(confirm_msg, "timer_action_confirm")
-          
-        except Exception as e:
-          logging.getLogger(__name__).error(f"Errore spegnimento clima da notifica: {e}")
-    
-    elif action.startswith("IGNORE_CLIMATE_"):
-      entry_id = action.replace("IGNORE_CLIMATE_", "")
-      if entry_id in hass.data[DOMAIN]:
-        coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
-        try:
-          # Ferma il timer di notifica per evitare spam
-          timer_sensor = await coordinator._get_timer_on_notification_sensor()
-          if timer_sensor:
-            await timer_sensor.stop_timer()
-          
-          # Invia notifica di conferma SOLO UNA VOLTA
-          room_name = coordinator.get_option("room_name", "Stanza")
-          
-          # Traduci il messaggio di conferma
-          lang = (coordinator.options.get("lingua") or 
-                 coordinator.config.get("lingua", "it"))
-          if lang == "en":
-            confirm_msg = f"ℹ️ Climate left on in {room_name}"
-          else:
-            confirm_msg = f"ℹ️ Clima lasciato acceso in {room_name}"
-          
-          await coordinator._notify_push_only(confirm_msg, "timer_action_confirm")
-          
-        except Exception as e:
-          logging.getLogger(__name__).error(f"Errore gestione ignore clima da notifica: {e}")
-    else:
-      # Log per debug se l'azione non è riconosciuta
-      logging.getLogger(__name__).warning(f"Climate Manager: Azione non riconosciuta: {action}")
 
-  # Registra UN SOLO listener generico per tutte le notifiche mobile
-  hass.bus.async_listen("mobile_app_notification_action", handle_mobile_app_notification_action)
-  
-  # RIMOSSI i listener duplicati per evitare eventi multipli:
-  # hass.bus.async_listen("ios.notification_action_fired", handle_mobile_app_notification_action) 
-  # hass.bus.async_listen("android.notification_action_fired", handle_mobile_app_notification_action)
-  
+@callback
+def _async_listen_global_events(hass: HomeAssistant) -> list:
+  """Listener di dominio per i callback Telegram. Ritorna le funzioni di rimozione."""
+  # Le azioni push (mobile_app_notification_action) arrivano a ogni stanza tramite il dispatcher
+  # di dominio (vedi ClimateManagerCoordinator._handle_notification_action): nessun listener qui
+  unsubs = []
+
   # --- GESTORE CALLBACK TELEGRAM ---
   async def handle_telegram_callback(event):
     """Gestisce i callback di Telegram per le notifiche interattive"""
@@ -382,10 +503,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
               pass
           
           # Spegni il clima
-          await hass.services.async_call(
-            'climate', 'set_hvac_mode', 
-            {'entity_id': coordinator.climate_entity, 'hvac_mode': 'off'}
-          )
+          await coordinator.commands.async_turn_off()
           
           # Ferma il timer di notifica
           timer_sensor = await coordinator._get_timer_on_notification_sensor()
@@ -431,108 +549,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
           logging.getLogger(__name__).error(f"Errore gestione ignore clima da Telegram: {e}")
 
   # Registra il listener per i callback di Telegram
-  hass.bus.async_listen("telegram_callback", handle_telegram_callback)
-
-  return True
-
-
-
-async def _register_lovelace_card_if_exists(hass: HomeAssistant) -> None:
-  """Registra automaticamente la card Lovelace se il file esiste."""
-  
-  try:
-    # 1. Serve lovelace card
-    path = Path(__file__).parent / "www"
-    
-    # Controlla se il file della card esiste
-    if not (path / "climate-manager-card.js").exists():
-      return
-      
-    utils.register_static_path(
-      hass.http.app,
-      "/climate_manager/www/climate-manager-card.js",
-      path / "climate-manager-card.js",
-    )
-    
-    # 2. Add card to resources
-    version = getattr(hass.data["integrations"][DOMAIN], "version", 0)
-    await utils.init_resource(
-      hass, "/climate_manager/www/climate-manager-card.js", str(version)
-    )
-    
-    logging.getLogger(__name__).info(f"Climate Manager card registrata: /climate_manager/www/climate-manager-card.js")
-      
-  except Exception as e:
-    logging.getLogger(__name__).error(f"Errore registrazione risorsa Lovelace: {e}")
-    # Non interrompere il setup per errori di registrazione
-
-
-async def _cleanup_old_card_installation(hass: HomeAssistant) -> None:
-  """Rimuove la vecchia installazione della card da /config/www/ e pulisce le risorse."""
-  
-  try:
-    # Percorso del vecchio file nella cartella www globale
-    old_card_path = Path(hass.config.config_dir) / "www" / "climate-manager-card.js"
-    
-    # Se il vecchio file esiste, rimuovilo
-    if old_card_path.exists():
-      old_card_path.unlink()
-      logging.getLogger(__name__).info(f"Rimosso vecchio file card: {old_card_path}")
-    
-    # Pulisci le vecchie risorse Lovelace
-    try:
-      # Attendi che lovelace sia caricato
-      for _ in range(5):
-        try:
-          resources = hass.data["lovelace"].resources
-          break
-        except (KeyError, AttributeError):
-          await asyncio.sleep(1)
-      
-      if "lovelace" in hass.data and hasattr(hass.data["lovelace"], "resources"):
-        resources = hass.data["lovelace"].resources
-        await resources.async_get_info()
-        
-        # Cerca e rimuovi le vecchie risorse
-        old_urls = [
-          "/local/climate-manager-card.js",
-          "/local/climate-manager-card.js?v=",
-        ]
-        
-        items_to_remove = []
-        for item in resources.async_items():
-          item_url = item.get("url", "")
-          for old_url in old_urls:
-            if item_url.startswith(old_url):
-              items_to_remove.append(item["id"])
-              break
-        
-        # Rimuovi le vecchie risorse
-        for item_id in items_to_remove:
-          await resources.async_delete_item(item_id)
-          logging.getLogger(__name__).info(f"Rimossa vecchia risorsa Lovelace: {item_id}")
-    
-    except Exception as e:
-      logging.getLogger(__name__).debug(f"Errore pulizia risorse Lovelace: {e}")
-      
-  except Exception as e:
-    logging.getLogger(__name__).debug(f"Errore pulizia vecchia installazione: {e}")
-
-
-async def options_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-  await hass.config_entries.async_reload(entry.entry_id)
-
-
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-  """Unload a config entry."""
-  unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+  unsubs.append(hass.bus.async_listen("telegram_callback", handle_telegram_callback))
 
-  if unloaded:
-    data = hass.data[DOMAIN][entry.entry_id]
-    coordinator = data["coordinator"]
-    
-    coordinator.remove_listeners()
-    
-    hass.data[DOMAIN].pop(entry.entry_id)
-
-  return unloaded
+  return unsubs
@@ -0,0 +1,336 @@
+"""Coda comandi per le entità climate gestite da Climate Manager."""
+import asyncio
+import logging
+import random
+
+from homeassistant.core import HomeAssistant
+
+from .const import DEFAULT_COMMAND_MIN_INTERVAL
+from .utils import async_wait_for_state
+
+_LOGGER = logging.getLogger(__name__)
+
+# Ordine di invio: la modalità prima di tutto, perché molti dispositivi
+# resettano temperatura e ventola al cambio modalità
+COMMAND_FIELDS = ("hvac_mode", "temperature", "fan_mode", "preset_mode")
+DEFAULT_CALL_TIMEOUT = 10.0
+DEFAULT_SETTLE_TIMEOUT = 5.0
+TEMPERATURE_TOLERANCE = 0.05
+# Tolleranza usata per considerare raggiunta la temperatura desiderata
+RECONCILE_TEMPERATURE_TOLERANCE = 0.5
+INACTIVE_STATES = ("off", "unknown", "unavailable")
+
+
+class ClimateCommandQueue:
+    """Pipeline dei comandi verso una singola climate entity.
+
+    Le richieste vengono unite in un unico target: per ogni campo vale l'ultimo
+    valore richiesto, quelli superati non vengono mai inviati. Vengono spediti
+    solo i campi diversi dallo stato attuale, rispettando una spaziatura minima
+    tra due chiamate allo stesso dispositivo.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_id: str,
+        min_interval: float = DEFAULT_COMMAND_MIN_INTERVAL,
+        call_timeout: float = DEFAULT_CALL_TIMEOUT,
+        name: str | None = None,
+    ):
+        self._hass = hass
+        self.entity_id = entity_id
+        self.min_interval = min_interval
+        self.call_timeout = call_timeout
+        self._name = name or entity_id
+        self._pending: dict = {}
+        self._waiters: list[asyncio.Future] = []
+        self._worker: asyncio.Task | None = None
+        self._last_sent = 0.0
+        self.last_off_request = 0.0
+        self.sent_commands = 0
+        self.dropped_commands = 0
+
+    async def async_apply(self, hvac_mode=None, temperature=None, fan_mode=None, preset_mode=None) -> bool:
+        """Unisce i valori richiesti al target pendente e attende il loro invio.
+
+        I campi a None non vengono toccati. Ritorna False se almeno un comando è fallito.
+        """
+        requested = {
+            "hvac_mode": hvac_mode,
+            "temperature": float(temperature) if temperature is not None else None,
+            "fan_mode": fan_mode,
+            "preset_mode": preset_mode,
+        }
+        requested = {k: v for k, v in requested.items() if v is not None}
+        if not requested:
+            return True
+        if requested.get("hvac_mode") == "off":
+            # Lo spegnimento annulla qualunque altra impostazione ancora in coda
+            self.last_off_request = self._hass.loop.time()
+            self.dropped_commands += len(self._pending)
+            self._pending = {}
+            requested = {"hvac_mode": "off"}
+        else:
+            self.dropped_commands += sum(1 for k in requested if k in self._pending)
+        self._pending.update(requested)
+
+        future = self._hass.loop.create_future()
+        self._waiters.append(future)
+        if self._worker is None or self._worker.done():
+            self._worker = self._hass.async_create_task(self._async_drain())
+        return await future
+
+    async def async_turn_off(self) -> bool:
+        """Spegne il clima (turn_off con fallback su set_hvac_mode off)."""
+        return await self.async_apply(hvac_mode="off")
+
+    def cancel(self):
+        """Scarta i comandi in coda e ferma il worker."""
+        self._pending = {}
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
+        for future in self._waiters:
+            if not future.done():
+                future.set_result(False)
+        self._waiters = []
+
+    async def _async_drain(self):
+        """Invia i target pendenti finché la coda non è vuota."""
+        while self._pending:
+            target, self._pending = self._pending, {}
+            waiters, self._waiters = self._waiters, []
+            ok = False
+            try:
+                ok = await self._async_send(target)
+            except Exception as e:
+                _LOGGER.error(f"[{self._name}] ❌ Errore invio comandi clima: {e}")
+            finally:
+                # Anche se il worker viene annullato (cancel() allo scaricamento) chi attende riceve un esito
+                for future in waiters:
+                    if not future.done():
+                        future.set_result(ok)
+
+    async def _async_send(self, target: dict) -> bool:
+        """Invia solo i campi del target diversi dallo stato attuale."""
+        ok = True
+        hvac_changed = False
+        for field in COMMAND_FIELDS:
+            if field not in target:
+                continue
+            if field in self._pending:
+                # Superato da una richiesta arrivata nel frattempo: lo invierà il prossimo giro
+                continue
+            if hvac_changed is None:
+                # Clima spento: le altre impostazioni non vanno inviate
+                break
+            value = target[field]
+            state = self._hass.states.get(self.entity_id)
+            # La temperatura va sempre re-inviata dopo un cambio modalità (reset silenzioso)
+            if not (field == "temperature" and hvac_changed) and self._matches(state, field, value):
+                continue
+            await self._async_wait_spacing()
+            if field in self._pending:
+                continue
+            sent = await self._async_call(field, value)
+            ok = ok and sent
+            if field == "hvac_mode":
+                if value == "off":
+                    hvac_changed = None
+                    continue
+                hvac_changed = True
+                if sent:
+                    # Attende che il dispositivo confermi la modalità prima di proseguire
+                    await async_wait_for_state(
+                        self._hass, self.entity_id, lambda s: s.state == value, DEFAULT_SETTLE_TIMEOUT
+                    )
+        return ok
+
+    @staticmethod
+    def _matches(state, field, value) -> bool:
+        if state is None:
+            return False
+        if field == "hvac_mode":
+            return state.state == value
+        current = state.attributes.get(field)
+        if field == "temperature":
+            try:
+                return current is not None and abs(float(current) - float(value)) < TEMPERATURE_TOLERANCE
+            except (TypeError, ValueError):
+                return False
+        return current == value
+
+    async def _async_wait_spacing(self):
+        delay = self._last_sent + self.min_interval - self._hass.loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _async_call(self, field, value) -> bool:
+        data = {"entity_id": self.entity_id}
+        try:
+            if field == "hvac_mode" and value == "off":
+                try:
+                    await self._async_service("turn_off", data)
+                except Exception:
+                    await self._async_service("set_hvac_mode", {**data, "hvac_mode": "off"})
+            else:
+                await self._async_service(f"set_{field}", {**data, field: value})
+            _LOGGER.debug(f"[{self._name}] 📤 {field} → {value}")
+            return True
+        except Exception as e:
+            _LOGGER.warning(f"[{self._name}] ⚠️ Comando {field}={value} non riuscito: {e}")
+            return False
+
+    async def _async_service(self, service, data):
+        self._last_sent = self._hass.loop.time()
+        self.sent_commands += 1
+        await asyncio.wait_for(
+            self._hass.services.async_call("climate", service, data, blocking=True),
+            self.call_timeout,
+        )
+
+
+class ClimateReconciler:
+    """Fa convergere il clima verso un unico stato desiderato (hvac, temp, fan, preset).
+
+    Esiste un solo ciclo di convergenza per dispositivo: un nuovo target annulla il
+    precedente. La verifica è guidata dagli eventi di stato del clima; le correzioni
+    passano dalla coda comandi con backoff esponenziale e jitter.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        commands: ClimateCommandQueue,
+        name: str | None = None,
+        initial_delay: float = 2.0,
+        max_delay: float = 30.0,
+        max_duration: float = 120.0,
+    ):
+        self._hass = hass
+        self._commands = commands
+        self._name = name or commands.entity_id
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_duration = max_duration
+        self._desired = None
+        self._task: asyncio.Task | None = None
+        self.corrections = 0
+
+    @property
+    def desired(self):
+        return self._desired
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def set_target(self, hvac_mode, temperature=None, fan_mode=None, preset_mode=None) -> asyncio.Task:
+        """Imposta lo stato desiderato e avvia la convergenza (senza attenderla).
+
+        Se è già in corso una convergenza verso lo stesso target viene riutilizzata.
+        """
+        desired = self._normalize(hvac_mode, temperature, fan_mode, preset_mode)
+        if self.is_running:
+            if desired == self._desired:
+                return self._task
+            _LOGGER.debug(f"[{self._name}] 🔁 Nuovo target, riconciliazione precedente annullata")
+            self._task.cancel()
+        self._desired = desired
+        self._task = self._hass.async_create_task(self._async_run(desired))
+        return self._task
+
+    def is_targeting(self, hvac_mode, temperature=None, fan_mode=None, preset_mode=None) -> bool:
+        """True se è in corso una convergenza verso esattamente questo target."""
+        return self.is_running and self._desired == self._normalize(hvac_mode, temperature, fan_mode, preset_mode)
+
+    @staticmethod
+    def _normalize(hvac_mode, temperature, fan_mode, preset_mode) -> dict:
+        return {
+            "hvac_mode": hvac_mode,
+            "temperature": float(temperature) if temperature is not None else None,
+            "fan_mode": fan_mode,
+            "preset_mode": preset_mode,
+        }
+
+    async def async_reconcile(self, hvac_mode, temperature=None, fan_mode=None, preset_mode=None):
+        """Imposta il target e attende la convergenza.
+
+        Ritorna True se raggiunto, False se non raggiunto entro max_duration,
+        None se superato da un nuovo target o da uno spegnimento.
+        """
+        task = self.set_target(hvac_mode, temperature, fan_mode, preset_mode)
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return None
+            raise
+
+    def cancel(self):
+        """Annulla la convergenza in corso."""
+        if self.is_running:
+            self._task.cancel()
+        self._task = None
+        self._desired = None
+
+    def mismatches(self, state, desired=None) -> set:
+        """Campi del target non ancora rispettati (quelli non supportati dal dispositivo sono ignorati)."""
+        desired = desired or self._desired or {}
+        if state is None or state.state in ("unknown", "unavailable"):
+            return {"hvac_mode"}
+        attrs = state.attributes
+        wrong = set()
+        if desired.get("hvac_mode") is not None and state.state != desired["hvac_mode"]:
+            wrong.add("hvac_mode")
+        if desired.get("hvac_mode") == "off":
+            return wrong
+        temperature = desired.get("temperature")
+        current = attrs.get("temperature")
+        # Se il dispositivo non riporta la temperatura (es. dry/fan_only) la si considera corretta
+        if temperature is not None and current is not None:
+            try:
+                if abs(float(current) - temperature) >= RECONCILE_TEMPERATURE_TOLERANCE:
+                    wrong.add("temperature")
+            except (TypeError, ValueError):
+                wrong.add("temperature")
+        if desired.get("fan_mode") is not None and attrs.get("fan_modes") and attrs.get("fan_mode") != desired["fan_mode"]:
+            wrong.add("fan_mode")
+        if desired.get("preset_mode") is not None and attrs.get("preset_modes") and attrs.get("preset_mode") != desired["preset_mode"]:
+            wrong.add("preset_mode")
+        return wrong
+
+    async def _async_run(self, desired) -> bool | None:
+        loop = self._hass.loop
+        started = loop.time()
+        deadline = started + self.max_duration
+        delay = self.initial_delay
+        entity_id = self._commands.entity_id
+        attempt = 0
+
+        while True:
+            # Attende (senza polling) che lo stato converga, al massimo per il backoff corrente
+            wait = max(0.0, min(delay * random.uniform(0.8, 1.2), deadline - loop.time()))
+            if await async_wait_for_state(self._hass, entity_id, lambda s: not self.mismatches(s, desired), wait):
+                _LOGGER.info(f"[{self._name}] ✅ Impostazioni clima verificate (correzioni: {attempt})")
+                return True
+            if self._commands.last_off_request > started:
+                # Spegnimento richiesto dopo il target: non c'è più nulla da far convergere
+                _LOGGER.debug(f"[{self._name}] ⏹️ Clima spento, riconciliazione interrotta")
+                return None
+            if loop.time() >= deadline:
+                state = self._hass.states.get(entity_id)
+                _LOGGER.error(f"[{self._name}] ❌ Impostazioni clima non applicate dopo {attempt} correzioni: {sorted(self.mismatches(state, desired))}")
+                return False
+
+            state = self._hass.states.get(entity_id)
+            if state is None or state.state in INACTIVE_STATES:
+                _LOGGER.warning(f"[{self._name}] Clima non attivo durante la verifica, attendo")
+            else:
+                wrong = self.mismatches(state, desired)
+                attempt += 1
+                self.corrections += 1
+                _LOGGER.warning(f"[{self._name}] Impostazioni clima non corrette (correzione {attempt}): {sorted(wrong)}")
+                await self._commands.async_apply(**{field: desired[field] for field in wrong})
+            delay = min(delay * 2, self.max_delay)
@@ -36,8 +36,18 @@ from .const import (
   CONF_TIMER_ON_NOTIFICATION_MINUTES,
   CONF_TIMER_OFF_HVAC_MODE_SELECTOR,
   CONF_TIMER_OFF_FAN_MODE_SELECTOR,
+  CONF_COMMAND_MIN_INTERVAL,
+  CONF_WINDOW_MIN_OPEN,
+  CONF_WINDOW_MIN_CLOSED,
+  CONF_TEMP_DEADBAND,
+  CONF_TEMP_MIN_DWELL,
+  CONF_TEMP_SMOOTHING,
+  CONF_NOTIFY_AGGREGATION_WINDOW,
+  DEFAULT_COMMAND_MIN_INTERVAL,
+  DEFAULT_NOTIFY_AGGREGATION_WINDOW,
   ALEXA_MESSAGES,
 )
+from .messages import unknown_placeholders
 
 # === GESTIONE MODELLI/TEMPLATE ===
 TEMPLATES_STORAGE_KEY = "climate_manager_templates"
@@ -200,6 +210,15 @@ def _convert_push_targets_to_list(push_targets_str):
   _LOGGER.debug(f"_convert_push_targets_to_list: {push_targets_str} -> {targets}")
   return targets
 
+def _validate_messages(user_input, messages):
+  """Errori per i messaggi che contengono segnaposto non supportati ({{...}})"""
+  errors = {}
+  for k in messages:
+    text = user_input.get(f"msg_{k}")
+    if isinstance(text, str) and unknown_placeholders(text):
+      errors[f"msg_{k}"] = "unknown_placeholder"
+  return errors
+
 def _convert_list_to_push_targets(targets_list):
   """Converte la lista dal selettore in stringa push_targets"""
   if not targets_list:
@@ -544,6 +563,8 @@ class ClimateManagerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     })
 
     if user_input is not None:
+      errors = _validate_messages(user_input, messages)
+    if user_input is not None and not errors:
       # Controlla se l'utente vuole salvare come modello
       save_as_template = user_input.pop("save_as_template", False)
       template_name = user_input.pop("template_name_save", "")
@@ -616,6 +637,9 @@ class ClimateManagerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         data=user_input
       )
 
+    if errors:
+      # Ripresenta il form con i valori inseriti dall'utente
+      data_schema = self.add_suggested_values_to_schema(data_schema, user_input)
     return self.async_show_form(step_id="options", data_schema=data_schema, errors=errors)
 
   # ---- importa da YAML (non usato) ----
@@ -637,6 +661,11 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     super().__init__()
 
   async def async_step_init(self, user_input=None):
+    if user_input is None:
+      # Scrive subito le modifiche in attesa (select, number, servizi) così il form mostra i valori attuali
+      entry_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+      if isinstance(entry_data, dict) and "coordinator" in entry_data:
+        entry_data["coordinator"].options_buffer.async_flush()
     options = {**self.config_entry.data, **self.config_entry.options}
     lang = options.get("lingua", getattr(self.hass.config, "language", "en")[:2])
     messages = ALEXA_MESSAGES.get(lang, ALEXA_MESSAGES["en"])
@@ -714,6 +743,10 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
       (vol.Required(CONF_DELAY_BEFORE_OFF, description={"translation_key": "delay_before_off"}, default=options.get(CONF_DELAY_BEFORE_OFF, 120)), NumberSelector(NumberSelectorConfig(min=0, max=86400, step=1, unit_of_measurement="s"))),
       (vol.Required(CONF_DELAY_BEFORE_ON, description={"translation_key": "delay_before_on"}, default=options.get(CONF_DELAY_BEFORE_ON, 10)), NumberSelector(NumberSelectorConfig(min=10, max=86400, step=1, unit_of_measurement="s"))),
       (vol.Optional(CONF_TIMER_ON_NOTIFICATION_MINUTES, description={"translation_key": "timer_on_notification_minutes"}, default=options.get(CONF_TIMER_ON_NOTIFICATION_MINUTES, 0)), NumberSelector(NumberSelectorConfig(min=0, max=1440, step=1, unit_of_measurement="min"))),
+      (vol.Optional(CONF_COMMAND_MIN_INTERVAL, description={"translation_key": "command_min_interval"}, default=options.get(CONF_COMMAND_MIN_INTERVAL, DEFAULT_COMMAND_MIN_INTERVAL)), NumberSelector(NumberSelectorConfig(min=0, max=10, step=0.1, unit_of_measurement="s"))),
+      (vol.Optional(CONF_NOTIFY_AGGREGATION_WINDOW, description={"translation_key": "notification_aggregation_window"}, default=options.get(CONF_NOTIFY_AGGREGATION_WINDOW, DEFAULT_NOTIFY_AGGREGATION_WINDOW)), NumberSelector(NumberSelectorConfig(min=0, max=10, step=0.5, unit_of_measurement="s"))),
+      (vol.Optional(CONF_WINDOW_MIN_OPEN, description={"translation_key": "window_min_open_seconds"}, default=options.get(CONF_WINDOW_MIN_OPEN, 0)), NumberSelector(NumberSelectorConfig(min=0, max=600, step=1, unit_of_measurement="s"))),
+      (vol.Optional(CONF_WINDOW_MIN_CLOSED, description={"translation_key": "window_min_closed_seconds"}, default=options.get(CONF_WINDOW_MIN_CLOSED, 0)), NumberSelector(NumberSelectorConfig(min=0, max=600, step=1, unit_of_measurement="s"))),
 
       # === MODALITÀ STAGIONALI ===
       (vol.Required(CONF_SEASON, description={"translation_key": "season"}, default=options.get(CONF_SEASON, "auto")), dropdown(["auto", "summer", "winter"])),
@@ -727,6 +760,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
       (vol.Required("temperature_winter", description={"translation_key": "temperature_winter"}, default=options.get("temperature_winter", 21)), NumberSelector(NumberSelectorConfig(min=17, max=30, step=1, unit_of_measurement="°C"))),
       (vol.Required(SUMMER_TEMP_THRESHOLD, description={"translation_key": "summer_temp_threshold"}, default=options.get(SUMMER_TEMP_THRESHOLD, 19)), NumberSelector(NumberSelectorConfig(min=-20, max=50, step=1, unit_of_measurement="°C"))),
       (vol.Required(WINTER_TEMP_THRESHOLD, description={"translation_key": "winter_temp_threshold"}, default=options.get(WINTER_TEMP_THRESHOLD, 25)), NumberSelector(NumberSelectorConfig(min=-20, max=50, step=1, unit_of_measurement="°C"))),
+      (vol.Optional(CONF_TEMP_DEADBAND, description={"translation_key": "temperature_deadband"}, default=options.get(CONF_TEMP_DEADBAND, 0)), NumberSelector(NumberSelectorConfig(min=0, max=5, step=0.1, unit_of_measurement="°C"))),
+      (vol.Optional(CONF_TEMP_MIN_DWELL, description={"translation_key": "temperature_min_dwell_seconds"}, default=options.get(CONF_TEMP_MIN_DWELL, 0)), NumberSelector(NumberSelectorConfig(min=0, max=3600, step=5, unit_of_measurement="s"))),
+      (vol.Optional(CONF_TEMP_SMOOTHING, description={"translation_key": "temperature_smoothing"}, default=options.get(CONF_TEMP_SMOOTHING, 0)), NumberSelector(NumberSelectorConfig(min=0, max=0.9, step=0.05))),
       
       # === ORARI NOTIFICHE ===
       (vol.Optional("notification_time_start_alexa", description={"translation_key": "notification_time_start_alexa"}, default=options.get("notification_time_start_alexa", "08:00")), TimeSelector(TimeSelectorConfig())),
@@ -737,7 +773,10 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
       
           *message_fields
     ]))
+    errors = {}
     if user_input is not None:
+      errors = _validate_messages(user_input, messages)
+    if user_input is not None and not errors:
       # Controlla se l'utente vuole salvare come modello
       save_as_template = user_input.pop("save_as_template", False)
       template_name = user_input.pop("template_name_save", "")
@@ -799,4 +838,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
           _LOGGER.error(f"Traceback completo configurazione: {traceback.format_exc()}")
       
       return self.async_create_entry(data=user_input)
-    return self.async_show_form(step_id="init", data_schema=schema)
+    if errors:
+      # Ripresenta il form con i valori inseriti dall'utente
+      schema = self.add_suggested_values_to_schema(schema, user_input)
+    return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
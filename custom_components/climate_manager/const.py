@@ -13,6 +13,17 @@ CONF_TIMER_OFF_FAN_MODE_SELECTOR = "timer_off_fan_mode_selector"
 
 # === COSTANTI SISTEMA ===
 DEFAULT_CHECK_TIMEOUT_SEC = 10
+CONF_COMMAND_MIN_INTERVAL = "command_min_interval"
+DEFAULT_COMMAND_MIN_INTERVAL = 0.5  # Secondi minimi tra due comandi allo stesso clima
+LOCK_WATCHDOG_BASE_SEC = 120  # Primo controllo di sicurezza del blocco impostazioni
+LOCK_WATCHDOG_MAX_SEC = 1920  # Intervallo massimo raggiunto raddoppiando finché il clima resta conforme
+STARTUP_READY_TIMEOUT_SEC = 120  # Attesa massima delle piattaforme prima del ripristino all'avvio
+CONF_WINDOW_MIN_OPEN = "window_min_open_seconds"  # Durata minima di un'apertura per essere considerata (0 = subito)
+CONF_WINDOW_MIN_CLOSED = "window_min_closed_seconds"  # Durata minima di una chiusura per essere considerata (0 = subito)
+CONF_WINDOW_DEBOUNCE_OVERRIDES = "window_debounce_overrides"  # {entity_id: {"min_open": s, "min_closed": s}}
+CONF_TEMP_DEADBAND = "temperature_deadband"  # °C oltre soglia per riarmare lo spegnimento (0 = nessuna isteresi)
+CONF_TEMP_MIN_DWELL = "temperature_min_dwell_seconds"  # Secondi oltre soglia prima di spegnere (0 = subito)
+CONF_TEMP_SMOOTHING = "temperature_smoothing"  # Peso del nuovo campione nella media esponenziale (0 = disattivata)
 
 ALEXA_MESSAGES = {
     "it": {
@@ -44,4 +55,23 @@ ALEXA_MESSAGES = {
 }
 
 def get_alexa_messages(lang="en"):
-    return ALEXA_MESSAGES.get(lang, ALEXA_MESSAGES["en"]) 
\ No newline at end of file
+    return ALEXA_MESSAGES.get(lang, ALEXA_MESSAGES["en"]) 
+
+# === AGGREGAZIONE NOTIFICHE TRA STANZE ===
+CONF_NOTIFY_AGGREGATION_WINDOW = "notification_aggregation_window"
+DEFAULT_NOTIFY_AGGREGATION_WINDOW = 2.0  # Secondi di raccolta delle notifiche con la stessa chiave (0 = disattivata)
+# Chiavi aggregate: eventi che tipicamente coinvolgono più stanze insieme (es. apertura di tutta la casa)
+AGGREGATED_MESSAGE_KEYS = ("window_open", "window_open_long", "window_blocked", "resume")
+# Messaggio unico per più stanze; per le chiavi senza modello i messaggi vengono accodati
+AGGREGATED_MESSAGES = {
+    "it": {
+        "window_open": "Clima spento in {{rooms}}, finestre aperte.",
+        "window_open_long": "Automazione spenta in {{rooms}}.",
+        "window_blocked": "Clima bloccato per finestre aperte in {{rooms}}.",
+    },
+    "en": {
+        "window_open": "Climate off in {{rooms}}, windows open.",
+        "window_open_long": "Automation turned off in {{rooms}}.",
+        "window_blocked": "Climate blocked for open windows in {{rooms}}.",
+    },
+}
@@ -2,16 +2,47 @@ import asyncio
 import logging
 from datetime import timedelta, datetime, time as dt_time
 
-from homeassistant.helpers.event import async_track_state_change_event, async_call_later
+from homeassistant.helpers.event import async_call_later, async_track_point_in_utc_time
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator
-from .const import ALEXA_MESSAGES
+from homeassistant.util import dt as dt_util
+from .commands import ClimateCommandQueue, ClimateReconciler
+from .const import (
+    AGGREGATED_MESSAGE_KEYS,
+    ALEXA_MESSAGES,
+    CONF_COMMAND_MIN_INTERVAL,
+    CONF_NOTIFY_AGGREGATION_WINDOW,
+    CONF_TEMP_DEADBAND,
+    CONF_TEMP_MIN_DWELL,
+    CONF_TEMP_SMOOTHING,
+    CONF_WINDOW_DEBOUNCE_OVERRIDES,
+    CONF_WINDOW_MIN_CLOSED,
+    CONF_WINDOW_MIN_OPEN,
+    DEFAULT_COMMAND_MIN_INTERVAL,
+    DEFAULT_NOTIFY_AGGREGATION_WINDOW,
+    LOCK_WATCHDOG_BASE_SEC,
+    LOCK_WATCHDOG_MAX_SEC,
+    PLATFORMS,
+    STARTUP_READY_TIMEOUT_SEC,
+)
+from .dispatcher import async_get_dispatcher
+from .handles import EntryHandles, ReadinessBarrier
+from .messages import FAN_NAMES, MODE_NAMES, compile_template
+from .notifications import NotificationDelivery, NotificationFanout, async_get_aggregator
+from .storage import RESTORE_GRACE_SEC, OptionsWriteBuffer, RuntimeStateStore, deadline_to_str, parse_deadline
+from .temperature import ClimateTemperatureResolver, ThresholdEvaluator
+from .utils import async_wait_for_state
+from .windows import WindowDebouncer, WindowGroupState
 
 _LOGGER = logging.getLogger(__name__)
 
 class ClimateManagerCoordinator(DataUpdateCoordinator):
     def __init__(self, hass: HomeAssistant, entry_id: str, config: dict, options: dict = None):
         self._remove_listeners = []  # Inizializza subito
+        self.handles = EntryHandles()  # Riferimenti alle entità, compilati dalle piattaforme
+        self.ready = ReadinessBarrier(PLATFORMS)  # Sbloccata quando tutte le piattaforme hanno aggiunto le entità
+        self._startup_task = None
         super().__init__(hass, _LOGGER, name=f"ClimateManagerCoordinator_{entry_id}")
         self.hass = hass
         self.entry_id = entry_id
@@ -24,6 +55,23 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self.climate_entity = options.get("climate_entity") or config.get("climate_entity")
         if not self.climate_entity:
             raise ValueError("climate_entity mancante nel config entry")
+        # Tutti i comandi verso il clima passano da questa coda (merge, delta, spaziatura)
+        self.commands = ClimateCommandQueue(
+            hass,
+            self.climate_entity,
+            min_interval=float(self.get_option(CONF_COMMAND_MIN_INTERVAL, DEFAULT_COMMAND_MIN_INTERVAL)),
+            name=self.current_name,
+        )
+        # Un solo ciclo di convergenza verso lo stato desiderato, condiviso da accensione e blocco
+        self.reconciler = ClimateReconciler(hass, self.commands, name=self.current_name)
+        # Notifiche Alexa/push in parallelo, con timeout per canale e statistiche per target
+        self.notifier = NotificationFanout(hass, name=self.current_name)
+        # Snapshot su disco dello stato runtime (caricato in async_setup_entry prima delle piattaforme)
+        self.runtime_store = RuntimeStateStore(hass, entry_id, self._runtime_snapshot)
+        # Modifiche alle options applicate subito, scritte nella config entry in modo accorpato
+        self.options_buffer = OptionsWriteBuffer(hass, entry_id)
+        self._runtime_listeners = []  # Iscritti websocket della card (vedi websocket.py)
+        self._last_notification_action = (None, 0.0)  # Protezione contro azioni push duplicate dall'app
         ws = config["window_sensors"]
         if isinstance(ws, str):
             ws = [e.strip() for e in ws.split(",") if e.strip()]
@@ -39,6 +87,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self.alexa_media = config.get("alexa_media", [])
         # push_targets ora viene letto dinamicamente nella property
         self._alexa_targets = self._build_alexa_targets(self.alexa_media)
+        self._alexa_notify_cache = {}  # alexa_media_<device> -> notify.<device>_speak/_announce (None = legacy)
         # Customization
         self.targets = config.get("targets", {})
         self.notify_enabled = config.get("notify", True)
@@ -51,6 +100,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self._window_timer = None
         self._window_off_timer = None
         self._window_on_timer = None
+        self._window_deadlines = {}  # "timeout"/"off"/"on" -> scadenza UTC dei timer finestre
         self._auto_season = None
         self._ignore_next_state_change = False
         self._window_timeout_expired = False
@@ -67,14 +117,28 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self._internal_shutdown = False  # Flag per distinguere spegnimenti interni (automazione) da esterni (manuali)
         self._last_shutdown_time = 0  # Timestamp ultimo spegnimento per evitare elaborazioni multiple
         self._shutdown_already_processed = False  # Flag per evitare doppia elaborazione dello stesso spegnimento
-        self._last_valid_window_states = {}  # Traccia l'ultimo stato valido di ogni sensore finestra
+        self._threshold = ThresholdEvaluator()  # Soglie stagionali con isteresi (configurate da _configure_threshold)
+        self._configure_threshold()
+        # Tabelle di traduzione risolte una volta: {{mode}}/{{fan}} in italiano, {{mode_en}}/{{fan_en}} in inglese
+        self._mode_names = MODE_NAMES["it"]
+        self._mode_names_en = MODE_NAMES["en"]
+        self._fan_names = FAN_NAMES["it"]
+        self._fan_names_en = FAN_NAMES["en"]
+        self._compile_messages()
+        self._temperature_resolver = ClimateTemperatureResolver()  # Attributo temperatura del clima, scoperto alla prima lettura
+        self._window_group = WindowGroupState()  # Ultimo stato valido e contatore delle finestre aperte
+        # Filtro anti-rimbalzo tra gli eventi grezzi dei sensori e il gruppo finestre
+        self._window_debouncer = WindowDebouncer(hass, self._window_group, self._apply_window_state)
+        self._configure_window_debouncer()
         self._settings_locked = False  # Flag per bloccare le impostazioni del clima
         self._timer_in_action = False  # Flag per evitare conflitti tra timer e blocco impostazioni
         self._locked_settings_override = None  # Impostazioni temporanee del timer da proteggere
         self._settings_restore_in_progress = False  # Flag per evitare sovrapposizioni del blocco
-        self._last_restore_time = 0  # Timestamp dell'ultimo ripristino per debounce
         self._lock_restore_until = 0.0  # Timestamp: ignora state changes durante ripristino blocco
         self._lock_periodic_cancel = None  # Cancella il controllo periodico del blocco
+        self._lock_watchdog_interval = LOCK_WATCHDOG_BASE_SEC  # Cresce finché il clima resta conforme
+        # Contatori del blocco impostazioni (esposti sullo switch "Blocca Impostazioni")
+        self.lock_stats = {"drift_events": 0, "corrections": 0, "suppressed_loops": 0}
         self._shutdown_in_progress = False  # Flag per prevenire ripristini durante spegnimento
         self.update_window_entities()  # <-- Aggiorna e logga subito la lista finestre
         # Aggiorna subito la stagione effettiva
@@ -156,93 +220,58 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         # Aggiorna e logga la lista finestre anche qui, per sicurezza
         self.update_window_entities()
         # NON creo più il binary_sensor di gruppo custom
-        entities = self.window_entities
-        hass = self.hass
-        # Listener su tutte le finestre
-        def update_group_state(*_):
-            # Usa la stessa logica di filtro per stati validi, con ultimo stato valido per sensori offline
-            window_states = []
-            for ent in entities:
-                state = hass.states.get(ent)
-                if state and state.state not in ("unknown", "unavailable"):
-                    # Sensore online: aggiorna l'ultimo stato valido e usa quello corrente
-                    is_open = state.state == "on"
-                    self._last_valid_window_states[ent] = is_open
-                    window_states.append(is_open)
-                elif ent in self._last_valid_window_states:
-                    # Sensore offline: usa l'ultimo stato valido noto
-                    window_states.append(self._last_valid_window_states[ent])
-                else:
-                    # Sensore mai visto prima: assume chiuso per sicurezza
-                    window_states.append(False)
-            
-            if window_states:
-                any_open = any(window_states)
-                self._window_open = any_open
-                self._notify_window_state_callbacks()
-        # Aggiorna subito lo stato iniziale delle finestre
-        # (update_window_entities() ha già registrato tutti i listener per finestre,
-        # climate entity, sensore temperatura e sensore potenza)
-        update_group_state()
-        
-        # LISTENER AGGRESSIVO per blocco impostazioni - monitora QUALSIASI cambiamento attributo
-        # (unico qui, NON in update_window_entities - evita duplicazione)
-        self._remove_listeners.append(
-            async_track_state_change_event(
-                self.hass, [self.climate_entity], self._handle_climate_attributes_change
-            )
-        )
-        await self._update_season()  # Imposta stagione all'avvio
-        async_call_later(self.hass, 1, self._schedule_season_update)
-        # RIPRISTINO TIMER DOPO RIAVVIO: controlla se il clima è acceso e riavvia auto timer se necessario
-        async_call_later(self.hass, 5, self._restore_timers_after_restart)
+        # Lo stato iniziale delle finestre è già stato letto da update_window_entities()
+        # (che ha registrato anche i listener per finestre, climate entity,
+        # sensore temperatura e sensore potenza)
         
-        # Listener per azioni interattive delle notifiche push
-        self._remove_listeners.append(
-            self.hass.bus.async_listen(
-                "mobile_app_notification_action", self._handle_notification_action
-            )
-        )
+        await self._update_season()  # Imposta stagione all'avvio
+        # Aggiornamento notturno della stagione e RIPRISTINO TIMER DOPO RIAVVIO:
+        # partono appena tutte le piattaforme hanno aggiunto le entità (nessun ritardo fisso)
+        self._startup_task = self.hass.async_create_task(self._async_start_when_ready())
+
+    async def _async_start_when_ready(self):
+        """Attende la barriera delle piattaforme, poi avvia l'aggiornamento stagione e il ripristino al riavvio"""
+        if not await self.ready.async_wait(STARTUP_READY_TIMEOUT_SEC):
+            _LOGGER.warning(f"[{self.current_name}] ⚠️ Piattaforme non pronte dopo {STARTUP_READY_TIMEOUT_SEC}s: {self.ready.pending} - ripristino con le entità disponibili")
+        await self._schedule_season_update()
+        await self._restore_timers_after_restart()
     async def _handle_window_state(self, event):
-        # Controllo direttamente tutte le finestre, usando l'ultimo stato valido per quelle offline
-        window_states = []
-        for ent in self.window_entities:
-            state = self.hass.states.get(ent)
-            if state and state.state not in ("unknown", "unavailable"):
-                # Sensore online: aggiorna l'ultimo stato valido e usa quello corrente
-                is_open = state.state == "on"
-                self._last_valid_window_states[ent] = is_open
-                window_states.append(is_open)
-            elif ent in self._last_valid_window_states:
-                # Sensore offline: usa l'ultimo stato valido noto
-                window_states.append(self._last_valid_window_states[ent])
-            else:
-                # Sensore mai visto prima: assume chiuso per sicurezza
-                window_states.append(False)
-        
-        # Se non ci sono finestre configurate, mantieni lo stato corrente
-        if not window_states:
-            return
-            
-        any_open = any(window_states)
-        # Evita notifiche ripetute per lo stesso stato
-        if any_open == self._window_open:
+        # Gli eventi grezzi passano prima dal filtro anti-rimbalzo (min apertura/chiusura per sensore)
+        if self._window_debouncer.async_handle(event.data.get("entity_id"), event.data.get("new_state")):
+            _LOGGER.debug(f"[{self.current_name}] 🪟 Rimbalzo ignorato su {event.data.get('entity_id')} (flap totali: {self._window_debouncer.flaps})")
+            self._notify_window_state_callbacks()
+
+    def _configure_threshold(self):
+        self._threshold.configure(
+            self.get_option("summer_temp_threshold", 19),
+            self.get_option("winter_temp_threshold", 25),
+            self.get_option(CONF_TEMP_DEADBAND, 0),
+            self.get_option(CONF_TEMP_MIN_DWELL, 0),
+            self.get_option(CONF_TEMP_SMOOTHING, 0),
+        )
+
+    def _configure_window_debouncer(self):
+        self._window_debouncer.configure(
+            self.get_option(CONF_WINDOW_MIN_OPEN, 0),
+            self.get_option(CONF_WINDOW_MIN_CLOSED, 0),
+            self.get_option(CONF_WINDOW_DEBOUNCE_OVERRIDES, {}),
+        )
+
+    async def _apply_window_state(self, entity_id, new_state):
+        # Aggiornamento incrementale dal solo new_state dell'evento (sensori offline: ultimo stato valido)
+        transition = self._window_group.update(entity_id, new_state)
+        # Nessun passaggio per lo zero del contatore finestre aperte: stato del gruppo invariato
+        if transition is None or transition == self._window_open:
             return
         
-        # Log dettagliato del cambio stato finestre
-        opened_windows = [ent for ent, state in zip(self.window_entities, window_states) if state]
-        closed_windows = [ent for ent, state in zip(self.window_entities, window_states) if not state]
-        
-        if any_open:
-            _LOGGER.info(f"[{self.current_name}] 🪟 FINESTRE APERTE: {', '.join(opened_windows)}")
-            if closed_windows:
-                _LOGGER.info(f"[{self.current_name}] 🪟 Finestre chiuse: {', '.join(closed_windows)}")
+        if transition:
+            _LOGGER.info(f"[{self.current_name}] 🪟 FINESTRE APERTE: {', '.join(self._window_group.open_entities)}")
             await self._on_window_open(reset_timer=True)
-        elif not any_open and self._window_open:
+        else:
             _LOGGER.info(f"[{self.current_name}] 🪟 TUTTE LE FINESTRE CHIUSE")
             await self._on_window_closed()
         
-        self._window_open = any_open
+        self._window_open = transition
         self._notify_window_state_callbacks()
     async def _handle_climate_state(self, event):
         # Se sincronizzazione in corso, non gestire eventi
@@ -262,40 +291,11 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             return
         # Se non c'è un sensore di temperatura esterno, monitora i cambiamenti di temperatura dal climate entity
         if not self.temperature_sensor and new_state != "off" and old_state != "off":
-            # Controlla se è cambiata la temperatura corrente nel climate entity
-            old_temp = None
-            new_temp = None
-            temp_attributes = ['current_temperature', 'current_temp', 'ambient_temperature', 'room_temperature', 'inside_temperature', 'temp']
-            for attr in temp_attributes:
-                if old.attributes.get(attr) is not None:
-                    try:
-                        old_temp = float(old.attributes.get(attr))
-                        break
-                    except Exception:
-                        continue
-            
-            for attr in temp_attributes:
-                if new.attributes.get(attr) is not None:
-                    try:
-                        new_temp = float(new.attributes.get(attr))
-                        break
-                    except Exception:
-                        continue
-            
-            # Se è cambiata la temperatura, simula un evento temperature_state per i controlli soglia
+            # Controlla se è cambiata la temperatura corrente nel climate entity (attributo memorizzato)
+            old_temp = self._temperature_resolver.resolve(old)
+            new_temp = self._temperature_resolver.resolve(new)
             if old_temp != new_temp and new_temp is not None:
-                # Simula l'evento per il controllo soglie
-                temp_event = {
-                    "new_state": type('obj', (object,), {
-                        'state': str(new_temp), 
-                        'attributes': {}
-                    })(),
-                    "old_state": type('obj', (object,), {
-                        'state': str(old_temp) if old_temp is not None else "unknown", 
-                        'attributes': {}
-                    })()
-                }
-                await self._handle_temperature_state(temp_event)
+                await self._check_temperature_threshold(new_temp)
             
         # Intervieni se si passa da 'off' a una modalità attiva VALIDA
         # e non c'è un binary sensor configurato (per evitare doppie notifiche)
@@ -372,20 +372,14 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             # Reset flag spegnimento al termine della logica
             self._shutdown_in_progress = False
 
-        # CONTROLLO BLOCCO IMPOSTAZIONI: se le impostazioni sono bloccate, ripristina la configurazione
-        # MA SOLO se NON è il timer che sta applicando le sue impostazioni (il timer ha priorità)
-        # e NON è già in corso un ripristino
-        if (self._settings_locked and new_state != "off" and not self._timer_in_action
-                and not self._settings_restore_in_progress):
-            # Usa un delay per evitare conflitti con l'evento in corso
-            @callback
-            def _schedule_restore_from_climate_state(_now=None):
-                self.hass.async_create_task(self._check_and_restore_locked_settings())
-            from homeassistant.helpers.event import async_call_later
-            async_call_later(self.hass, 2, _schedule_restore_from_climate_state)
+
+    async def _handle_climate_event(self, event):
+        """Unico handler per gli eventi del clima: blocco impostazioni, poi gestione stato"""
+        await self._handle_climate_attributes_change(event)
+        await self._handle_climate_state(event)
 
     async def _handle_climate_attributes_change(self, event):
-        """BLOCCO AGGRESSIVO: Gestisce qualsiasi cambiamento degli attributi del clima per ripristinare impostazioni bloccate"""
+        """BLOCCO IMPOSTAZIONI: confronta ogni evento del clima con il target bloccato e corregge la deriva"""
         if not self._settings_locked:
             return
             
@@ -393,45 +387,36 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         if self._shutdown_in_progress:
             return
             
-        # Se sincronizzazione in corso o timer attivo, non interferire
+        # Se sincronizzazione in corso o timer attivo, non interferire (il timer ha priorità)
         if (self._syncing_from_binary_sensor or self._timer_in_action):
             return
-        
-        # DEBOUNCE: evita chiamate troppo frequenti (minimo 3 secondi tra ripristini)
-        import time
-        current_time = time.time()
-        if current_time - self._last_restore_time < 3:
-            return
             
         new = event.data.get("new_state")
-        old = event.data.get("old_state")
-        
-        if new is None or old is None:
+        if new is None or new.state in ("unknown", "unavailable"):
             return
             
         # IMPORTANTE: Se il clima viene spento, NON bloccare - permettere spegnimento
         if new.state == "off":
             _LOGGER.info(f"[{self.current_name}] 🔓 Clima spento - blocco temporaneamente disabilitato")
             return
-            
-        # Controlla se sono cambiati attributi rilevanti
-        old_temp = old.attributes.get("temperature")
-        new_temp = new.attributes.get("temperature")
-        old_hvac = old.state
-        new_hvac = new.state
-        old_fan = old.attributes.get("fan_mode")
-        new_fan = new.attributes.get("fan_mode")
-        
-        # Se qualcosa è cambiato, schedula il ripristino (stesso comportamento del check periodico)
-        if (old_temp != new_temp) or (old_hvac != new_hvac) or (old_fan != new_fan):
-            _LOGGER.info(f"[{self.current_name}] 🔒 BLOCCO: Rilevato cambiamento - Temp: {old_temp}→{new_temp}, HVAC: {old_hvac}→{new_hvac}, Fan: {old_fan}→{new_fan}")
-            self._last_restore_time = current_time
-            
-            from homeassistant.helpers.event import async_call_later
-            @callback
-            def _schedule_locked_restore(_now=None):
-                self.hass.async_create_task(self._check_and_restore_locked_settings())
-            async_call_later(self.hass, 1, _schedule_locked_restore)
+        
+        target = await self._get_locked_target()
+        if not target:
+            return
+        wrong = self.reconciler.mismatches(new, target)
+        if not wrong:
+            return
+        # Eventi intermedi mentre la correzione verso questo target è ancora in corso
+        if self.reconciler.is_targeting(**target):
+            self.lock_stats["suppressed_loops"] += 1
+            return
+        
+        # Deriva rilevata: la correzione riporta il watchdog all'intervallo base
+        self.lock_stats["drift_events"] += 1
+        _LOGGER.info(f"[{self.current_name}] 🔒 BLOCCO: deriva rilevata su {sorted(wrong)} - HVAC: {new.state}, Temp: {new.attributes.get('temperature')}, Fan: {new.attributes.get('fan_mode')}")
+        self._reset_lock_watchdog()
+        await self._check_and_restore_locked_settings()
+        self._notify_lock_stats()
 
     def _get_current_temperature(self):
         """Ottiene la temperatura corrente dal sensore esterno o dall'entità climate"""
@@ -446,50 +431,26 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                     pass
         
         # Seconda priorità: temperatura dall'entità climate
-        climate_state = self.hass.states.get(self.climate_entity)
-        if climate_state:
-            # Lista degli attributi possibili per la temperatura corrente, in ordine di priorità
-            temp_attributes = [
-                'current_temperature',  # Standard Home Assistant
-                'current_temp',         # Alternativo comune
-                'ambient_temperature',  # Alcuni sistemi
-                'room_temperature',     # Alcuni sistemi
-                'inside_temperature',   # Alcuni sistemi
-                'temp'                  # Abbreviato (solo se non è target)
-            ]
-            
-            for attr in temp_attributes:
-                temp_value = climate_state.attributes.get(attr)
-                if temp_value is not None:
-                    try:
-                        temp_float = float(temp_value)
-                        # Controllo di sicurezza: se l'attributo è 'temp', verifica che non sia uguale alla temperatura target
-                        if attr == 'temp':
-                            target_temp = climate_state.attributes.get('temperature')
-                            if target_temp is not None and abs(temp_float - float(target_temp)) < 0.1:
-                                continue
-                        
-                        return temp_float
-                    except Exception:
-                        continue
-        
-        return None
+        return self._temperature_resolver.resolve(self.hass.states.get(self.climate_entity))
+
+    @callback
+    def _handle_entity_registry_updated(self, event):
+        if self.climate_entity in (event.data.get("entity_id"), event.data.get("old_entity_id")):
+            _LOGGER.debug(f"[{self.current_name}] 🌡️ Entità clima aggiornata nel registro: riscopro l'attributo temperatura")
+            self._temperature_resolver.invalidate()
+        # Entità notify/media_player di Alexa create, rinominate o rimosse: ricalcola i target
+        if self._alexa_notify_cache and any(
+            self._is_alexa_related_entity(ent) for ent in (event.data.get("entity_id"), event.data.get("old_entity_id"))
+        ):
+            _LOGGER.debug(f"[{self.current_name}] 🔊 Entità Alexa aggiornata nel registro: ricalcolo i target notify")
+            self._alexa_notify_cache.clear()
 
     async def _handle_temperature_state(self, event):
         """Gestisce i cambiamenti di temperatura e controlla le soglie"""
         # Se automazione disabilitata, non gestire eventi
         if not self.automation_enabled:
             return
-        
-        # Gestione compatibilità: event può essere un vero evento Home Assistant o un dict simulato
-        if hasattr(event, 'data'):
-            # Evento reale da listener
-            new = event.data.get("new_state")
-            old = event.data.get("old_state")
-        else:
-            # Evento simulato (dict)
-            new = event.get("new_state") 
-            old = event.get("old_state")
+        new = event.data.get("new_state")
         if new is None:
             return
             
@@ -501,44 +462,33 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             temp = float(new.state)
         except (ValueError, TypeError):
             return
-        
-        # Controlla solo se il clima è acceso
+        await self._check_temperature_threshold(temp)
+
+    async def _check_temperature_threshold(self, temp):
+        """Spegne il clima se la temperatura è fuori soglia per la stagione corrente"""
+        if not self.automation_enabled:
+            return
+        # Controlla solo se il clima è acceso (a clima spento aggiorna solo la media)
         climate_state = self.hass.states.get(self.climate_entity)
         if not climate_state or climate_state.state == "off":
+            self._threshold.update(temp)
             return
             
-        # Ottieni stagione e soglie
+        # Soglie già lette dalle options: deadband, dwell minimo e smoothing filtrano il rumore
         season = await self._get_season()
-        summer_threshold = float(self.get_option("summer_temp_threshold", 19))
-        winter_threshold = float(self.get_option("winter_temp_threshold", 25))
-        
-        should_turn_off = False
-        threshold_value = None
-        season_mode = None
-        
-        # Controlla soglie in base alla stagione
-        if season == "summer" and temp < summer_threshold:
-            should_turn_off = True
-            threshold_value = summer_threshold
-            season_mode = "summer"
-        elif season == "winter" and temp > winter_threshold:
-            should_turn_off = True
-            threshold_value = winter_threshold
-            season_mode = "winter"
-            
-        if should_turn_off:
+        threshold_value = self._threshold.evaluate(season, temp, asyncio.get_event_loop().time())
+        if threshold_value is not None:
+            season_mode = season
             # Spegnimento per soglia temperatura: ferma anche i timer switch dell'utente
             # NON impostare _internal_shutdown = True perché vogliamo fermare i timer
             self._ignore_next_state_change = True
-            await self.hass.services.async_call(
-                "climate", "turn_off", {"entity_id": self.climate_entity}, blocking=True
-            )
+            await self.commands.async_turn_off()
             
             # Invia notifica
             msg_key = f"climate_blocked_{season_mode}"
-            msg_tpl = self.messages.get(msg_key, f"Clima spento: temperatura fuori soglia ({threshold_value}°C).")
             msg = self._render_message(
-                msg_tpl, 
+                msg_key,
+                f"Clima spento: temperatura fuori soglia ({threshold_value}°C).",
                 mode=season_mode, 
                 temp=temp, 
                 sensor=temp, 
@@ -614,9 +564,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             
             # Spegni l'entità climate in Home Assistant per sincronizzarla
             self._ignore_next_state_change = True
-            await self.hass.services.async_call(
-                "climate", "turn_off", {"entity_id": self.climate_entity}, blocking=True
-            )
+            await self.commands.async_turn_off()
 
     async def _handle_notification_action(self, event):
         """Gestisce le azioni interattive delle notifiche push"""
@@ -630,6 +578,14 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             if not action.endswith(f"_{self.entry_id}"):
                 return
             
+            # PROTEZIONE CONTRO EVENTI DUPLICATI: stessa azione negli ultimi 2 secondi
+            now = self.hass.loop.time()
+            last_action, last_time = self._last_notification_action
+            if action == last_action and now - last_time < 2.0:
+                logger.info(f"[{self.current_name}] Azione già processata di recente, ignoro: {action}")
+                return
+            self._last_notification_action = (action, now)
+            
             room_name = self.get_option("room_name", self.current_name)
             
             # Ottieni la lingua configurata per i messaggi
@@ -643,17 +599,18 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                 try:
                     # Spegni il clima
                     self._ignore_next_state_change = True
-                    await self.hass.services.async_call(
-                        "climate", "turn_off", 
-                        {"entity_id": self.climate_entity}, 
-                        blocking=True
-                    )
+                    await self.commands.async_turn_off()
                     
                     # Ferma il timer di notifica di accensione
                     await self._stop_timer_on_notification()
                     
-                    # Cancella solo la notifica originale (conferma gestita da __init__.py)
+                    # Cancella la notifica originale e invia la conferma
                     await self._clear_notification()
+                    if lang == "en":
+                        confirm_msg = f"✅ Climate turned off in {room_name}"
+                    else:
+                        confirm_msg = f"✅ Clima spento in {room_name}"
+                    await self._notify_push_only(confirm_msg, "timer_action_confirm")
                     
                     logger.info(f"[{room_name}] Clima spento tramite azione interattiva")
                     
@@ -671,8 +628,13 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                     # Riavvia il timer di notifica da zero
                     await self._start_timer_on_notification()
                     
-                    # Cancella solo la notifica originale (conferma gestita da __init__.py)
+                    # Cancella la notifica originale e invia la conferma
                     await self._clear_notification()
+                    if lang == "en":
+                        confirm_msg = f"ℹ️ Climate left on in {room_name}"
+                    else:
+                        confirm_msg = f"ℹ️ Clima lasciato acceso in {room_name}"
+                    await self._notify_push_only(confirm_msg, "timer_action_confirm")
                     
                     logger.info(f"[{room_name}] Timer notifica fermato e riavviato tramite azione interattiva")
                     
@@ -712,27 +674,8 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             # Questo serve per allineare l'interfaccia HA con la realtà fisica
             self._ignore_next_state_change = True
             
-            # Imposta modalità (comando virtuale che non influenza il dispositivo fisico)
-            await self.hass.services.async_call(
-                "climate", "set_hvac_mode", 
-                {"entity_id": self.climate_entity, "hvac_mode": hvac_mode}, 
-                blocking=True
-            )
-            
-            # Imposta temperatura
-            await self.hass.services.async_call(
-                "climate", "set_temperature", 
-                {"entity_id": self.climate_entity, "temperature": temperature}, 
-                blocking=True
-            )
-            
-            # Imposta ventola se supportata
-            if fan_mode:
-                await self.hass.services.async_call(
-                    "climate", "set_fan_mode", 
-                    {"entity_id": self.climate_entity, "fan_mode": fan_mode}, 
-                    blocking=True
-                )
+            # Imposta modalità, temperatura e ventola (comando virtuale che non influenza il dispositivo fisico)
+            await self.commands.async_apply(hvac_mode=hvac_mode, temperature=temperature, fan_mode=fan_mode)
             
             # VERIFICA E RETRY per sincronizzazione virtuale con binary sensor
             await self._verify_and_retry_climate_settings(hvac_mode, temperature, fan_mode)
@@ -774,26 +717,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             # Ignora il prossimo cambio di stato per evitare loop
             self._ignore_next_state_change = True
             
-            await self.hass.services.async_call(
-                "climate", "set_hvac_mode", 
-                {"entity_id": self.climate_entity, "hvac_mode": hvac_mode}, 
-                blocking=True
-            )
-            
-            # Imposta temperatura
-            await self.hass.services.async_call(
-                "climate", "set_temperature", 
-                {"entity_id": self.climate_entity, "temperature": temperature}, 
-                blocking=True
-            )
-            
-            # Imposta ventola se supportata
-            if fan_mode:
-                await self.hass.services.async_call(
-                    "climate", "set_fan_mode", 
-                    {"entity_id": self.climate_entity, "fan_mode": fan_mode}, 
-                    blocking=True
-                )
+            await self.commands.async_apply(hvac_mode=hvac_mode, temperature=temperature, fan_mode=fan_mode)
             
             # VERIFICA E RETRY per sincronizzazione normale (senza binary sensor)
             await self._verify_and_retry_climate_settings(hvac_mode, temperature, fan_mode)
@@ -801,10 +725,52 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         except Exception as e:
             pass
 
+    @callback
+    def async_add_runtime_listener(self, cb):
+        """cb() viene chiamata a ogni cambio di finestre, timer, blocco o automazione. Ritorna la funzione di rimozione."""
+        self._runtime_listeners.append(cb)
+
+        @callback
+        def _remove():
+            if cb in self._runtime_listeners:
+                self._runtime_listeners.remove(cb)
+
+        return _remove
+
+    @callback
+    def async_runtime_changed(self):
+        """Stato runtime cambiato: salvataggio ritardato su disco e avviso agli iscritti websocket"""
+        self.runtime_store.async_schedule_save()
+        for cb in list(self._runtime_listeners):
+            try:
+                cb()
+            except Exception:
+                pass
+
+    def room_state(self):
+        """Stato compatto della stanza inviato alla card (solo campi che cambiano a runtime)"""
+        return {
+            "entry_id": self.entry_id,
+            "name": self.current_name,
+            "climate_entity": self.climate_entity,
+            "window_open": self._window_open,
+            "open_windows": self._window_group.open_entities,
+            "window_sensors": len(self.window_entities),
+            "window_timeout_expired": self._window_timeout_expired,
+            "automation_enabled": self.automation_enabled,
+            "automation_disabled_by_shutdown": self._automation_disabled_by_shutdown,
+            "settings_locked": self._settings_locked,
+            "climate_prev_state": self._climate_prev_state,
+            "window_timers": self._active_window_deadlines(),
+            "timer_on": self.handles.timer_on_sensor.runtime_state if self.handles.timer_on_sensor else None,
+            "timer_off": self.handles.timer_off_sensor.runtime_state if self.handles.timer_off_sensor else None,
+        }
+
     def register_timer_callback(self, cb):
         self._timer_callbacks.append(cb)
 
     def _notify_timer_callbacks(self):
+        self.async_runtime_changed()
         for cb in self._timer_callbacks:
             try:
                 cb()
@@ -817,6 +783,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self._prev_state_callbacks.append(cb)
 
     def _notify_prev_state_callbacks(self):
+        self.async_runtime_changed()
         if hasattr(self, '_prev_state_callbacks'):
             for cb in self._prev_state_callbacks:
                 try:
@@ -830,6 +797,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self._window_state_callbacks.append(cb)
 
     def _notify_window_state_callbacks(self):
+        self.async_runtime_changed()
         if hasattr(self, '_window_state_callbacks'):
             for cb in self._window_state_callbacks:
                 try:
@@ -843,6 +811,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self._automation_status_callbacks.append(cb)
 
     def _notify_automation_status_callbacks(self):
+        self.async_runtime_changed()
         if hasattr(self, '_automation_status_callbacks'):
             for cb in self._automation_status_callbacks:
                 try:
@@ -853,20 +822,13 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
     def _force_update_settings_sensor(self):
         """Forza l'aggiornamento del sensore settings"""
         try:
-            # Cerca il sensore settings tra le entità
-            entry_data = self.hass.data.get("climate_manager", {}).get(self.entry_id, {})
-            entities_data = entry_data.get("entities", {})
-            sensor_entities = entities_data.get("sensor", [])
-            
-            for sensor in sensor_entities:
-                if hasattr(sensor, '_attr_unique_id') and sensor._attr_unique_id.endswith('_settings'):
-                    sensor._force_update()
-                    break
-                    
+            sensor = self.handles.settings_sensor
+            if sensor:
+                sensor._force_update()
         except Exception as e:
             _LOGGER.error(f"Climate Manager: Errore aggiornando sensore settings: {e}")
 
-    async def _on_window_open(self, reset_timer=False):
+    async def _on_window_open(self, reset_timer=False, off_delay=None):
         climate_state = self.hass.states.get(self.climate_entity)
         current_hvac = climate_state.state if climate_state else "unknown"
         
@@ -914,84 +876,22 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         async def do_turn_off(_):
             # Spegnimento automazione interna (finestra aperta) - flag già impostato prima
             # Prova prima con turn_off, poi fallback su set_hvac_mode
-            try:
-                await self.hass.services.async_call(
-                    "climate", "turn_off", {"entity_id": self.climate_entity}, blocking=True
-                )
-            except Exception as e:
-                try:
-                    await self.hass.services.async_call(
-                        "climate", "set_hvac_mode", {"entity_id": self.climate_entity, "hvac_mode": "off"}, blocking=True
-                    )
-                except Exception as e2:
-                    return
+            if not await self.commands.async_turn_off():
+                return
             
-            # Controlla se il clima è già spento (potrebbe essere istantaneo)
-            await asyncio.sleep(0.5)  # Piccolo ritardo per permettere al cambio di stato di propagarsi
-            current_state = self.hass.states.get(self.climate_entity)
+            # Attende lo spegnimento effettivo del clima (evento di stato, nessun polling)
+            await async_wait_for_state(
+                self.hass, self.climate_entity, lambda s: s.state == "off", timeout=30
+            )
             
-            if current_state and current_state.state == "off":
-                pass
-                
-                # Se c'è binary sensor, aspetta che si aggiorni a "off"
-                if self.climate_power_sensor:
-                    await self._wait_for_binary_sensor_state_change("off", timeout=30.0)
-            else:
-                # Aspetta il cambio di stato a OFF tramite polling e listener
-                climate_off_event = asyncio.Event()
-                timeout_timer = None
-                
-                def on_climate_off(event):
-                    entity_id = event.data.get("entity_id")
-                    if entity_id == self.climate_entity:
-                        new_state = event.data.get("new_state")
-                        
-                        if new_state and new_state.state == "off":
-                            climate_off_event.set()
-                
-                def on_timeout(_):
-                    climate_off_event.set()
-                
-                # Polling alternativo ogni 0.5 secondi
-                async def polling_check():
-                    for i in range(20):  # 10 secondi totali
-                        await asyncio.sleep(0.5)
-                        check_state = self.hass.states.get(self.climate_entity)
-                        if check_state and check_state.state == "off":
-                            climate_off_event.set()
-                            return
-                
-                # Registra listener per cambio stato clima
-                unsub_listener = self.hass.bus.async_listen(
-                    "state_changed", 
-                    on_climate_off
-                )
-                
-                # Timer di sicurezza 10 secondi
-                timeout_timer = async_call_later(self.hass, 30, on_timeout)
-                
-                # Avvia polling in background
-                polling_task = asyncio.create_task(polling_check())
-                
-                try:
-                    # Aspetta il cambio di stato a OFF o timeout
-                    await climate_off_event.wait()
-                    
-                    # Se c'è binary sensor, aspetta che si aggiorni a "off"
-                    if self.climate_power_sensor:
-                        await self._wait_for_binary_sensor_state_change("off", timeout=30.0)
-                finally:
-                    # Pulisci listener, timer e task
-                    unsub_listener()
-                    if timeout_timer:
-                        timeout_timer()
-                    if not polling_task.done():
-                        polling_task.cancel()
+            # Se c'è binary sensor, aspetta che si aggiorni a "off"
+            if self.climate_power_sensor:
+                await self._wait_for_binary_sensor_state_change("off", timeout=30.0)
             
             # Ora invia la notifica
-            msg = self.messages.get("window_open", "Clima spento per finestra aperta.")
             msg = self._render_message(
-                msg,
+                "window_open",
+                "Clima spento per finestra aperta.",
                 mode=self.season_mode,
                 temp=self.get_option("temperature_summer" if self.season_mode=="summer" else "temperature_winter", None),
                 fan=self.fan_mode_summer if self.season_mode=="summer" else self.fan_mode_winter,
@@ -1011,10 +911,12 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self._internal_shutdown = True
         _LOGGER.info(f"[{self.current_name}] 🪟 Impostato flag spegnimento interno")
         
-        # Avvia timer spegnimento con delay configurato
-        if self.delay_before_off > 0:
-            _LOGGER.info(f"[{self.current_name}] ⏰ Avviato timer spegnimento con delay: {self.delay_before_off}s")
-            self._window_off_timer = async_call_later(self.hass, self.delay_before_off, do_turn_off)
+        # Avvia timer spegnimento con delay configurato (o con il residuo salvato prima del riavvio)
+        delay = self.delay_before_off if off_delay is None else off_delay
+        if delay > 0:
+            _LOGGER.info(f"[{self.current_name}] ⏰ Avviato timer spegnimento con delay: {delay}s")
+            self._window_off_timer = async_call_later(self.hass, delay, do_turn_off)
+            self._track_window_deadline("off", delay)
         else:
             _LOGGER.info(f"[{self.current_name}] ⚡ Spegnimento immediato (nessun delay)")
             await do_turn_off(None)
@@ -1025,93 +927,56 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             self._window_timer = async_call_later(
                 self.hass, self.window_open_timeout, self._on_window_timeout
             )
+            self._track_window_deadline("timeout", self.window_open_timeout)
             self._notify_timer_callbacks()
         elif self._window_timer:
             _LOGGER.info(f"[{self.current_name}] ⏸️ Timer globale finestre già attivo - NON resettato")
         else:
             _LOGGER.info(f"[{self.current_name}] ⏸️ Timer globale finestre disabilitato (timeout=0)")
 
-    def _translate_mode(self, mode):
-        # Traduzioni modalità HVAC
-        translations = {
-            "auto": "automatico",
-            "cool": "raffrescamento",
-            "heat": "riscaldamento",
-            "fan_only": "ventilazione",
-            "dry": "deumidificazione",
-            "off": "spento",
-            "summer": "estate",
-            "winter": "inverno"
-        }
-        return translations.get(str(mode), str(mode))
-
-    def _translate_fan_mode(self, fan):
-        # Traduzioni fan mode
-        translations = {
-            "auto": "automatico",
-            "low": "bassa",
-            "medium": "media",
-            "high": "alta"
-        }
-        return translations.get(str(fan), str(fan))
-
-    def _translate_mode_en(self, mode):
-        # Traduzioni modalità HVAC in inglese
-        translations = {
-            "auto": "auto",
-            "cool": "cooling",
-            "heat": "heating",
-            "fan_only": "fan only",
-            "dry": "dry",
-            "off": "off",
-            "summer": "summer",
-            "winter": "winter"
-        }
-        return translations.get(str(mode), str(mode))
-
-    def _translate_fan_mode_en(self, fan):
-        # Traduzioni fan mode in inglese
-        translations = {
-            "auto": "auto",
-            "low": "low",
-            "medium": "medium",
-            "high": "high"
-        }
-        return translations.get(str(fan), str(fan))
-
-    def _render_message(self, template, mode=None, temp=None, fan=None, sensor=None, threshold=None, room=None, extra=None, version=None):
-        msg = template
+    def _compile_messages(self):
+        """Compila i messaggi personalizzati al caricamento delle options e segnala i segnaposto sconosciuti"""
+        self._message_templates = {}
+        for key, text in (self.messages or {}).items():
+            if not isinstance(text, str) or not text:
+                # Messaggio vuoto: si usa il testo predefinito
+                continue
+            template = compile_template(text)
+            self._message_templates[key] = template
+            if template.unknown_placeholders:
+                _LOGGER.warning(f"[{self.current_name}] ⚠️ Messaggio '{key}': segnaposto sconosciuti {sorted(template.unknown_placeholders)}")
+
+    def _render_message(self, key, default, mode=None, temp=None, fan=None, sensor=None, threshold=None, room=None, extra=None, version=None, suffix=""):
+        """Messaggio personalizzato key (già compilato) oppure default; key=None usa sempre default"""
+        template = self._message_templates.get(key) if key else None
+        if template is None:
+            template = compile_template(default)
+        values = {}
         if mode is not None:
-            msg = msg.replace("{{mode}}", self._translate_mode(mode))
-            msg = msg.replace("{{mode_en}}", self._translate_mode_en(mode))
+            values["mode"] = self._mode_names.get(str(mode), str(mode))
+            values["mode_en"] = self._mode_names_en.get(str(mode), str(mode))
         if temp is not None:
-            temp_str = f"{int(round(float(temp)))} °"
-            msg = msg.replace("{{temp}}", temp_str)
-            msg = msg.replace("{{temp_en}}", temp_str)
+            values["temp"] = values["temp_en"] = f"{int(round(float(temp)))} °"
         if sensor is not None:
-            sensor_str = f"{int(round(float(sensor)))} °"
-            msg = msg.replace("{{sensor}}", sensor_str)
-            msg = msg.replace("{{sensor_en}}", sensor_str)
+            values["sensor"] = values["sensor_en"] = f"{int(round(float(sensor)))} °"
         if threshold is not None:
-            threshold_str = f"{int(round(float(threshold)))} °"
-            msg = msg.replace("{{threshold}}", threshold_str)
+            values["threshold"] = f"{int(round(float(threshold)))} °"
         if fan is not None:
-            msg = msg.replace("{{fan}}", self._translate_fan_mode(fan))
-            msg = msg.replace("{{fan_en}}", self._translate_fan_mode_en(fan))
+            values["fan"] = self._fan_names.get(str(fan), str(fan))
+            values["fan_en"] = self._fan_names_en.get(str(fan), str(fan))
         if version is not None:
-            msg = msg.replace("{{version}}", str(version))
+            values["version"] = str(version)
         if extra:
             for k, v in extra.items():
-                msg = msg.replace(f"{{{{{k}}}}}", str(v))
+                values[k] = str(v)
         # Usa room_name se disponibile, altrimenti room esplicitamente passato, altrimenti current_name
         if room is not None:
-            room_name = room
+            values["room"] = room
         else:
-            room_name = self.get_option("room_name") or self.current_name
-        msg = msg.replace("{{room}}", room_name)
-        return msg
+            values["room"] = self.get_option("room_name") or self.current_name
+        return template.render(values) + suffix
 
-    async def _on_window_closed(self):
+    async def _on_window_closed(self, on_delay=None):
         climate_state = self.hass.states.get(self.climate_entity)
         current_hvac = climate_state.state if climate_state else "unknown"
         
@@ -1206,39 +1071,20 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                 # Blocca notifiche per 10 secondi dall'inizio del ripristino
                 self._skip_until_time = asyncio.get_event_loop().time() + 10.0
                 try:
-                    # 1. Imposta modalità HVAC
+                    # Modalità, temperatura e ventola in un solo target: la coda invia solo le differenze
+                    await self.commands.async_apply(
+                        hvac_mode=mode if mode and mode != "off" else None,
+                        temperature=temp if temp_valid else None,
+                        fan_mode=fan if fan and fan_valid else None,
+                    )
+                    
+                    # Verifica che la modalità sia stata impostata
                     if mode and mode != "off":
-                        await self.hass.services.async_call(
-                            "climate", "set_hvac_mode", 
-                            {"entity_id": self.climate_entity, "hvac_mode": mode}, 
-                            blocking=True
+                        mode_applied = await async_wait_for_state(
+                            self.hass, self.climate_entity, lambda s: s.state == mode, timeout=5.0
                         )
-                        await asyncio.sleep(0.5)
-                        
-                        # Verifica che la modalità sia stata impostata
-                        check_state = self.hass.states.get(self.climate_entity)
-                        if not check_state or check_state.state != mode:
+                        if not mode_applied:
                             raise Exception(f"Modalità {mode} non applicata correttamente")
-                    
-                    # 2. Imposta temperatura
-                    if temp_valid:
-                        await self.hass.services.async_call(
-                            "climate", "set_temperature", 
-                            {"entity_id": self.climate_entity, "temperature": temp}, 
-                            blocking=True
-                        )
-                        await asyncio.sleep(0.3)
-                    
-                    # 3. Imposta ventola (se supportata)
-                    if fan and fan_valid:
-                        await self.hass.services.async_call(
-                            "climate", "set_fan_mode", 
-                            {"entity_id": self.climate_entity, "fan_mode": fan}, 
-                            blocking=True
-                        )
-                        await asyncio.sleep(0.3)
-                    # Attesa finale per stabilizzazione
-                    await asyncio.sleep(1.0)
                     # VERIFICA FINALE del ripristino
                     final_state = self.hass.states.get(self.climate_entity)
                     if final_state and final_state.state not in ("off", "unknown", "unavailable"):
@@ -1247,9 +1093,9 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                         if self.climate_power_sensor:
                             binary_confirmed = await self._wait_for_binary_sensor_state_change("on", timeout=30.0)
                         # Invia messaggio di ripristino
-                        msg_tpl = self.messages.get("resume", "Ripristino clima in modalità {{mode}} (ventola: {{fan}}) temperatura {{temp}}")
                         msg = self._render_message(
-                            msg_tpl,
+                            "resume",
+                            "Ripristino clima in modalità {{mode}} (ventola: {{fan}}) temperatura {{temp}}",
                             mode=mode,
                             temp=temp,
                             fan=fan,
@@ -1285,9 +1131,11 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                 self._window_on_timer()
                 self._window_on_timer = None
                 
-            if self.delay_before_on > 0:
-                _LOGGER.info(f"[{self.current_name}] ⏰ Avviato timer ripristino con delay: {self.delay_before_on}s")
-                self._window_on_timer = async_call_later(self.hass, self.delay_before_on, do_restore)
+            delay = self.delay_before_on if on_delay is None else on_delay
+            if delay > 0:
+                _LOGGER.info(f"[{self.current_name}] ⏰ Avviato timer ripristino con delay: {delay}s")
+                self._window_on_timer = async_call_later(self.hass, delay, do_restore)
+                self._track_window_deadline("on", delay)
             else:
                 _LOGGER.info(f"[{self.current_name}] ⚡ Ripristino immediato (nessun delay)")
                 await do_restore(None)
@@ -1308,9 +1156,9 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         await self._stop_timer_on_notification()
             
         sensor_val = self._get_current_temperature()
-        msg = self.messages.get("window_open_long", "Finestra aperta troppo a lungo. Clima non ripristinato.")
         msg = self._render_message(
-            msg,
+            "window_open_long",
+            "Finestra aperta troppo a lungo. Clima non ripristinato.",
             mode=self.season_mode,
             temp=self.get_option("temperature_summer" if self.season_mode=="summer" else "temperature_winter", None),
             fan=self.fan_mode_summer if self.season_mode=="summer" else self.fan_mode_winter,
@@ -1333,6 +1181,8 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         await self.disable_automations_by_shutdown()
 
     async def _on_climate_turned_on(self):
+        # Nuova accensione: la soglia temperatura torna ad essere valutata da capo
+        self._threshold.rearm()
         climate_state = self.hass.states.get(self.climate_entity)
         current_hvac = climate_state.state if climate_state else "unknown"
         current_temp = climate_state.attributes.get("temperature") if climate_state else None
@@ -1408,6 +1258,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                         self._window_timer = async_call_later(
                             self.hass, self.window_open_timeout, self._on_window_timeout
                         )
+                        self._track_window_deadline("timeout", self.window_open_timeout)
                         self._notify_timer_callbacks()
                     elif self.window_open_timeout <= 0:
                         _LOGGER.info(f"[{self.current_name}] ⏸️ Timer globale finestre disabilitato (timeout=0)")
@@ -1420,89 +1271,23 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                 # Spegnimento automazione interna (finestra bloccata)
                 self._internal_shutdown = True
                 # Prova prima con turn_off, poi fallback su set_hvac_mode
-                try:
-                    await self.hass.services.async_call(
-                        "climate", "turn_off", {"entity_id": self.climate_entity}, blocking=True
-                    )
-                except Exception as e:
-                    try:
-                        await self.hass.services.async_call(
-                            "climate", "set_hvac_mode", {"entity_id": self.climate_entity, "hvac_mode": "off"}, blocking=True
-                        )
-                    except Exception as e2:
-                        return
+                if not await self.commands.async_turn_off():
+                    return
                 
-                # Controlla se il clima è già spento (potrebbe essere istantaneo)
-                await asyncio.sleep(0.5)  # Piccolo ritardo per permettere al cambio di stato di propagarsi
-                current_state = self.hass.states.get(self.climate_entity)
+                # Attende lo spegnimento effettivo del clima (evento di stato, nessun polling)
+                await async_wait_for_state(
+                    self.hass, self.climate_entity, lambda s: s.state == "off", timeout=10
+                )
                 
-                if current_state and current_state.state == "off":
-                    pass
-                    
-                    # Se c'è binary sensor, aspetta che si aggiorni a "off"
-                    if self.climate_power_sensor:
-                        await self._wait_for_binary_sensor_state_change("off", timeout=30.0)
-                else:
-                    # Aspetta il cambio di stato a OFF tramite polling e listener
-                    climate_off_event = asyncio.Event()
-                    timeout_timer = None
-                    
-                    def on_climate_off(event):
-                        entity_id = event.data.get("entity_id")
-                        if entity_id == self.climate_entity:
-                            new_state = event.data.get("new_state")
-                            
-                            if new_state and new_state.state == "off":
-                                climate_off_event.set()
-                    
-                    def on_timeout(_):
-                        climate_off_event.set()
-                    
-                    # Polling alternativo ogni 0.5 secondi
-                    async def polling_check():
-                        for i in range(20):  # 10 secondi totali
-                            await asyncio.sleep(0.5)
-                            check_state = self.hass.states.get(self.climate_entity)
-                            if check_state and check_state.state == "off":
-                                climate_off_event.set()
-                                return
-                    
-                    # Registra listener per cambio stato clima
-                    unsub_listener = self.hass.bus.async_listen(
-                        "state_changed", 
-                        on_climate_off
-                    )
-                    
-                    # Timer di sicurezza 10 secondi
-                    timeout_timer = async_call_later(self.hass, 10, on_timeout)
-                    
-                    # Avvia polling in background
-                    polling_task = asyncio.create_task(polling_check())
-                    
-                    try:
-                        # Aspetta il cambio di stato a OFF o timeout
-                        await climate_off_event.wait()
-                        
-                        # Se c'è binary sensor, aspetta che si aggiorni a "off"
-                        if self.climate_power_sensor:
-                            await self._wait_for_binary_sensor_state_change("off", timeout=30.0)
-                    finally:
-                        # Pulisci listener, timer e task
-                        unsub_listener()
-                        if timeout_timer:
-                            timeout_timer()
-                        if not polling_task.done():
-                            polling_task.cancel()
+                # Se c'è binary sensor, aspetta che si aggiorni a "off"
+                if self.climate_power_sensor:
+                    await self._wait_for_binary_sensor_state_change("off", timeout=30.0)
                 
                 # Ora invia la notifica
-                # Usa messaggio specifico per clima bloccato all'accensione
-                msg = self.messages.get("window_blocked", "Clima bloccato per finestra aperta.")
-                if not msg or msg == "Clima bloccato per finestra aperta.":
-                    # Fallback: usa messaggio diverso dal normale window_open
-                    msg = "Clima bloccato per finestra aperta."
-                
+                # Usa messaggio specifico per clima bloccato all'accensione (diverso dal normale window_open)
                 msg = self._render_message(
-                    msg,
+                    "window_blocked",
+                    "Clima bloccato per finestra aperta.",
                     mode=self.season_mode,
                     temp=self.get_option("temperature_summer" if self.season_mode=="summer" else "temperature_winter", None),
                     fan=self.fan_mode_summer if self.season_mode=="summer" else self.fan_mode_winter,
@@ -1548,19 +1333,14 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         sensor_val = self._get_current_temperature()
         
         season = await self._get_season()
-        summer_threshold = float(self.get_option("summer_temp_threshold", 19))
-        winter_threshold = float(self.get_option("winter_temp_threshold", 25))
         
         # Controllo temperatura valida
         if sensor_val is None:
             # Spegnimento per sensore temperatura non valido: ferma anche i timer switch
             # NON impostare _internal_shutdown = True perché vogliamo fermare i timer
             self._ignore_next_state_change = True
-            await self.hass.services.async_call(
-                "climate", "turn_off", {"entity_id": self.climate_entity}, blocking=True
-            )
-            msg = self.messages.get("climate_blocked_temp", "Clima spento: sensore temperatura non valido.")
-            msg = self._render_message(msg, mode=season)
+            await self.commands.async_turn_off()
+            msg = self._render_message("climate_blocked_temp", "Clima spento: sensore temperatura non valido.", mode=season)
             if self.is_msg_enabled("climate_blocked_temp", "alexa") or self.is_msg_enabled("climate_blocked_temp", "push"):
                 await self._notify(msg, "climate_blocked_temp")
             return
@@ -1570,26 +1350,20 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         threshold_value = None
         season_mode = None
         
-        if season == "summer" and sensor_val < summer_threshold:
-            should_turn_off = True
-            threshold_value = summer_threshold
-            season_mode = "summer"
-        elif season == "winter" and sensor_val > winter_threshold:
+        if self._threshold.is_beyond(season, sensor_val):
             should_turn_off = True
-            threshold_value = winter_threshold
-            season_mode = "winter"
+            threshold_value = self._threshold.threshold_for(season)
+            season_mode = season
             
         if should_turn_off:
             # Spegnimento per soglia stagionale: ferma anche i timer switch dell'utente
             # NON impostare _internal_shutdown = True perché vogliamo fermare i timer
             self._ignore_next_state_change = True
-            await self.hass.services.async_call(
-                "climate", "turn_off", {"entity_id": self.climate_entity}, blocking=True
-            )
+            await self.commands.async_turn_off()
             msg_key = f"climate_blocked_{season_mode}"
-            msg_tpl = self.messages.get(msg_key, f"Clima spento: temperatura fuori soglia ({threshold_value}°C).")
             msg = self._render_message(
-                msg_tpl, 
+                msg_key,
+                f"Clima spento: temperatura fuori soglia ({threshold_value}°C).",
                 mode=season_mode, 
                 temp=sensor_val, 
                 sensor=sensor_val, 
@@ -1626,32 +1400,10 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         
         async def configure_in_background():
             try:
-                # 1. Imposta modalità HVAC
-                await self.hass.services.async_call(
-                    "climate", "set_hvac_mode", 
-                    {"entity_id": self.climate_entity, "hvac_mode": hvac_mode}, 
-                    blocking=False
-                )
-                await asyncio.sleep(0.3)
-                
-                # 2. Imposta temperatura
-                await self.hass.services.async_call(
-                    "climate", "set_temperature", 
-                    {"entity_id": self.climate_entity, "temperature": temperature}, 
-                    blocking=False
-                )
-                await asyncio.sleep(0.3)
+                # 1. Imposta modalità HVAC, temperatura e ventola (se configurata e supportata)
+                await self.commands.async_apply(hvac_mode=hvac_mode, temperature=temperature, fan_mode=fan_mode)
                 
-                # 3. Imposta ventola (se configurata e supportata)
-                if fan_mode:
-                    await self.hass.services.async_call(
-                        "climate", "set_fan_mode", 
-                        {"entity_id": self.climate_entity, "fan_mode": fan_mode}, 
-                        blocking=False
-                    )
-                    await asyncio.sleep(0.3)
-                
-                # 4. VERIFICA E RETRY - Controlla che le impostazioni siano state applicate
+                # 2. VERIFICA E RETRY - Controlla che le impostazioni siano state applicate
                 success = await self._verify_and_retry_climate_settings(hvac_mode, temperature, fan_mode)
                 
                 # Se c'è binary sensor, aspetta che si aggiorni a "on"
@@ -1671,11 +1423,13 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                     return
                 
                 # Messaggio personalizzato accensione (modificato per includere stato verifica)
-                msg_tpl = self.messages.get("climate_on_ok", "Acceso clima in modalità {{mode}} ventola {{fan}} temperatura {{temp}}")
+                msg_default = "Acceso clima in modalità {{mode}} ventola {{fan}} temperatura {{temp}}"
                 if success:
                     # Aggiunge informazione sul successo della verifica
                     msg = self._render_message(
-                        msg_tpl + " ✓",
+                        "climate_on_ok",
+                        msg_default,
+                        suffix=" ✓",
                         mode=hvac_mode,
                         temp=temperature,
                         fan=fan_mode,
@@ -1685,7 +1439,9 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                 else:
                     # Aggiunge warning se la verifica è fallita
                     msg = self._render_message(
-                        msg_tpl + " ⚠️ (verificare impostazioni)",
+                        "climate_on_ok",
+                        msg_default,
+                        suffix=" ⚠️ (verificare impostazioni)",
                         mode=hvac_mode,
                         temp=temperature,
                         fan=fan_mode,
@@ -1707,7 +1463,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         asyncio.create_task(configure_in_background())
 
     async def _verify_and_retry_climate_settings(self, expected_hvac_mode, expected_temperature, expected_fan_mode):
-        """Verifica che le impostazioni del clima siano corrette e riprova fino a 5 volte se necessario
+        """Verifica che le impostazioni del clima siano corrette, correggendole tramite il reconciler
         
         Args:
             expected_hvac_mode: Modalità HVAC attesa
@@ -1717,9 +1473,6 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         Returns:
             bool: True se le impostazioni sono corrette, False altrimenti
         """
-        max_retries = 24
-        retry_interval = 5.0  # 5 secondi tra ogni retry (24 retry in 120 secondi = 2 minuti)
-        
         # RILEVAMENTO AUTOMATICO CAPACITÀ DISPOSITIVO
         climate_state = self.hass.states.get(self.climate_entity)
         if not climate_state:
@@ -1743,83 +1496,10 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             _LOGGER.info(f"[{self.current_name}] ⚠️ Dispositivo non supporta fan mode, la ignoro")
             expected_fan_mode = None
         
-        for retry in range(max_retries):
-            # Aspetta un po' prima del controllo per dare tempo al dispositivo di sincronizzarsi
-            if retry == 0:
-                await asyncio.sleep(2.0)  # Prima verifica dopo 2 secondi
-            else:
-                await asyncio.sleep(retry_interval)
-            
-            # Verifica lo stato attuale
-            climate_state = self.hass.states.get(self.climate_entity)
-            if not climate_state or climate_state.state in ("off", "unknown", "unavailable"):
-                _LOGGER.warning(f"Climate entity {self.climate_entity} non disponibile durante verifica (retry {retry + 1}/{max_retries})")
-                continue
-            
-            # Controlla ogni impostazione
-            hvac_ok = climate_state.state == expected_hvac_mode
-            temp_ok = True  # Default OK se non supportato o non richiesto
-            fan_ok = True   # Default OK se non supportato o non richiesto
-            
-            # Controlla temperatura solo se supportata e richiesta
-            if expected_temperature is not None and supports_temperature:
-                actual_temp = climate_state.attributes.get("temperature")
-                temp_ok = actual_temp is not None and abs(float(actual_temp) - float(expected_temperature)) < 0.5
-            
-            # Controlla fan mode solo se supportato e richiesto
-            if expected_fan_mode is not None and supports_fan_mode:
-                actual_fan = climate_state.attributes.get("fan_mode")
-                fan_ok = actual_fan == expected_fan_mode
-            
-            # Se tutto è OK, esci con successo
-            if hvac_ok and temp_ok and fan_ok:
-                _LOGGER.info(f"Impostazioni clima verificate con successo (retry {retry + 1}/{max_retries})")
-                return True
-            
-            # Se non è l'ultimo retry, prova a correggere le impostazioni
-            if retry < max_retries - 1:
-                _LOGGER.warning(f"Impostazioni clima non corrette (retry {retry + 1}/{max_retries}). HVAC: {hvac_ok}, Temp: {temp_ok}, Fan: {fan_ok}")
-                
-                try:
-                    # IMPORTANTE: Applica prima HVAC mode, poi aspetta prima di applicare temperatura
-                    if not hvac_ok:
-                        await self.hass.services.async_call(
-                            "climate", "set_hvac_mode",
-                            {"entity_id": self.climate_entity, "hvac_mode": expected_hvac_mode},
-                            blocking=False
-                        )
-                        await asyncio.sleep(1.0)  # Aspetta di più per HVAC mode
-                    
-                    # Applica temperatura DOPO aver stabilizzato HVAC mode
-                    if not temp_ok and expected_temperature is not None and supports_temperature:
-                        try:
-                            await self.hass.services.async_call(
-                                "climate", "set_temperature",
-                                {"entity_id": self.climate_entity, "temperature": expected_temperature},
-                                blocking=True  # Blocking per assicurarsi che venga applicata
-                            )
-                            await asyncio.sleep(1.0)  # Aspetta di più per temperatura
-                        except Exception as e:
-                            _LOGGER.warning(f"[{self.current_name}] Errore impostazione temperatura: {e}")
-                    
-                    # Applica fan mode per ultimo
-                    if not fan_ok and expected_fan_mode is not None and supports_fan_mode:
-                        try:
-                            await self.hass.services.async_call(
-                                "climate", "set_fan_mode",
-                                {"entity_id": self.climate_entity, "fan_mode": expected_fan_mode},
-                                blocking=False
-                            )
-                            await asyncio.sleep(0.5)
-                        except Exception as e:
-                            _LOGGER.warning(f"[{self.current_name}] Errore impostazione fan mode: {e}")
-                        
-                except Exception as e:
-                    _LOGGER.error(f"Errore durante retry impostazioni clima: {e}")
-            else:
-                _LOGGER.error(f"FALLIMENTO: Impostazioni clima non applicate dopo {max_retries} tentativi. HVAC: {hvac_ok}, Temp: {temp_ok}, Fan: {fan_ok}")
-        
-        return False
+        # Verifica guidata dagli eventi di stato, correzioni con backoff esponenziale.
+        # Un nuovo target (o uno spegnimento) annulla questa verifica: in quel caso ritorna False
+        result = await self.reconciler.async_reconcile(expected_hvac_mode, expected_temperature, expected_fan_mode)
+        return bool(result)
 
     async def _restore_timers_after_restart(self, *_):
         """Ripristina i timer switch dopo un riavvio di Home Assistant
@@ -1830,7 +1510,13 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         IMPORTANTE: Se il clima è acceso al riavvio, abilita automaticamente l'automazione
         SOLO se lo switch automazione è abilitato.
         """
+        # Snapshot runtime letto al setup: ripreso una sola volta per caricamento
+        restored = self.runtime_store.restored
+        self.runtime_store.restored = {}
         try:
+            # Countdown timer ON/OFF: ripartono dalla scadenza assoluta salvata
+            await self._resume_countdown_timers(restored)
+            
             # Controlla se il clima è acceso
             climate_state = self.hass.states.get(self.climate_entity)
             is_climate_on = climate_state and climate_state.state != "off"
@@ -1838,38 +1524,13 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             _LOGGER.info(f"[{self.current_name}] 🔄 Ripristino al riavvio - Clima: {climate_state.state if climate_state else 'unknown'}, Automazione: {self.automation_enabled}")
             
             # CONTROLLO FONDAMENTALE: Verifica lo stato dello switch automazione
-            automation_switch_enabled = False
-            switch_found = False
-            
-            try:
-                # Cerca lo switch automazione tra le entità
-                entry_data = self.hass.data.get("climate_manager", {}).get(self.entry_id, {})
-                entities_data = entry_data.get("entities", {})
-                switch_entities = entities_data.get("switch", [])
-                
-                for switch in switch_entities:
-                    if hasattr(switch, '_attr_unique_id') and switch._attr_unique_id.endswith('_automation_switch'):
-                        automation_switch_enabled = switch.is_on
-                        switch_found = True
-                        _LOGGER.info(f"[{self.current_name}] 🔄 Switch automazione trovato - Stato: {'ON' if automation_switch_enabled else 'OFF'}")
-                        break
-                else:
-                    # Switch non trovato - probabilmente entità non ancora caricate al riavvio
-                    _LOGGER.debug(f"[{self.current_name}] 🔄 Switch automazione non ancora caricato - Ritento tra 10 secondi")
-                    switch_found = False
-                    automation_switch_enabled = False
-                    
-            except Exception as e:
-                _LOGGER.error(f"[{self.current_name}] 🔄 Errore controllo switch automazione: {e}")
-                automation_switch_enabled = False
-                switch_found = False
-            
-            # Se lo switch non è stato trovato, probabilmente le entità non sono ancora caricate
-            # Riprogramma un nuovo tentativo tra 10 secondi
-            if not switch_found:
-                _LOGGER.debug(f"[{self.current_name}] 🔄 Riprogrammando controllo switch automazione tra 10 secondi")
-                async_call_later(self.hass, 10, self._restore_timers_after_restart)
+            # (registrato nel setup della piattaforma switch, nessun polling necessario)
+            switch = self.handles.automation_switch
+            if switch is None:
+                _LOGGER.warning(f"[{self.current_name}] 🔄 Switch automazione non registrato - ripristino saltato")
                 return
+            automation_switch_enabled = switch.is_on
+            _LOGGER.info(f"[{self.current_name}] 🔄 Switch automazione trovato - Stato: {'ON' if automation_switch_enabled else 'OFF'}")
             
             # LOGICA PRINCIPALE: Lo switch automazione è il comando supremo
             if not automation_switch_enabled:
@@ -1897,6 +1558,19 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             elif not is_climate_on:
                 _LOGGER.info(f"[{self.current_name}] 🔄 Switch ON ma clima spento - Nessuna azione")
             
+            # Automazione sospesa da uno spegnimento manuale prima del riavvio: resta sospesa
+            # finché il clima è spento (lo switch restituisce solo lo stato ON/OFF dell'utente)
+            if self._automation_disabled_by_shutdown and self.automation_enabled:
+                if is_climate_on:
+                    self._automation_disabled_by_shutdown = False
+                else:
+                    _LOGGER.info(f"[{self.current_name}] 🔄 Automazione sospesa da spegnimento manuale prima del riavvio - rimane sospesa")
+                    self.automation_enabled = False
+                    self._notify_automation_status_callbacks()
+            
+            # Timer finestre e ripristino dello stato pre-finestra salvati prima del riavvio
+            await self._resume_window_timers(restored)
+            
             # Se l'automazione non è abilitata, non fare altro
             if not self.automation_enabled:
                 return
@@ -1916,30 +1590,98 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         except Exception as e:
             _LOGGER.error(f"[{self.current_name}] Errore durante ripristino al riavvio: {e}")
 
+    def _track_window_deadline(self, name, seconds):
+        """Registra la scadenza assoluta di un timer finestre (per lo snapshot runtime)"""
+        self._window_deadlines[name] = dt_util.utcnow() + timedelta(seconds=seconds)
+
+    def _active_window_deadlines(self):
+        """Scadenze (ISO) dei timer finestre ancora programmati"""
+        now = dt_util.utcnow()
+        active = {"timeout": self._window_timer, "off": self._window_off_timer, "on": self._window_on_timer}
+        return {
+            name: deadline_to_str(deadline)
+            for name, deadline in self._window_deadlines.items()
+            if active.get(name) and deadline > now
+        }
+
+    def _runtime_snapshot(self):
+        """Stato runtime da salvare su disco (chiamato dallo Store al momento della scrittura)"""
+        timers = {}
+        for key, sensor in (("timer_on", self.handles.timer_on_sensor), ("timer_off", self.handles.timer_off_sensor)):
+            state = sensor.runtime_state if sensor else None
+            if state:
+                timers[key] = state
+        return {
+            "climate_prev_state": self._climate_prev_state,
+            "window_open": self._window_open,
+            "window_timeout_expired": self._window_timeout_expired,
+            "automation_disabled_by_shutdown": self._automation_disabled_by_shutdown,
+            "automation_disabled_manually": self._automation_disabled_manually,
+            "locked_settings_override": self._locked_settings_override,
+            "window_deadlines": self._active_window_deadlines(),
+            "timers": timers,
+        }
+
+    def apply_runtime_snapshot(self, data):
+        """Ripristina i flag salvati prima del riavvio; i timer ripartono in _restore_timers_after_restart"""
+        if not data:
+            return
+        prev_state = data.get("climate_prev_state")
+        self._climate_prev_state = prev_state if isinstance(prev_state, dict) else None
+        self._window_timeout_expired = bool(data.get("window_timeout_expired", False))
+        self._automation_disabled_by_shutdown = bool(data.get("automation_disabled_by_shutdown", False))
+        self._automation_disabled_manually = bool(data.get("automation_disabled_manually", False))
+        override = data.get("locked_settings_override")
+        self._locked_settings_override = override if isinstance(override, dict) else None
+        _LOGGER.info(f"[{self.current_name}] 💾 Stato runtime ripristinato - Stato precedente: {self._climate_prev_state}, Sospesa da spegnimento: {self._automation_disabled_by_shutdown}")
+
+    async def _resume_countdown_timers(self, restored):
+        """Riprende i countdown ON/OFF attivi prima del riavvio dalla loro scadenza assoluta"""
+        now = dt_util.utcnow()
+        saved_timers = restored.get("timers") or {}
+        for key, switch in (("timer_on", self.handles.timer_on_switch), ("timer_off", self.handles.timer_off_switch)):
+            saved = saved_timers.get(key) or {}
+            ends_at = parse_deadline(saved.get("ends_at"))
+            if ends_at is None or switch is None or switch.is_on:
+                continue
+            if (now - ends_at).total_seconds() > RESTORE_GRACE_SEC:
+                _LOGGER.info(f"[{self.current_name}] 🔄 Timer {key} scaduto durante il riavvio ({ends_at}) - non ripreso")
+                continue
+            _LOGGER.info(f"[{self.current_name}] 🔄 Ripreso timer {key} con scadenza {ends_at}")
+            await switch.async_resume(ends_at, saved.get("total_seconds"))
+
+    async def _resume_window_timers(self, restored):
+        """Riprende timeout/spegnimento/ripristino finestre dalle scadenze salvate prima del riavvio"""
+        if not restored or not self.automation_enabled:
+            return
+        now = dt_util.utcnow()
+        deadlines = restored.get("window_deadlines") or {}
+        if self._window_open:
+            # Timeout globale: se è scaduto durante il riavvio viene eseguito subito
+            timeout = parse_deadline(deadlines.get("timeout"))
+            if timeout and not self._window_timer:
+                self._window_timer = async_track_point_in_utc_time(self.hass, self._on_window_timeout, max(timeout, now))
+                self._window_deadlines["timeout"] = timeout
+                _LOGGER.info(f"[{self.current_name}] 🔄 Ripreso timer globale finestre con scadenza {timeout}")
+                self._notify_timer_callbacks()
+            off = parse_deadline(deadlines.get("off"))
+            if off and (now - off).total_seconds() <= RESTORE_GRACE_SEC:
+                await self._on_window_open(off_delay=max(0.0, (off - now).total_seconds()))
+        elif self._climate_prev_state and (restored.get("window_open") or deadlines.get("on")):
+            # Finestre chiuse durante il riavvio (o ripristino già in attesa): ripristina lo stato salvato
+            on = parse_deadline(deadlines.get("on"))
+            on_delay = max(0.0, (on - now).total_seconds()) if on else None
+            _LOGGER.info(f"[{self.current_name}] 🔄 Finestre chiuse - ripristino dello stato salvato prima del riavvio")
+            await self._on_window_closed(on_delay=on_delay)
+
     async def _check_and_start_auto_timer(self):
         """Controlla se l'auto timer è attivo e avvia il timer di spegnimento"""
         try:
-            # Cerca lo switch auto timer
-            entry_data = self.hass.data.get("climate_manager", {}).get(self.entry_id, {})
-            entities_data = entry_data.get("entities", {})
-            switch_entities = entities_data.get("switch", [])
-            
-            auto_timer_switch = None
-            for switch in switch_entities:
-                if hasattr(switch, '_attr_unique_id') and switch._attr_unique_id.endswith('_auto_timer_switch'):
-                    auto_timer_switch = switch
-                    break
-            
+            auto_timer_switch = self.handles.auto_timer_switch
             if not auto_timer_switch or not auto_timer_switch.is_on:
                 return  # Auto timer non trovato o non attivo
             
-            # Cerca il timer OFF switch
-            timer_off_switch = None
-            for switch in switch_entities:
-                if hasattr(switch, '_attr_unique_id') and switch._attr_unique_id.endswith('_timer_off_switch'):
-                    timer_off_switch = switch
-                    break
-            
+            timer_off_switch = self.handles.timer_off_switch
             if not timer_off_switch:
                 return
             
@@ -1960,29 +1702,15 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         che devono continuare a funzionare per la logica interna dell'automazione.
         """
         try:
-            # Cerca tutti gli switch timer
-            entry_data = self.hass.data.get("climate_manager", {}).get(self.entry_id, {})
-            entities_data = entry_data.get("entities", {})
-            switch_entities = entities_data.get("switch", [])
-            
-            timer_stopped = False
-            
             # Ferma il timer di spegnimento se attivo
-            for switch in switch_entities:
-                if hasattr(switch, '_attr_unique_id') and switch._attr_unique_id.endswith('_timer_off_switch'):
-                    if switch.is_on:
-                        await switch.async_turn_off()
-                        timer_stopped = True
-                    break
+            switch = self.handles.timer_off_switch
+            if switch and switch.is_on:
+                await switch.async_turn_off()
             
             # Ferma il timer di accensione se attivo
-            for switch in switch_entities:
-                if hasattr(switch, '_attr_unique_id') and switch._attr_unique_id.endswith('_timer_on_switch'):
-                    if switch.is_on:
-                        await switch.async_turn_off()
-                        timer_stopped = True
-                    break
-            
+            switch = self.handles.timer_on_switch
+            if switch and switch.is_on:
+                await switch.async_turn_off()
             
         except Exception as e:
             pass
@@ -2013,34 +1741,20 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
     async def _stop_timer_countdown_sensors(self):
         """Ferma i sensori di countdown dei timer"""
         try:
-            # Ottieni le entità sensore per questo config entry
-            entities = self.hass.data["climate_manager"][self.entry_id]["entities"]["sensor"]
-            
             # Ferma il timer ON
-            for entity in entities:
-                if hasattr(entity, '_attr_unique_id') and "timer_on_countdown" in entity._attr_unique_id:
-                    await entity.stop_timer()
-                    break
+            if self.handles.timer_on_sensor:
+                await self.handles.timer_on_sensor.stop_timer()
             
             # Ferma il timer OFF
-            for entity in entities:
-                if hasattr(entity, '_attr_unique_id') and "timer_off_countdown" in entity._attr_unique_id:
-                    await entity.stop_timer()
-                    break
+            if self.handles.timer_off_sensor:
+                await self.handles.timer_off_sensor.stop_timer()
                     
         except Exception as e:
             _LOGGER.error(f"[{self.current_name}] Errore durante stop timer countdown sensors: {e}")
 
     async def _get_timer_on_notification_sensor(self):
         """Ottiene il sensore timer di notifica di accensione"""
-        try:
-            entities = self.hass.data["climate_manager"][self.entry_id]["entities"]["sensor"]
-            for entity in entities:
-                if hasattr(entity, '_attr_unique_id') and "timer_on_notification" in entity._attr_unique_id:
-                    return entity
-        except Exception as e:
-            _LOGGER.error(f"[{self.current_name}] Errore durante ricerca timer notification sensor: {e}")
-        return None
+        return self.handles.timer_on_notification_sensor
 
     async def _start_timer_on_notification(self):
         """Avvia il timer di notifica di accensione"""
@@ -2066,7 +1780,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             if sensor:
                 # Controlla se il timer è già in corso
                 if getattr(sensor, '_is_running', False):
-                    _LOGGER.info(f"[{self.current_name}] Timer notifica già in corso - NON riavviato (tempo accumulato: {getattr(sensor, '_elapsed_seconds', 0)}s)")
+                    _LOGGER.info(f"[{self.current_name}] Timer notifica già in corso - NON riavviato (tempo accumulato: {getattr(sensor, 'elapsed_seconds', 0)}s)")
                     return
                 else:
                     # Timer non in corso, avvialo
@@ -2160,67 +1874,49 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         _LOGGER.debug(f"[{self.current_name}] _alexa_targets: {self._alexa_targets}")
         _LOGGER.debug(f"[{self.current_name}] push_targets: {self.push_targets}")
         
+        deliveries = []
         # Notifica Alexa - solo se configurata e abilitata per questo messaggio
         if key and self.is_msg_enabled(key, "alexa") and self._alexa_targets:
             if self._is_notification_time("alexa"):
                 _LOGGER.debug(f"[{self.current_name}] Invio notifica Alexa a: {self._alexa_targets}")
                 for target in self._alexa_targets:
-                    data = {"message": message}
-                    try:
-                        if target.startswith("notify."):
-                            # Entità notify diretta (es. notify.sala_speak)
-                            await self.hass.services.async_call(
-                                "notify", "send_message",
-                                {
-                                    "message": message,
-                                    "entity_id": target
-                                },
-                                blocking=False
-                            )
-                            _LOGGER.debug(f"[{self.current_name}] Notifica Alexa (notify diretto) inviata a: {target}")
+                    if target.startswith("notify."):
+                        # Entità notify diretta (es. notify.sala_speak)
+                        call = ("notify", "send_message", {"message": message, "entity_id": target})
+                    else:
+                        # Target derivato da media_player: cerca prima il nuovo sistema notify
+                        notify_entity = self._resolve_alexa_notify_entity(target)
+                        if notify_entity:
+                            call = ("notify", "send_message", {"message": message, "entity_id": notify_entity})
                         else:
-                            # Target derivato da media_player: cerca prima il nuovo sistema notify
-                            notify_entity = await self._get_alexa_notify_entity(target)
-                            if notify_entity:
-                                await self.hass.services.async_call(
-                                    "notify", "send_message",
-                                    {
-                                        "message": message,
-                                        "entity_id": notify_entity
-                                    },
-                                    blocking=False
-                                )
-                                _LOGGER.debug(f"[{self.current_name}] Notifica Alexa (nuovo sistema) inviata a: {notify_entity}")
-                            else:
-                                # Vecchio sistema alexa_media
-                                await self.hass.services.async_call(
-                                    "notify", target,
-                                    data,
-                                    blocking=False
-                                )
-                                _LOGGER.debug(f"[{self.current_name}] Notifica Alexa (vecchio sistema) inviata a: notify.{target}")
-                    except Exception as e:
-                        _LOGGER.error(f"[{self.current_name}] Errore notifica Alexa {target}: {e}")
+                            # Vecchio sistema alexa_media
+                            call = ("notify", target, {"message": message})
+                    deliveries.append(NotificationDelivery("alexa", target, [call]))
         
         # Notifica Push - solo se configurata e abilitata per questo messaggio  
         if key and self.is_msg_enabled(key, "push") and self.push_targets:
             if self._is_notification_time("push"):
                 for target in self.push_targets:
-                    # Rimuovi il prefisso 'notify.' se presente
-                    service_name = target
-                    if service_name.startswith('notify.'):
-                        service_name = service_name[7:]  # Rimuovi 'notify.'
-                    
-                    data = {"message": message}
-                    try:
-                        await self.hass.services.async_call(
-                            "notify", service_name,
-                            data,
-                            blocking=False
-                        )
-                        _LOGGER.debug(f"[{self.current_name}] Notifica Push inviata a: notify.{service_name}")
-                    except Exception as e:
-                        _LOGGER.error(f"[{self.current_name}] Errore notifica Push notify.{service_name}: {e}")
+                    service_name = self._push_service_name(target)
+                    deliveries.append(NotificationDelivery("push", f"notify.{service_name}", [("notify", service_name, {"message": message})]))
+        
+        # Eventi che coinvolgono più stanze insieme: raccolti per qualche secondo e uniti per target
+        window = float(self.get_option(CONF_NOTIFY_AGGREGATION_WINDOW, DEFAULT_NOTIFY_AGGREGATION_WINDOW) or 0)
+        if deliveries and key in AGGREGATED_MESSAGE_KEYS and window > 0:
+            async_get_aggregator(self.hass).async_submit(
+                self.notifier, key,
+                self.get_option("room_name") or self.current_name,
+                deliveries, window,
+                lang=self.get_option("lingua", "it"),
+            )
+            return
+        # Invio in parallelo e in background: un target lento non blocca gli altri né il chiamante
+        self.notifier.async_send(deliveries)
+
+    @staticmethod
+    def _push_service_name(target):
+        # Rimuovi il prefisso 'notify.' se presente
+        return target[7:] if target.startswith("notify.") else target
 
     def _build_alexa_targets(self, alexa_entities: list) -> list:
         """Costruisce la lista target Alexa gestendo sia media_player.* che notify.* entities."""
@@ -2234,10 +1930,11 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                 targets.append(f"alexa_media_{entity.split('.')[-1]}")
         return targets
 
-    async def _get_alexa_notify_entity(self, alexa_target):
+    def _resolve_alexa_notify_entity(self, alexa_target):
         """
         Rileva se esiste un'entità notify per il nuovo sistema Alexa.
         Controlla per entità con suffisso _speak e _announce.
+        Il risultato è memorizzato per target e invalidato dagli eventi entity_registry_updated.
         
         Args:
             alexa_target: Target nel formato alexa_media_{device}
@@ -2248,22 +1945,38 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         # Estrai il nome del dispositivo dal target alexa_media
         if not alexa_target.startswith("alexa_media_"):
             return None
+        if alexa_target in self._alexa_notify_cache:
+            return self._alexa_notify_cache[alexa_target]
             
         device_name = alexa_target.replace("alexa_media_", "")
         
-        # Controlla se esistono entità notify con i nuovi suffissi
+        # Controlla se esistono entità notify con i nuovi suffissi (stato o registry)
         possible_entities = [
             f"notify.{device_name}_speak",
             f"notify.{device_name}_announce"
         ]
-        
+        registry = er.async_get(self.hass)
+        notify_entity = None
         for entity_id in possible_entities:
-            if self.hass.states.get(entity_id) is not None:
+            if self.hass.states.get(entity_id) is not None or registry.async_get(entity_id) is not None:
                 _LOGGER.debug(f"[{self.current_name}] Trovata entità notify Alexa: {entity_id}")
-                return entity_id
-                
-        _LOGGER.debug(f"[{self.current_name}] Nessuna entità notify trovata per {device_name}, uso sistema legacy")
-        return None
+                notify_entity = entity_id
+                break
+        else:
+            _LOGGER.debug(f"[{self.current_name}] Nessuna entità notify trovata per {device_name}, uso sistema legacy")
+        self._alexa_notify_cache[alexa_target] = notify_entity
+        return notify_entity
+
+    def _is_alexa_related_entity(self, entity_id):
+        """True se entity_id è un media_player o un'entità notify di uno dei dispositivi Alexa già risolti"""
+        if not entity_id or not entity_id.startswith(("notify.", "media_player.")):
+            return False
+        object_id = entity_id.split(".", 1)[1]
+        for target in self._alexa_notify_cache:
+            device_name = target[len("alexa_media_"):]
+            if object_id in (device_name, f"{device_name}_speak", f"{device_name}_announce"):
+                return True
+        return False
 
     async def _notify_push_only(self, message: str, key: str = None):
         """Invia notifiche solo tramite push (non Alexa) - per conferme azioni interattive"""
@@ -2300,21 +2013,10 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         # Notifica Push - solo se configurata e abilitata per questo messaggio  
         if self.push_targets:
             if self._is_notification_time("push"):
-                for target in self.push_targets:
-                    # Rimuovi il prefisso 'notify.' se presente
-                    service_name = target
-                    if service_name.startswith('notify.'):
-                        service_name = service_name[7:]  # Rimuovi 'notify.'
-                    
-                    data = {"message": message}
-                    try:
-                        await self.hass.services.async_call(
-                            "notify", service_name,
-                            data,
-                            blocking=False
-                        )
-                    except Exception:
-                        pass
+                self.notifier.async_send([
+                    NotificationDelivery("push", f"notify.{service_name}", [("notify", service_name, {"message": message})])
+                    for service_name in map(self._push_service_name, self.push_targets)
+                ])
 
     async def _clear_notification(self):
         """Cancella solo la notifica originale senza inviare conferma"""
@@ -2323,34 +2025,25 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             
         # Cancella notifica Push - solo se configurata
         if self.push_targets:
-            for target in self.push_targets:
-                # Rimuovi il prefisso 'notify.' se presente
-                service_name = target
-                if service_name.startswith('notify.'):
-                    service_name = service_name[7:]  # Rimuovi 'notify.'
-                
-                try:
-                    if "telegram" in service_name.lower():
-                        # Per Telegram: non possiamo cancellare messaggi precedenti
-                        pass
-                    else:
-                        # Per notifiche push: cancella la notifica originale
-                        try:
-                            await self.hass.services.async_call(
-                                "notify", service_name,
-                                {
-                                    "message": "clear_notification",
-                                    "data": {
-                                        "tag": f"climate_timer_{self.entry_id}"  # Cancella la notifica specifica
-                                    }
-                                },
-                                blocking=False
-                            )
-                        except Exception:
-                            pass  # Ignora errori di cancellazione
-                            
-                except Exception:
-                    pass
+            deliveries = []
+            for service_name in map(self._push_service_name, self.push_targets):
+                # Per Telegram: non possiamo cancellare messaggi precedenti
+                if "telegram" in service_name.lower():
+                    continue
+                # Per notifiche push: cancella la notifica originale (errori ignorati)
+                deliveries.append(NotificationDelivery("push", f"notify.{service_name}", prelude=[self._clear_timer_notification_call(service_name)]))
+            self.notifier.async_send(deliveries)
+
+    def _clear_timer_notification_call(self, service_name):
+        return (
+            "notify", service_name,
+            {
+                "message": "clear_notification",
+                "data": {
+                    "tag": f"climate_timer_{self.entry_id}"  # Cancella la notifica specifica
+                }
+            },
+        )
 
     async def _clear_and_notify_push(self, message: str):
         """Cancella la notifica originale e invia una nuova notifica di conferma"""
@@ -2363,56 +2056,30 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             import uuid
             new_notification_id = f"climate_confirm_{uuid.uuid4().hex[:8]}"
             
-            for target in self.push_targets:
-                # Rimuovi il prefisso 'notify.' se presente
-                service_name = target
-                if service_name.startswith('notify.'):
-                    service_name = service_name[7:]  # Rimuovi 'notify.'
-                
-                try:
-                    if "telegram" in service_name.lower():
-                        # Per Telegram: invia solo messaggio di conferma (non possiamo cancellare messaggi precedenti)
-                        await self.hass.services.async_call(
-                            "notify", service_name,
-                            {
-                                "message": message,
-                                "title": f"🔥 Climate Manager - {self.current_name}"
-                            },
-                            blocking=False
-                        )
-                    else:
-                        # Per notifiche push: prima cancella la notifica originale, poi invia conferma
-                        # Cancella la notifica con tag specifico
-                        try:
-                            await self.hass.services.async_call(
-                                "notify", service_name,
-                                {
-                                    "message": "clear_notification",
-                                    "data": {
-                                        "tag": f"climate_timer_{self.entry_id}"  # Cancella la notifica specifica
-                                    }
-                                },
-                                blocking=False
-                            )
-                        except Exception:
-                            pass  # Ignora errori di cancellazione
-                        
-                        # Invia nuova notifica di conferma
-                        await self.hass.services.async_call(
-                            "notify", service_name,
-                            {
-                                "message": message,
-                                "title": f"🔥 Climate Manager - {self.current_name}",
-                                "data": {
-                                    "tag": new_notification_id,
-                                    "persistent": False  # Non persistente per conferma
-                                }
-                            },
-                            blocking=False
-                        )
-                    
-                except Exception:
-                    pass
+            title = f"🔥 Climate Manager - {self.current_name}"
+            deliveries = []
+            for service_name in map(self._push_service_name, self.push_targets):
+                if "telegram" in service_name.lower():
+                    # Per Telegram: invia solo messaggio di conferma (non possiamo cancellare messaggi precedenti)
+                    deliveries.append(NotificationDelivery(
+                        "push", f"notify.{service_name}",
+                        [("notify", service_name, {"message": message, "title": title})],
+                    ))
+                else:
+                    # Per notifiche push: prima cancella la notifica originale, poi invia conferma
+                    deliveries.append(NotificationDelivery(
+                        "push", f"notify.{service_name}",
+                        [("notify", service_name, {
+                            "message": message,
+                            "title": title,
+                            "data": {
+                                "tag": new_notification_id,
+                                "persistent": False  # Non persistente per conferma
+                            }
+                        })],
+                        prelude=[self._clear_timer_notification_call(service_name)],
+                    ))
+            self.notifier.async_send(deliveries)
 
     async def _update_season(self, *_):
         if self.season_mode == "auto":
@@ -2443,6 +2110,12 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             remove()
         self._remove_listeners = []
 
+    @callback
+    def async_persist_options(self, updates):
+        """Applica subito updates e ne accoda la scrittura nella config entry (vedi OptionsWriteBuffer)."""
+        self._update_options_safely(updates)
+        return self.options_buffer.async_update(updates)
+
     def _update_options_safely(self, updates):
         """Aggiorna self._options in modo sicuro, gestendo i mappingproxy"""
         try:
@@ -2454,6 +2127,7 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             if hasattr(self._options, '_data'):  # È un mappingproxy
                 self._options = dict(self._options)
             
+            changed = {k for k, v in updates.items() if self._options.get(k) != v}
             # Gestisci esplicitamente i valori vuoti
             for key, value in updates.items():
                 # Se il valore è None o stringa vuota, imposta esplicitamente una stringa vuota
@@ -2464,8 +2138,13 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         except (TypeError, AttributeError):
             # Fallback: crea un nuovo dizionario
             current = dict(self._options) if self._options else {}
+            changed = {k for k, v in updates.items() if current.get(k) != v}
             current.update(updates)
             self._options = current
+        if "messages" in changed:
+            self._compile_messages()
+        if changed:
+            self._notify_options_change_callbacks(changed)
 
     @property
     def window_timeout_expired(self):
@@ -2568,44 +2247,30 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self.remove_listeners()
         # Ri-registra i listener sulle nuove entità
         hass = self.hass
-        def update_group_state(*_):
-            # Usa la stessa logica di filtro per stati validi, con ultimo stato valido per sensori offline
-            window_states = []
-            for ent in self.window_entities:
-                state = hass.states.get(ent)
-                if state and state.state not in ("unknown", "unavailable"):
-                    # Sensore online: aggiorna l'ultimo stato valido e usa quello corrente
-                    is_open = state.state == "on"
-                    self._last_valid_window_states[ent] = is_open
-                    window_states.append(is_open)
-                elif ent in self._last_valid_window_states:
-                    # Sensore offline: usa l'ultimo stato valido noto
-                    window_states.append(self._last_valid_window_states[ent])
-                else:
-                    # Sensore mai visto prima: assume chiuso per sicurezza
-                    window_states.append(False)
-            
-            if window_states:
-                any_open = any(window_states)
-                self._window_open = any_open
-                self._notify_window_state_callbacks()
-        update_group_state()
+        # Le transizioni in attesa si riferiscono alla vecchia lista di sensori
+        self._window_debouncer.cancel()
+        # Stato iniziale del gruppo finestre (mantiene l'ultimo stato valido dei sensori già noti)
+        if self.window_entities:
+            self._window_open = self._window_group.sync(hass, self.window_entities)
+            self._notify_window_state_callbacks()
+        else:
+            self._window_group.sync(hass, [])
+        # Tutti i listener passano dal dispatcher di dominio: una sola sottoscrizione
+        # per tipo di evento, instradata per entity_id
+        dispatcher = async_get_dispatcher(hass)
         for ent in self.window_entities:
             self._remove_listeners.append(
-                async_track_state_change_event(hass, [ent], self._handle_window_state)
+                dispatcher.async_track_entity(ent, self._handle_window_state)
             )
+        # Un solo handler sul clima: blocco impostazioni + gestione stato
         self._remove_listeners.append(
-            async_track_state_change_event(
-                self.hass, [self.climate_entity], self._handle_climate_state
-            )
+            dispatcher.async_track_entity(self.climate_entity, self._handle_climate_event)
         )
         # Aggiungi listener per il sensore di temperatura o per il climate entity
         if self.temperature_sensor:
             # Se c'è un sensore esterno, usa quello
             self._remove_listeners.append(
-                async_track_state_change_event(
-                    self.hass, [self.temperature_sensor], self._handle_temperature_state
-                )
+                dispatcher.async_track_entity(self.temperature_sensor, self._handle_temperature_state)
             )
         else:
             # Se non c'è sensore esterno, ascolta il climate entity per temperature changes
@@ -2614,46 +2279,60 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         # Aggiungi listener per il binary sensor di accensione clima (se configurato)
         if self.climate_power_sensor:
             self._remove_listeners.append(
-                async_track_state_change_event(
-                    self.hass, [self.climate_power_sensor], self._handle_climate_power_state
-                )
+                dispatcher.async_track_entity(self.climate_power_sensor, self._handle_climate_power_state)
             )
+        # Entità clima ri-registrata (es. cambio integrazione): l'attributo temperatura va riscoperto
+        self._temperature_resolver.invalidate()
+        self._remove_listeners.append(
+            dispatcher.async_track_entity_registry_updated(self._handle_entity_registry_updated)
+        )
+        # Listener per azioni interattive delle notifiche push (instradate per entry_id)
+        self._remove_listeners.append(
+            dispatcher.async_track_notification_action(self.entry_id, self._handle_notification_action)
+        )
 
     @property
     def options(self):
         return self._options
 
+    def needs_reload(self, value):
+        """True se le nuove options richiedono il reload completo (modifiche strutturali)"""
+        new_climate = (value or {}).get("climate_entity") or self.config.get("climate_entity")
+        return new_climate != self.climate_entity
+
     async def async_set_options(self, value):
-        old_sensor = getattr(self, 'temperature_sensor', None)
+        """Applica le nuove options confrontandole con quelle correnti, senza reload.
+
+        I listener vengono ri-registrati solo se cambiano le liste di entità monitorate;
+        tutti gli altri valori sono letti dinamicamente o aggiornati qui sul posto.
+        Ritorna l'insieme delle chiavi cambiate.
+        """
+        value = dict(value or {})
+        old_options = dict(self._options or {})
+        changed = {k for k in set(old_options) | set(value) if old_options.get(k) != value.get(k)}
+        if not changed:
+            return changed
+
         new_sensor = value.get("temperature_sensor", self.config.get("temperature_sensor"))
         # Gestisci stringa speciale "__NONE__" come None
         if new_sensor == "__NONE__":
             new_sensor = None
-        if old_sensor != new_sensor:
-            pass
-        old_climate = getattr(self, 'climate_entity', None)
-        new_climate = value.get("climate_entity", self.config.get("climate_entity"))
-        if old_climate != new_climate:
-            pass
-        old_windows = getattr(self, 'window_entities', None)
         new_windows = value.get("window_sensors", self.config.get("window_sensors"))
-        if old_windows != new_windows:
-            pass
-        old_alexa = getattr(self, 'alexa_media', None)
-        new_alexa = value.get("alexa_media", self.config.get("alexa_media"))
-        if old_alexa != new_alexa:
-            pass
-        old_power_sensor = getattr(self, 'climate_power_sensor', None)
+        if isinstance(new_windows, str):
+            new_windows = [e.strip() for e in new_windows.split(",") if e.strip()]
         new_power_sensor = value.get("climate_power_sensor", self.config.get("climate_power_sensor"))
         # Gestisci stringhe vuote come None
         if new_power_sensor == "":
             new_power_sensor = None
-        if old_power_sensor != new_power_sensor:
-            pass
-        old_season = getattr(self, 'season_mode', None)
+        new_alexa = value.get("alexa_media", self.config.get("alexa_media"))
         new_season = value.get("season", self.config.get("season", "auto"))
-        if old_season != new_season:
-            pass
+
+        listeners_changed = (
+            new_sensor != self.temperature_sensor
+            or new_power_sensor != self.climate_power_sensor
+            or list(new_windows or []) != list(self.window_entities or [])
+        )
+        season_changed = new_season != self.season_mode
         
         # Controlla se il nome è cambiato
         old_name = self.config.get("name")
@@ -2663,10 +2342,18 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         self.season_mode = new_season
         self._options = value
         self.temperature_sensor = new_sensor
-        self.climate_entity = new_climate
         self.climate_power_sensor = new_power_sensor
-        self.alexa_media = new_alexa
-        self._alexa_targets = self._build_alexa_targets(self.alexa_media)
+        if new_alexa != self.alexa_media:
+            self.alexa_media = new_alexa
+            self._alexa_targets = self._build_alexa_targets(self.alexa_media)
+            self._alexa_notify_cache.clear()
+        self._fan_mode_summer = self.get_option("fan_mode_summer", "medium")
+        self._fan_mode_winter = self.get_option("fan_mode_winter", "medium")
+        self.commands.min_interval = float(self.get_option(CONF_COMMAND_MIN_INTERVAL, DEFAULT_COMMAND_MIN_INTERVAL))
+        self._configure_window_debouncer()
+        self._configure_threshold()
+        if "messages" in changed:
+            self._compile_messages()
         
         # Se il nome è cambiato, aggiorna anche il config (non solo le options)
         if name_changed and new_name:
@@ -2679,11 +2366,30 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             entry = next((e for e in self.hass.config_entries.async_entries("climate_manager") if e.entry_id == self.entry_id), None)
             if entry:
                 self.hass.config_entries.async_update_entry(entry, title=new_name)
-            # Forza l'aggiornamento delle entità che usano il nome
-            await self._update_entities_names()
         
-        self.update_window_entities()
-        await self._update_season()
+        if listeners_changed:
+            _LOGGER.info(f"[{self.current_name}] Entità monitorate cambiate: ri-registro i listener")
+            self.update_window_entities()
+        if season_changed:
+            await self._update_season()
+
+        self._notify_options_change_callbacks(changed)
+        # Aggiorna lo stato di tutte le entità (nomi e attributi derivati dalle options)
+        await self._update_entities_names()
+        return changed
+
+    def register_options_change_callback(self, cb):
+        if not hasattr(self, '_options_change_callbacks'):
+            self._options_change_callbacks = []
+        self._options_change_callbacks.append(cb)
+
+    def _notify_options_change_callbacks(self, changed_keys):
+        if hasattr(self, '_options_change_callbacks'):
+            for cb in self._options_change_callbacks:
+                try:
+                    cb(changed_keys)
+                except Exception:
+                    pass
 
     async def _update_entities_names(self):
         """Forza l'aggiornamento dei nomi delle entità quando il nome della configurazione cambia"""
@@ -2701,46 +2407,6 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             self._name_change_callbacks = []
         self._name_change_callbacks.append(callback)
 
-    async def refresh_settings_from_sensor(self):
-        """Aggiorna le options del coordinatore leggendo dal sensore settings corrente"""
-        try:
-            # Cerca il sensore settings associato a questa climate entity
-            settings_entity_id = None
-            for entity_id in self.hass.states.async_entity_ids():
-                if entity_id.startswith('sensor.climate_manager_settings_'):
-                    state_obj = self.hass.states.get(entity_id)
-                    if (
-                        state_obj and
-                        hasattr(state_obj, 'attributes') and
-                        state_obj.attributes and
-                        state_obj.attributes.get('climate_entity') == self.climate_entity
-                    ):
-                        settings_entity_id = entity_id
-                        break
-            
-            if settings_entity_id:
-                settings_state = self.hass.states.get(settings_entity_id)
-                if settings_state and settings_state.attributes:
-                    # Aggiorna le options con i valori dal sensore settings
-                    updates = {}
-                    for key, value in settings_state.attributes.items():
-                        if key not in ['friendly_name', 'unit_of_measurement', 'device_class']:
-                            updates[key] = value
-                    if updates:
-                        self._update_options_safely(updates)
-                    
-                    # Aggiorna le proprietà cached
-                    self._fan_mode_summer = self._options.get("fan_mode_summer", "medium")
-                    self._fan_mode_winter = self._options.get("fan_mode_winter", "medium")
-                    self.season_mode = self._options.get("season", "auto")
-                    await self._update_season()
-                    
-                    return True
-        except Exception:
-            pass
-            
-        return False
-
     def _validate_climate_state(self, expected_hvac_mode=None, expected_temperature=None, expected_fan_mode=None):
         """Convalida che le impostazioni siano state applicate al clima"""
         climate_state = self.hass.states.get(self.climate_entity)
@@ -2804,46 +2470,27 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
         if not initial_state:
             return
         
-        initial_hvac = initial_state.state
-        initial_temp = initial_state.attributes.get("temperature")
-        initial_fan = initial_state.attributes.get("fan_mode")
-        
-        start_time = asyncio.get_event_loop().time()
+        initial = (
+            initial_state.state,
+            initial_state.attributes.get("temperature"),
+            initial_state.attributes.get("fan_mode"),
+        )
         
-        while (asyncio.get_event_loop().time() - start_time) < timeout:
-            await asyncio.sleep(0.1)  # Controlla ogni 100ms
-            
-            current_state = self.hass.states.get(self.climate_entity)
-            if not current_state:
-                continue
-                
-            current_hvac = current_state.state
-            current_temp = current_state.attributes.get("temperature")
-            current_fan = current_state.attributes.get("fan_mode")
-            
-            # Controlla se c'è stato un cambio in almeno uno degli attributi
-            if (current_hvac != initial_hvac or 
-                current_temp != initial_temp or 
-                current_fan != initial_fan):
-                return
+        # Si risveglia al primo cambio di hvac, temperatura o ventola
+        await async_wait_for_state(
+            self.hass,
+            self.climate_entity,
+            lambda s: (s.state, s.attributes.get("temperature"), s.attributes.get("fan_mode")) != initial,
+            timeout,
+        )
 
     async def _wait_for_binary_sensor_state_change(self, expected_state, timeout=30.0):
         """Aspetta che il binary sensor cambi allo stato atteso o che scada il timeout"""
         if not self.climate_power_sensor:
-            return False        
-        start_time = asyncio.get_event_loop().time()
-        
-        while (asyncio.get_event_loop().time() - start_time) < timeout:
-            await asyncio.sleep(0.2)  # Controlla ogni 200ms (più lento per sensori di potenza)
-            
-            current_state = self.hass.states.get(self.climate_power_sensor)
-            if not current_state or current_state.state == "unavailable":
-                continue
-                
-            if current_state.state == expected_state:
-                return True
-        
-        return False
+            return False
+        return await async_wait_for_state(
+            self.hass, self.climate_power_sensor, lambda s: s.state == expected_state, timeout
+        )
 
     async def _enforce_locked_settings(self):
         """Forza le impostazioni configurate quando il blocco è attivo - SOLO se il clima è già acceso"""
@@ -2887,155 +2534,107 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                 target_preset_mode = None
             
             # Applica le impostazioni SOLO se il clima è già acceso
-            await self.hass.services.async_call(
-                'climate', 'set_hvac_mode',
-                {'entity_id': self.climate_entity, 'hvac_mode': target_hvac_mode}
-            )
-            
-            await self.hass.services.async_call(
-                'climate', 'set_temperature',
-                {'entity_id': self.climate_entity, 'temperature': target_temperature}
-            )
-            
-            if target_fan_mode:
-                await self.hass.services.async_call(
-                    'climate', 'set_fan_mode',
-                    {'entity_id': self.climate_entity, 'fan_mode': target_fan_mode}
-                )
-                
-            if target_preset_mode:
-                await self.hass.services.async_call(
-                    'climate', 'set_preset_mode',
-                    {'entity_id': self.climate_entity, 'preset_mode': target_preset_mode}
-                )
+            self.reconciler.set_target(target_hvac_mode, target_temperature, target_fan_mode, target_preset_mode)
             
         except Exception:
             pass
 
+    async def _get_locked_target(self):
+        """Impostazioni protette dal blocco (override del timer o configurazione stagionale)"""
+        if self._locked_settings_override:
+            target_hvac_mode = self._locked_settings_override.get("hvac_mode")
+            target_temperature = self._locked_settings_override.get("temperature")
+            target_fan_mode = self._locked_settings_override.get("fan_mode")
+            target_preset_mode = self._locked_settings_override.get("preset_mode")
+        else:
+            season = await self._get_season()
+            if season == "winter":
+                target_hvac_mode = self.get_option("hvac_mode_winter", "heat")
+                target_temperature = float(self.get_option("temperature_winter", 21))
+                target_fan_mode = self.fan_mode_winter
+                target_preset_mode = self.get_option("preset_mode_winter", None)
+            else:
+                target_hvac_mode = self.get_option("hvac_mode_summer", "cool")
+                target_temperature = float(self.get_option("temperature_summer", 21))
+                target_fan_mode = self.fan_mode_summer
+                target_preset_mode = self.get_option("preset_mode_summer", None)
+        
+        # Verifica compatibilità modalità
+        if not self._check_hvac_mode_compatibility(target_hvac_mode):
+            _LOGGER.warning(f"[{self.current_name}] 🔒 HVAC mode {target_hvac_mode} non compatibile - blocco annullato")
+            return None
+        if target_fan_mode and not self._check_fan_mode_compatibility(target_fan_mode):
+            target_fan_mode = None
+        if target_preset_mode and not self._check_preset_mode_compatibility(target_preset_mode):
+            target_preset_mode = None
+        return {
+            "hvac_mode": target_hvac_mode,
+            "temperature": target_temperature,
+            "fan_mode": target_fan_mode,
+            "preset_mode": target_preset_mode,
+        }
+
     async def _check_and_restore_locked_settings(self, *_):
-        """Ripristina le impostazioni bloccate quando cambiano - SOLO se il clima è già acceso."""
-        # MUTEX: previene esecuzioni concorrenti (stesso comportamento per check reattivo e periodico)
+        """Ripristina le impostazioni bloccate quando cambiano - SOLO se il clima è già acceso.
+
+        Ritorna True se è stata avviata una correzione.
+        """
+        # MUTEX: previene esecuzioni concorrenti (stesso comportamento per evento e watchdog)
         if self._settings_restore_in_progress:
+            self.lock_stats["suppressed_loops"] += 1
             _LOGGER.debug(f"[{self.current_name}] 🔒 Ripristino già in corso, skip")
-            return
+            return False
         try:
             self._settings_restore_in_progress = True
             
             if not self._settings_locked:
-                return
+                return False
             
             # PROTEZIONE SPEGNIMENTO
             if self._shutdown_in_progress:
                 _LOGGER.info(f"[{self.current_name}] ⏹️ Spegnimento in corso - blocco impostazioni disabilitato")
-                return
+                return False
             
             # Non accendere il clima se è spento: solo mantenere le impostazioni quando è acceso
             climate_state = self.hass.states.get(self.climate_entity)
             if not climate_state or climate_state.state in ("off", "unknown", "unavailable"):
                 _LOGGER.info(f"[{self.current_name}] ⏹️ Clima non attivo - blocco impostazioni in pausa")
-                return
+                return False
             
-            # Determina le impostazioni target
-            if self._locked_settings_override:
-                target_hvac_mode = self._locked_settings_override.get("hvac_mode")
-                target_temperature = self._locked_settings_override.get("temperature")
-                target_fan_mode = self._locked_settings_override.get("fan_mode")
-                target_preset_mode = self._locked_settings_override.get("preset_mode")
-            else:
-                season = await self._get_season()
-                if season == "summer":
-                    target_hvac_mode = self.get_option("hvac_mode_summer", "cool")
-                    target_temperature = float(self.get_option("temperature_summer", 21))
-                    target_fan_mode = self.fan_mode_summer
-                    target_preset_mode = self.get_option("preset_mode_summer", None)
-                elif season == "winter":
-                    target_hvac_mode = self.get_option("hvac_mode_winter", "heat")
-                    target_temperature = float(self.get_option("temperature_winter", 21))
-                    target_fan_mode = self.fan_mode_winter
-                    target_preset_mode = self.get_option("preset_mode_winter", None)
-                else:
-                    target_hvac_mode = self.get_option("hvac_mode_summer", "cool")
-                    target_temperature = float(self.get_option("temperature_summer", 21))
-                    target_fan_mode = self.fan_mode_summer
-                    target_preset_mode = self.get_option("preset_mode_summer", None)
-            
-            # Verifica compatibilità modalità
-            if not self._check_hvac_mode_compatibility(target_hvac_mode):
-                _LOGGER.warning(f"[{self.current_name}] 🔒 HVAC mode {target_hvac_mode} non compatibile - blocco annullato")
-                return
-            if target_fan_mode and not self._check_fan_mode_compatibility(target_fan_mode):
-                target_fan_mode = None
-            if target_preset_mode and not self._check_preset_mode_compatibility(target_preset_mode):
-                target_preset_mode = None
+            target = await self._get_locked_target()
+            if not target:
+                return False
             
             # Controlla se tutto è già corretto (guard anti-loop).
-            curr = self.hass.states.get(self.climate_entity)
-            if curr and curr.state not in ("off", "unknown", "unavailable"):
-                curr_hvac = curr.state
-                curr_temp = curr.attributes.get("temperature")
-                curr_fan = curr.attributes.get("fan_mode")
-                hvac_ok = curr_hvac == target_hvac_mode
-                # Se il device non riporta temperatura (es. modalità dry/fan_only su alcuni device),
-                # considera la temperatura come già corretta per evitare loop infiniti.
-                if curr_temp is None:
-                    temp_ok = True
-                else:
-                    temp_ok = abs(float(curr_temp) - float(target_temperature)) < 0.5
-                fan_ok = (not target_fan_mode) or (curr_fan == target_fan_mode)
-                if hvac_ok and temp_ok and fan_ok:
-                    _LOGGER.debug(f"[{self.current_name}] 🔒 Impostazioni già corrette, nessun ripristino necessario")
-                    return
+            wrong = self.reconciler.mismatches(climate_state, target)
+            if not wrong:
+                _LOGGER.debug(f"[{self.current_name}] 🔒 Impostazioni già corrette, nessun ripristino necessario")
+                return False
+            
+            # Una convergenza verso lo stesso target è già in corso: gli eventi intermedi
+            # del dispositivo non devono generare altri comandi (evita loop di correzione)
+            if self.reconciler.is_targeting(**target):
+                self.lock_stats["suppressed_loops"] += 1
+                _LOGGER.debug(f"[{self.current_name}] 🔒 Correzione già in corso, evento ignorato")
+                return False
 
             # Ripristino mirato: applica solo i comandi necessari.
             # REGOLA FONDAMENTALE: non mandare set_hvac_mode se la modalità è già corretta.
             # Molte integrazioni (Midea, LocalTuya, ecc.) ignorano set_temperature se arriva
             # troppo vicino a set_hvac_mode perché il device è ancora occupato a processarlo.
-            _LOGGER.info(f"[{self.current_name}] 🔒 Ripristino → HVAC={'OK' if hvac_ok else target_hvac_mode}, Temp={'OK' if temp_ok else str(target_temperature)+'°C'}, Fan={'OK' if fan_ok else target_fan_mode}")
+            _LOGGER.info(f"[{self.current_name}] 🔒 Ripristino → " + ", ".join(f"{field}={target[field]}" for field in sorted(wrong)))
 
             self._lock_restore_until = asyncio.get_event_loop().time() + 5.0
+            self.lock_stats["corrections"] += 1
 
-            if not hvac_ok:
-                # Modalità sbagliata: manda il comando modalità, poi attendi prima di impostare temp
-                await self.hass.services.async_call(
-                    'climate', 'set_hvac_mode',
-                    {'entity_id': self.climate_entity, 'hvac_mode': target_hvac_mode},
-                    blocking=False
-                )
-                # Delay più lungo: alcune integrazioni resettano la temp al cambio modalità
-                await asyncio.sleep(1.0)
-                # Temperatura sempre dopo un cambio modalità (copre il reset silenzioso)
-                await self.hass.services.async_call(
-                    'climate', 'set_temperature',
-                    {'entity_id': self.climate_entity, 'temperature': target_temperature},
-                    blocking=True
-                )
-            elif not temp_ok:
-                # Solo la temperatura è sbagliata: manda SOLO set_temperature, nessuna interferenza
-                await self.hass.services.async_call(
-                    'climate', 'set_temperature',
-                    {'entity_id': self.climate_entity, 'temperature': target_temperature},
-                    blocking=True
-                )
-
-            if target_fan_mode and not fan_ok:
-                await self.hass.services.async_call(
-                    'climate', 'set_fan_mode',
-                    {'entity_id': self.climate_entity, 'fan_mode': target_fan_mode},
-                    blocking=False
-                )
-
-            if target_preset_mode:
-                try:
-                    await self.hass.services.async_call(
-                        'climate', 'set_preset_mode',
-                        {'entity_id': self.climate_entity, 'preset_mode': target_preset_mode},
-                        blocking=False
-                    )
-                except Exception as e:
-                    _LOGGER.warning(f"[{self.current_name}] Errore nell'applicazione preset mode {target_preset_mode}: {e}")
+            # Il reconciler condiviso con l'accensione invia solo i campi errati tramite la coda
+            # comandi e ne verifica l'applicazione
+            self.reconciler.set_target(**target)
+            return True
 
         except Exception as e:
             _LOGGER.error(f"[{self.current_name}] Errore ripristino impostazioni bloccate: {e}")
+            return False
         finally:
             # Resetta SEMPRE il flag alla fine, indipendentemente da come usciamo
             self._settings_restore_in_progress = False
@@ -3043,41 +2642,62 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
             # Chiamare _schedule_next_lock_check() qui causerebbe doppio scheduling esponenziale.
     
     def _start_lock_periodic_check(self):
-        """Avvia il controllo periodico delle impostazioni bloccate (safety net ogni 2 minuti)."""
+        """Avvia il watchdog del blocco impostazioni (rete di sicurezza oltre agli eventi del clima)."""
         self._stop_lock_periodic_check()
+        self._lock_watchdog_interval = LOCK_WATCHDOG_BASE_SEC
         self._schedule_next_lock_check()
 
     def _stop_lock_periodic_check(self):
-        """Ferma il controllo periodico."""
+        """Ferma il watchdog."""
         if self._lock_periodic_cancel:
             self._lock_periodic_cancel()
             self._lock_periodic_cancel = None
 
+    def _reset_lock_watchdog(self):
+        """Riporta il watchdog all'intervallo base dopo una deriva."""
+        if self._lock_watchdog_interval != LOCK_WATCHDOG_BASE_SEC or self._lock_periodic_cancel is None:
+            self._lock_watchdog_interval = LOCK_WATCHDOG_BASE_SEC
+            self._schedule_next_lock_check()
+
     def _schedule_next_lock_check(self):
-        """Pianifica il prossimo controllo periodico (solo se lock attivo).
+        """Pianifica il prossimo controllo del watchdog (solo se lock attivo).
         Cancella sempre il timer precedente prima di crearne uno nuovo."""
         if not self._settings_locked:
             return
         # Cancella l'eventuale timer precedente per evitare accumulo
-        if self._lock_periodic_cancel:
-            self._lock_periodic_cancel()
-            self._lock_periodic_cancel = None
-        interval_s = 120  # 2 minuti
+        self._stop_lock_periodic_check()
 
         @callback
         def _do_periodic_check(_now=None):
-            if not self._settings_locked:
-                self._lock_periodic_cancel = None
-                return
-            climate_state = self.hass.states.get(self.climate_entity)
-            if climate_state and climate_state.state not in ("off", "unknown", "unavailable"):
-                _LOGGER.debug(f"[{self.current_name}] 🔒 Controllo periodico blocco impostazioni")
-                self.hass.async_create_task(self._check_and_restore_locked_settings())
-            # Ri-pianifica il PROSSIMO ciclo (un solo timer attivo alla volta)
-            self._schedule_next_lock_check()
+            self._lock_periodic_cancel = None
+            if self._settings_locked:
+                self.hass.async_create_task(self._async_lock_watchdog())
+
+        self._lock_periodic_cancel = async_call_later(self.hass, self._lock_watchdog_interval, _do_periodic_check)
+
+    async def _async_lock_watchdog(self):
+        """Controllo di sicurezza: l'intervallo raddoppia finché il clima resta conforme."""
+        corrected = False
+        climate_state = self.hass.states.get(self.climate_entity)
+        if climate_state and climate_state.state not in ("off", "unknown", "unavailable"):
+            _LOGGER.debug(f"[{self.current_name}] 🔒 Watchdog blocco impostazioni ({self._lock_watchdog_interval}s)")
+            corrected = await self._check_and_restore_locked_settings()
+        if corrected:
+            # Deriva sfuggita agli eventi
+            self.lock_stats["drift_events"] += 1
+            self._lock_watchdog_interval = LOCK_WATCHDOG_BASE_SEC
+            self._notify_lock_stats()
+        else:
+            self._lock_watchdog_interval = min(self._lock_watchdog_interval * 2, LOCK_WATCHDOG_MAX_SEC)
+        # Ri-pianifica il PROSSIMO ciclo (un solo timer attivo alla volta)
+        self._schedule_next_lock_check()
+
+    def _notify_lock_stats(self):
+        """Aggiorna gli attributi dello switch "Blocca Impostazioni" con i contatori"""
+        switch = self.handles.lock_settings_switch
+        if switch is not None and switch.hass is not None:
+            switch.async_write_ha_state()
 
-        self._lock_periodic_cancel = async_call_later(self.hass, interval_s, _do_periodic_check)
-    
     async def _check_and_restore_locked_settings_debounced(self, *_):
         """Alias mantenuto per compatibilità - chiama direttamente la funzione principale."""
         await self._check_and_restore_locked_settings()
@@ -3091,7 +2711,10 @@ class ClimateManagerCoordinator(DataUpdateCoordinator):
                 "fan_mode": fan_mode,
                 "preset_mode": preset_mode
             }
+            self.async_runtime_changed()
     
     def clear_locked_settings_override(self):
         """Rimuove le impostazioni temporanee del timer"""
-        self._locked_settings_override = None
\ No newline at end of file
+        if self._locked_settings_override is not None:
+            self._locked_settings_override = None
+            self.async_runtime_changed()
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""Dispatcher eventi condiviso tra tutte le istanze di Climate Manager."""
+import logging
+
+from homeassistant.core import HassJob, HomeAssistant, callback
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_DISPATCHER = "_dispatcher"
+EVENT_MOBILE_APP_NOTIFICATION_ACTION = "mobile_app_notification_action"
+NOTIFICATION_ACTION_PREFIXES = ("TURN_OFF_CLIMATE_", "IGNORE_CLIMATE_")
+
+
+@callback
+def async_get_dispatcher(hass: HomeAssistant) -> "ClimateManagerDispatcher":
+    """Restituisce il dispatcher del dominio, creandolo al primo utilizzo."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    dispatcher = domain_data.get(DATA_DISPATCHER)
+    if dispatcher is None:
+        dispatcher = domain_data[DATA_DISPATCHER] = ClimateManagerDispatcher(hass)
+    return dispatcher
+
+
+class ClimateManagerDispatcher:
+    """Una sola sottoscrizione per tipo di evento, qualunque sia il numero di stanze.
+
+    Gli eventi di stato vengono instradati tramite un indice entity_id -> handler
+    (una sottoscrizione per entità, aggiunta o rimossa solo quando cambia l'indice),
+    le azioni delle notifiche push tramite l'entry_id contenuto nell'azione.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._state_index: dict[str, list[HassJob]] = {}
+        self._state_unsubs: dict[str, callable] = {}
+        self._action_index: dict[str, list[HassJob]] = {}
+        self._unsub_action = None
+        self._registry_jobs: list[HassJob] = []
+        self._unsub_registry = None
+
+    @callback
+    def async_track_entity(self, entity_id: str, action):
+        """Registra un handler per i cambi di stato di entity_id. Ritorna la funzione di rimozione."""
+        job = HassJob(action)
+        jobs = self._state_index.setdefault(entity_id, [])
+        jobs.append(job)
+        if entity_id not in self._state_unsubs:
+            # Prima stanza interessata a questa entità: HA indicizza già per entity_id
+            self._state_unsubs[entity_id] = async_track_state_change_event(
+                self._hass, [entity_id], self._handle_state_event
+            )
+
+        @callback
+        def _remove():
+            jobs = self._state_index.get(entity_id)
+            if jobs and job in jobs:
+                jobs.remove(job)
+                if not jobs:
+                    del self._state_index[entity_id]
+                    unsub = self._state_unsubs.pop(entity_id, None)
+                    if unsub:
+                        unsub()
+
+        return _remove
+
+    @callback
+    def async_track_notification_action(self, entry_id: str, action):
+        """Registra un handler per le azioni push destinate a entry_id."""
+        job = HassJob(action)
+        self._action_index.setdefault(entry_id, []).append(job)
+        if self._unsub_action is None:
+            self._unsub_action = self._hass.bus.async_listen(
+                EVENT_MOBILE_APP_NOTIFICATION_ACTION, self._handle_notification_action
+            )
+
+        @callback
+        def _remove():
+            jobs = self._action_index.get(entry_id)
+            if jobs and job in jobs:
+                jobs.remove(job)
+                if not jobs:
+                    del self._action_index[entry_id]
+            if not self._action_index and self._unsub_action:
+                self._unsub_action()
+                self._unsub_action = None
+
+        return _remove
+
+    @callback
+    def async_track_entity_registry_updated(self, action):
+        """Registra un handler per gli eventi entity_registry_updated (un solo listener per il dominio)."""
+        job = HassJob(action)
+        self._registry_jobs.append(job)
+        if self._unsub_registry is None:
+            self._unsub_registry = self._hass.bus.async_listen(
+                EVENT_ENTITY_REGISTRY_UPDATED, self._handle_registry_updated
+            )
+
+        @callback
+        def _remove():
+            if job in self._registry_jobs:
+                self._registry_jobs.remove(job)
+            if not self._registry_jobs and self._unsub_registry:
+                self._unsub_registry()
+                self._unsub_registry = None
+
+        return _remove
+
+    @callback
+    def _handle_state_event(self, event):
+        for job in list(self._state_index.get(event.data.get("entity_id"), ())):
+            self._hass.async_run_hass_job(job, event)
+
+    @callback
+    def _handle_notification_action(self, event):
+        action = event.data.get("action", "") or ""
+        for prefix in NOTIFICATION_ACTION_PREFIXES:
+            if action.startswith(prefix):
+                entry_id = action[len(prefix):]
+                for job in list(self._action_index.get(entry_id, ())):
+                    self._hass.async_run_hass_job(job, event)
+                return
+
+    @callback
+    def _handle_registry_updated(self, event):
+        for job in list(self._registry_jobs):
+            self._hass.async_run_hass_job(job, event)
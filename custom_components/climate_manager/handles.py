@@ -0,0 +1,93 @@
+"""Registro tipizzato delle entità di una config entry di Climate Manager."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+
+if TYPE_CHECKING:
+    from .number import ClimateManagerTimerOnNotificationNumber
+    from .select import ClimateManagerTimerOffFanModeSelect, ClimateManagerTimerOffHvacModeSelect
+    from .sensor import (
+        ClimateManagerAutomationStatusSensor,
+        ClimateManagerSettingsSensor,
+        ClimateManagerTimerOffSensor,
+        ClimateManagerTimerOnNotificationSensor,
+        ClimateManagerTimerOnSensor,
+        ClimatePrevStateSensor,
+    )
+    from .switch import (
+        ClimateManagerAutomationSwitch,
+        ClimateManagerAutoTimerSwitch,
+        ClimateManagerLockSettingsSwitch,
+        ClimateManagerTimerOffSwitch,
+        ClimateManagerTimerOnSwitch,
+    )
+
+
+@dataclass
+class EntryHandles:
+    """Riferimenti diretti alle entità di una config entry.
+
+    Compilato da ogni piattaforma nel proprio async_setup_entry, così coordinator,
+    switch e sensori si trovano a vicenda in O(1) senza scorrere liste di entità.
+    """
+
+    # sensor
+    prev_state_sensor: ClimatePrevStateSensor | None = None
+    settings_sensor: ClimateManagerSettingsSensor | None = None
+    timer_on_sensor: ClimateManagerTimerOnSensor | None = None
+    timer_off_sensor: ClimateManagerTimerOffSensor | None = None
+    timer_on_notification_sensor: ClimateManagerTimerOnNotificationSensor | None = None
+    automation_status_sensor: ClimateManagerAutomationStatusSensor | None = None
+    # switch
+    automation_switch: ClimateManagerAutomationSwitch | None = None
+    timer_on_switch: ClimateManagerTimerOnSwitch | None = None
+    timer_off_switch: ClimateManagerTimerOffSwitch | None = None
+    auto_timer_switch: ClimateManagerAutoTimerSwitch | None = None
+    lock_settings_switch: ClimateManagerLockSettingsSwitch | None = None
+    # select / number
+    timer_off_hvac_mode_select: ClimateManagerTimerOffHvacModeSelect | None = None
+    timer_off_fan_mode_select: ClimateManagerTimerOffFanModeSelect | None = None
+    timer_on_notification_number: ClimateManagerTimerOnNotificationNumber | None = None
+
+
+class ReadinessBarrier:
+    """Completata quando tutte le piattaforme della entry hanno aggiunto le proprie entità.
+
+    Il ripristino all'avvio attende questa barriera invece di ritardi fissi: quando
+    si sblocca, tutti i riferimenti in EntryHandles sono compilati e le entità
+    hanno già letto il proprio stato salvato.
+    """
+
+    def __init__(self, platforms):
+        self._pending = set(platforms)
+        self._event = asyncio.Event()
+        if not self._pending:
+            self._event.set()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def pending(self) -> list[str]:
+        return sorted(self._pending)
+
+    @callback
+    def async_platform_ready(self, platform: str) -> None:
+        self._pending.discard(platform)
+        if not self._pending and not self._event.is_set():
+            self._event.set()
+
+    async def async_wait(self, timeout: float | None = None) -> bool:
+        """Attende la barriera; False se scade il timeout con piattaforme ancora mancanti."""
+        if self._event.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
@@ -0,0 +1,87 @@
+"""Template dei messaggi di notifica, compilati una sola volta."""
+import re
+from functools import lru_cache
+
+# Segnaposto supportati nei messaggi ({{room}}, {{mode}}, ...)
+KNOWN_PLACEHOLDERS = frozenset({
+    "room",
+    "mode", "mode_en",
+    "fan", "fan_en",
+    "temp", "temp_en",
+    "sensor", "sensor_en",
+    "threshold",
+    "minutes",
+    "version",
+})
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+
+# Traduzioni modalità HVAC e ventola: {{mode}}/{{fan}} in italiano, {{mode_en}}/{{fan_en}} in inglese
+MODE_NAMES = {
+    "it": {
+        "auto": "automatico",
+        "cool": "raffrescamento",
+        "heat": "riscaldamento",
+        "fan_only": "ventilazione",
+        "dry": "deumidificazione",
+        "off": "spento",
+        "summer": "estate",
+        "winter": "inverno",
+    },
+    "en": {
+        "auto": "auto",
+        "cool": "cooling",
+        "heat": "heating",
+        "fan_only": "fan only",
+        "dry": "dry",
+        "off": "off",
+        "summer": "summer",
+        "winter": "winter",
+    },
+}
+FAN_NAMES = {
+    "it": {"auto": "automatico", "low": "bassa", "medium": "media", "high": "alta"},
+    "en": {"auto": "auto", "low": "low", "medium": "medium", "high": "high"},
+}
+
+
+class MessageTemplate:
+    """Template suddiviso in segmenti (testo, segnaposto): il rendering è un solo passaggio."""
+
+    __slots__ = ("text", "placeholders", "_segments", "_tail")
+
+    def __init__(self, text: str):
+        self.text = text
+        segments = []
+        pos = 0
+        for match in _PLACEHOLDER.finditer(text):
+            segments.append((text[pos:match.start()], match.group(1)))
+            pos = match.end()
+        self._segments = tuple(segments)
+        self._tail = text[pos:]
+        self.placeholders = frozenset(name for _, name in segments)
+
+    @property
+    def unknown_placeholders(self) -> frozenset:
+        return self.placeholders - KNOWN_PLACEHOLDERS
+
+    def render(self, values: dict) -> str:
+        """Sostituisce i segnaposto; quelli senza valore restano invariati nel testo."""
+        parts = []
+        for literal, name in self._segments:
+            parts.append(literal)
+            value = values.get(name)
+            parts.append(f"{{{{{name}}}}}" if value is None else value)
+        parts.append(self._tail)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=512)
+def compile_template(text: str) -> MessageTemplate:
+    """Compila (una volta sola per testo) un template di messaggio."""
+    return MessageTemplate(text or "")
+
+
+def unknown_placeholders(text: str) -> list[str]:
+    """Segnaposto non supportati presenti nel testo, in ordine alfabetico."""
+    return sorted(compile_template(text).unknown_placeholders)
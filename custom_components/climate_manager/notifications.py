@@ -0,0 +1,224 @@
+"""Invio notifiche Alexa/push in parallelo, con timeout per canale e statistiche per target."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import partial
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import AGGREGATED_MESSAGES, DOMAIN
+from .messages import compile_template
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_CHANNEL_TIMEOUTS = {"alexa": 15.0, "push": 10.0}
+
+
+@dataclass
+class NotificationDelivery:
+    """Chiamate notify per un singolo target, eseguite in ordine.
+
+    Le chiamate in prelude (es. clear_notification) sono best effort: un loro
+    errore non conta come consegna fallita.
+    """
+
+    channel: str
+    target: str
+    calls: list = field(default_factory=list)  # [(domain, service, data)]
+    prelude: list = field(default_factory=list)
+
+
+class NotificationFanout:
+    """Distribuisce le notifiche a tutti i target in parallelo (massimo max_concurrency alla volta).
+
+    Ogni target ha il proprio timeout di canale e i propri errori: un cloud Alexa
+    lento non ritarda gli altri target né il task del coordinator che ha chiamato.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeouts: dict | None = None):
+        self._hass = hass
+        self.name = name
+        self.timeouts = {**DEFAULT_CHANNEL_TIMEOUTS, **(timeouts or {})}
+        self._semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._tasks: set[asyncio.Task] = set()
+        self._listeners = []
+        # Statistiche per target: consegne, fallimenti, timeout e latenze
+        self.stats: dict[str, dict] = {}
+        self.version = 0  # Incrementato a ogni invio completato
+
+    @callback
+    def async_add_listener(self, cb):
+        """cb() viene chiamata quando cambiano le statistiche. Ritorna la funzione di rimozione."""
+        self._listeners.append(cb)
+
+        @callback
+        def _remove():
+            if cb in self._listeners:
+                self._listeners.remove(cb)
+
+        return _remove
+
+    @callback
+    def async_send(self, deliveries: list[NotificationDelivery]):
+        """Avvia la consegna in background e ritorna subito il task (None se non c'è nulla da inviare)."""
+        deliveries = [d for d in deliveries if d.calls or d.prelude]
+        if not deliveries:
+            return None
+        task = self._hass.async_create_task(self._async_fan_out(deliveries))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @callback
+    def cancel(self):
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
+
+    async def _async_fan_out(self, deliveries):
+        await asyncio.gather(*(self._async_deliver(d) for d in deliveries), return_exceptions=True)
+        self.version += 1
+        for cb in list(self._listeners):
+            try:
+                cb()
+            except Exception:
+                pass
+
+    async def _async_deliver(self, delivery: NotificationDelivery):
+        timeout = self.timeouts.get(delivery.channel, DEFAULT_CHANNEL_TIMEOUTS["push"])
+        stats = self.stats.setdefault(delivery.target, {
+            "channel": delivery.channel,
+            "sent": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "last_latency_ms": None,
+            "max_latency_ms": 0,
+            "last_error": None,
+        })
+        async with self._semaphore:
+            started = time.monotonic()
+            for domain, service, data in delivery.prelude:
+                try:
+                    await asyncio.wait_for(self._call(domain, service, data), timeout)
+                except Exception:
+                    pass  # Best effort (es. cancellazione di una notifica già rimossa)
+            try:
+                for domain, service, data in delivery.calls:
+                    await asyncio.wait_for(self._call(domain, service, data), timeout)
+            except asyncio.TimeoutError:
+                stats["failed"] += 1
+                stats["timeouts"] += 1
+                stats["last_error"] = f"timeout {timeout}s"
+                _LOGGER.warning(f"[{self.name}] ⏱️ Notifica {delivery.channel} {delivery.target}: timeout dopo {timeout}s")
+                return
+            except Exception as e:
+                stats["failed"] += 1
+                stats["last_error"] = str(e)
+                _LOGGER.error(f"[{self.name}] Errore notifica {delivery.channel} {delivery.target}: {e}")
+                return
+            latency_ms = round((time.monotonic() - started) * 1000, 1)
+            stats["sent"] += 1
+            stats["last_latency_ms"] = latency_ms
+            stats["max_latency_ms"] = max(stats["max_latency_ms"], latency_ms)
+            _LOGGER.debug(f"[{self.name}] Notifica {delivery.channel} consegnata a {delivery.target} in {latency_ms} ms")
+
+    async def _call(self, domain, service, data):
+        await self._hass.services.async_call(domain, service, data, blocking=True)
+
+
+DATA_AGGREGATOR = "_notification_aggregator"
+
+
+@callback
+def async_get_aggregator(hass: HomeAssistant) -> "NotificationAggregator":
+    """Restituisce l'aggregatore di notifiche del dominio, creandolo al primo utilizzo."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    aggregator = domain_data.get(DATA_AGGREGATOR)
+    if aggregator is None:
+        aggregator = domain_data[DATA_AGGREGATOR] = NotificationAggregator(hass)
+    return aggregator
+
+
+class NotificationAggregator:
+    """Unisce le notifiche di più stanze con la stessa chiave verso lo stesso target.
+
+    La prima notifica apre una finestra di raccolta; alla scadenza ogni target riceve
+    un solo messaggio (es. "Clima spento in cucina, soggiorno, camera") invece di N
+    annunci in coda.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._buckets: dict[tuple, dict] = {}
+        self.merged = 0  # Notifiche risparmiate grazie all'aggregazione
+
+    @staticmethod
+    def _bucket_key(key, delivery: NotificationDelivery):
+        domain, service, data = delivery.calls[0]
+        entity_id = data.get("entity_id")
+        return (key, delivery.channel, domain, service, entity_id if isinstance(entity_id, str) else None)
+
+    @callback
+    def async_submit(self, fanout: NotificationFanout, key: str, room: str, deliveries: list[NotificationDelivery], window: float, lang: str = "it"):
+        """Accoda le consegne (una chiamata con "message" ciascuna) nella finestra di raccolta."""
+        for delivery in deliveries:
+            if len(delivery.calls) != 1 or delivery.prelude:
+                # Consegne composte (es. cancella e invia): nessuna aggregazione
+                fanout.async_send([delivery])
+                continue
+            bucket_key = self._bucket_key(key, delivery)
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                bucket = self._buckets[bucket_key] = {
+                    "key": key,
+                    "lang": lang,
+                    "fanout": fanout,
+                    "delivery": delivery,
+                    "entries": [],
+                    "cancel": async_call_later(self._hass, window, partial(self._async_flush, bucket_key)),
+                }
+            bucket["entries"].append((room, delivery.calls[0][2].get("message", "")))
+
+    @callback
+    def _async_flush(self, bucket_key, _now=None):
+        bucket = self._buckets.pop(bucket_key, None)
+        if bucket is None:
+            return
+        delivery = bucket["delivery"]
+        entries = bucket["entries"]
+        if len(entries) > 1:
+            self.merged += len(entries) - 1
+            domain, service, data = delivery.calls[0]
+            delivery = NotificationDelivery(
+                delivery.channel, delivery.target,
+                [(domain, service, {**data, "message": self._merge(bucket["key"], bucket["lang"], entries)})],
+            )
+            _LOGGER.debug(f"Notifiche '{bucket['key']}' unite per {delivery.target}: {len(entries)} stanze")
+        bucket["fanout"].async_send([delivery])
+
+    @staticmethod
+    def _merge(key, lang, entries):
+        rooms = []
+        messages = []
+        for room, message in entries:
+            if room not in rooms:
+                rooms.append(room)
+            if message not in messages:
+                messages.append(message)
+        if len(messages) == 1:
+            return messages[0]
+        template = AGGREGATED_MESSAGES.get(lang, AGGREGATED_MESSAGES["en"]).get(key)
+        if template:
+            return compile_template(template).render({"rooms": ", ".join(rooms)})
+        # Nessun modello unificato: un solo annuncio con i messaggi delle singole stanze
+        return " ".join(messages)
+
+    @callback
+    def cancel(self):
+        """Invia subito le notifiche in attesa (es. scaricamento dell'ultima stanza)."""
+        for bucket_key, bucket in list(self._buckets.items()):
+            bucket["cancel"]()
+            self._async_flush(bucket_key)
@@ -4,7 +4,7 @@ import logging
 import re
 from homeassistant.components.number import NumberEntity
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback, async_get_current_platform
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
 
@@ -20,11 +20,14 @@ async def async_setup_entry(
     """Set up timer on notification number entity from config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
     
+    coordinator.handles.timer_on_notification_number = ClimateManagerTimerOnNotificationNumber(coordinator)
     entities = [
-        ClimateManagerTimerOnNotificationNumber(coordinator),
+        coordinator.handles.timer_on_notification_number,
     ]
     
-    async_add_entities(entities)
+    # Aggiunta attesa: la barriera di avvio del coordinator si sblocca solo a entità aggiunte
+    await async_get_current_platform().async_add_entities(entities)
+    coordinator.ready.async_platform_ready("number")
     
     # Forza l'abilitazione delle entità nel registry se sono disabilitate
     entity_registry = async_get_entity_registry(hass)
@@ -113,21 +116,8 @@ class ClimateManagerTimerOnNotificationNumber(NumberEntity):
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the value."""
-        # Salva il valore persistentemente nel config entry
-        import copy
-        
-        # Aggiorna le opzioni locali
-        self._coordinator._update_options_safely({"timer_on_notification_minutes": int(value)})
-        
-        # Salva persistentemente nel config entry
-        entry = self.hass.config_entries.async_get_entry(self._coordinator.entry_id)
-        if entry:
-            new_options = copy.deepcopy(dict(entry.options))
-            new_options["timer_on_notification_minutes"] = int(value)
-            
-            self.hass.config_entries.async_update_entry(
-                entry, options=new_options
-            )
+        # Aggiorna le opzioni locali; la config entry viene scritta in modo accorpato
+        self._coordinator.async_persist_options({"timer_on_notification_minutes": int(value)})
         
         self.async_write_ha_state()
 
@@ -4,7 +4,7 @@ import logging
 import re
 from homeassistant.components.select import SelectEntity
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback, async_get_current_platform
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
 
@@ -20,12 +20,17 @@ async def async_setup_entry(
     """Set up timer off selector entities from config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
     
+    handles = coordinator.handles
+    handles.timer_off_hvac_mode_select = ClimateManagerTimerOffHvacModeSelect(coordinator)
+    handles.timer_off_fan_mode_select = ClimateManagerTimerOffFanModeSelect(coordinator)
     entities = [
-        ClimateManagerTimerOffHvacModeSelect(coordinator),
-        ClimateManagerTimerOffFanModeSelect(coordinator),
+        handles.timer_off_hvac_mode_select,
+        handles.timer_off_fan_mode_select,
     ]
     
-    async_add_entities(entities)
+    # Aggiunta attesa: la barriera di avvio del coordinator si sblocca solo a entità aggiunte
+    await async_get_current_platform().async_add_entities(entities)
+    coordinator.ready.async_platform_ready("select")
     
     # Forza l'abilitazione delle entità nel registry se sono disabilitate
     entity_registry = async_get_entity_registry(hass)
@@ -114,21 +119,8 @@ class ClimateManagerTimerOffHvacModeSelect(SelectEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
-        # Salva il valore persistentemente nel config entry
-        import copy
-        
-        # Aggiorna le opzioni locali
-        self._coordinator._update_options_safely({"timer_off_hvac_mode_selector": option})
-        
-        # Salva persistentemente nel config entry
-        entry = self._coordinator.hass.config_entries.async_get_entry(self._coordinator.entry_id)
-        if entry:
-            new_options = copy.deepcopy(dict(entry.options))
-            new_options["timer_off_hvac_mode_selector"] = option
-            
-            self._coordinator.hass.config_entries.async_update_entry(
-                entry, options=new_options
-            )
+        # Aggiorna le opzioni locali; la config entry viene scritta in modo accorpato
+        self._coordinator.async_persist_options({"timer_off_hvac_mode_selector": option})
         
         self.async_write_ha_state()
 
@@ -212,21 +204,8 @@ class ClimateManagerTimerOffFanModeSelect(SelectEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
-        # Salva il valore persistentemente nel config entry
-        import copy
-        
-        # Aggiorna le opzioni locali
-        self._coordinator._update_options_safely({"timer_off_fan_mode_selector": option})
-        
-        # Salva persistentemente nel config entry
-        entry = self._coordinator.hass.config_entries.async_get_entry(self._coordinator.entry_id)
-        if entry:
-            new_options = copy.deepcopy(dict(entry.options))
-            new_options["timer_off_fan_mode_selector"] = option
-            
-            self._coordinator.hass.config_entries.async_update_entry(
-                entry, options=new_options
-            )
+        # Aggiorna le opzioni locali; la config entry viene scritta in modo accorpato
+        self._coordinator.async_persist_options({"timer_off_fan_mode_selector": option})
         
         self.async_write_ha_state()
 
@@ -1,30 +1,51 @@
 """Sensor platform for Climate Manager integration."""
-import asyncio
+import logging
 from homeassistant.helpers.entity import Entity
 from homeassistant.core import callback
 from . import DOMAIN
 from homeassistant.const import UnitOfTemperature
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.entity_platform import async_get_current_platform
+from homeassistant.util import dt as dt_util
 from datetime import timedelta
 from collections import OrderedDict
+from types import MappingProxyType
+import re
+from .dispatcher import async_get_dispatcher
+from .notifications import NotificationDelivery
+from .timers import DeadlineTimer, format_seconds
+
+_LOGGER = logging.getLogger(__name__)
+
+_SLUG_INVALID_CHARS = re.compile(r'[^\w]')
+_SLUG_REPEATED_UNDERSCORES = re.compile(r'_+')
+
+
+def _name_slug(name):
+    """Slug del nome stanza usato negli entity_id"""
+    name_slug = _SLUG_INVALID_CHARS.sub('_', str(name or "unknown").lower())
+    return _SLUG_REPEATED_UNDERSCORES.sub('_', name_slug).strip('_')
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     coordinator = hass.data["climate_manager"][config_entry.entry_id]["coordinator"]
+    handles = coordinator.handles
+    handles.prev_state_sensor = ClimatePrevStateSensor(coordinator)
+    handles.settings_sensor = ClimateManagerSettingsSensor(coordinator)
+    handles.timer_on_sensor = ClimateManagerTimerOnSensor(coordinator)
+    handles.timer_off_sensor = ClimateManagerTimerOffSensor(coordinator)
+    handles.timer_on_notification_sensor = ClimateManagerTimerOnNotificationSensor(coordinator)
+    handles.automation_status_sensor = ClimateManagerAutomationStatusSensor(coordinator)
     entities = [
-        ClimatePrevStateSensor(coordinator),
-        ClimateManagerSettingsSensor(coordinator),
-        ClimateManagerTimerOnSensor(coordinator),
-        ClimateManagerTimerOffSensor(coordinator),
-        ClimateManagerTimerOnNotificationSensor(coordinator),
-        ClimateManagerAutomationStatusSensor(coordinator),
+        handles.prev_state_sensor,
+        handles.settings_sensor,
+        handles.timer_on_sensor,
+        handles.timer_off_sensor,
+        handles.timer_on_notification_sensor,
+        handles.automation_status_sensor,
     ]
     
-    # Salva le entità per accesso da altre piattaforme
-    if "entities" not in hass.data["climate_manager"][config_entry.entry_id]:
-        hass.data["climate_manager"][config_entry.entry_id]["entities"] = {}
-    hass.data["climate_manager"][config_entry.entry_id]["entities"]["sensor"] = entities
-    
-    async_add_entities(entities)
+    # Aggiunta attesa: la barriera di avvio del coordinator si sblocca solo a entità aggiunte
+    await async_get_current_platform().async_add_entities(entities)
+    coordinator.ready.async_platform_ready("sensor")
 
 class ClimatePrevStateSensor(Entity):
     def __init__(self, coordinator):
@@ -83,9 +104,9 @@ class ClimateManagerTimerOnSensor(Entity):
         self._coordinator = coordinator
         self._attr_unique_id = f"climate_manager_{coordinator.entry_id}_timer_on_countdown"
         self._is_running = False
-        self._remaining_seconds = 0
         self._total_seconds = 0
-        self._timer_task = None
+        # Scadenza assoluta: nessun tick al secondo, un solo callback allo scadere
+        self._timer = DeadlineTimer(coordinator.hass, self._on_deadline)
         coordinator.register_name_change_callback(self._update_name)
 
     @property
@@ -103,23 +124,29 @@ class ClimateManagerTimerOnSensor(Entity):
         
         return f"climate_manager_{entity_name} {name}"
 
+    @property
+    def remaining_seconds(self):
+        """Secondi residui calcolati dalla scadenza"""
+        if not self._is_running:
+            return 0
+        return int(self._timer.remaining())
+
     @property
     def state(self):
         if not self._is_running:
             return "00:00:00"
-        
-        hours = int(self._remaining_seconds // 3600)
-        minutes = int((self._remaining_seconds % 3600) // 60)
-        seconds = int(self._remaining_seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        return format_seconds(self.remaining_seconds)
 
     @property
     def extra_state_attributes(self):
+        remaining = self.remaining_seconds
+        ends_at = self._timer.ends_at
         return {
             "is_running": self._is_running,
-            "remaining_seconds": self._remaining_seconds,
+            "remaining_seconds": remaining,
             "total_seconds": self._total_seconds,
-            "progress_percent": int((self._remaining_seconds / self._total_seconds) * 100) if self._total_seconds > 0 else 0
+            "progress_percent": int((remaining / self._total_seconds) * 100) if self._total_seconds > 0 else 0,
+            "ends_at": ends_at.isoformat() if self._is_running and ends_at else None
         }
 
     @property
@@ -137,161 +164,111 @@ class ClimateManagerTimerOnSensor(Entity):
             "sw_version": "1.0",
         }
 
+    async def async_will_remove_from_hass(self):
+        self._timer.cancel()
+
     async def start_timer(self, minutes):
         """Avvia il countdown"""
         # CONTROLLO ANTI-DUPLICAZIONE: se già running, ferma il timer precedente prima
         if self._is_running:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"[{self._coordinator.current_name}] Timer ON già attivo, fermo il precedente")
+            _LOGGER.warning(f"[{self._coordinator.current_name}] Timer ON già attivo, fermo il precedente")
             await self.stop_timer()
             
-        # CONTROLLO TASK: se c'è ancora un task attivo, cancellalo
-        if self._timer_task and not self._timer_task.done():
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"[{self._coordinator.current_name}] Task timer ON ancora attivo, lo cancello")
-            self._timer_task.cancel()
-            try:
-                await self._timer_task
-            except asyncio.CancelledError:
-                pass
-            except Exception as e:
-                logger.warning(f"[{self._coordinator.current_name}] Errore cancellazione task precedente: {e}")
-            
         self._total_seconds = minutes * 60
-        self._remaining_seconds = self._total_seconds
         self._is_running = True
+        self._timer.start(self._total_seconds)
         
-        # Avvia il task del countdown
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"[{self._coordinator.current_name}] Avvio timer ON per {minutes} minuti")
-        self._timer_task = asyncio.create_task(self._run_countdown())
+        _LOGGER.info(f"[{self._coordinator.current_name}] Avvio timer ON per {minutes} minuti (scadenza {self._timer.ends_at})")
         self.async_write_ha_state()
+        self._coordinator.async_runtime_changed()
+
+    async def resume_timer(self, ends_at, total_seconds=None):
+        """Riprende il countdown da una scadenza assoluta salvata prima del riavvio"""
+        remaining = max(0.0, (ends_at - dt_util.utcnow()).total_seconds())
+        self._total_seconds = total_seconds or int(remaining)
+        self._is_running = True
+        self._timer.start_at(ends_at, started_at=ends_at - timedelta(seconds=self._total_seconds))
+        
+        _LOGGER.info(f"[{self._coordinator.current_name}] Ripreso timer ON dopo il riavvio (scadenza {ends_at}, residui {int(remaining)}s)")
+        self.async_write_ha_state()
+        self._coordinator.async_runtime_changed()
+
+    @property
+    def runtime_state(self):
+        """Scadenza del countdown per lo snapshot runtime (None se fermo)"""
+        if not self._is_running or not self._timer.ends_at:
+            return None
+        return {"ends_at": self._timer.ends_at.isoformat(), "total_seconds": self._total_seconds}
 
     async def stop_timer(self):
         """Ferma il countdown"""
         if not self._is_running:
             return
             
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"[{self._coordinator.current_name}] Timer ON fermato manualmente")
+        _LOGGER.info(f"[{self._coordinator.current_name}] Timer ON fermato manualmente")
             
         self._is_running = False
-        self._remaining_seconds = 0
-        
-        if self._timer_task and not self._timer_task.done():
-            self._timer_task.cancel()
-            try:
-                await self._timer_task
-            except asyncio.CancelledError:
-                logger.info(f"[{self._coordinator.current_name}] Task timer ON cancellato correttamente")
-            
+        self._timer.cancel()
         self.async_write_ha_state()
+        self._coordinator.async_runtime_changed()
 
-    async def _run_countdown(self):
-        """Esegue il countdown ogni secondo"""
+    async def _on_deadline(self, _now):
+        """Eseguito una sola volta allo scadere del timer"""
+        if not self._is_running:
+            _LOGGER.info(f"[{self._coordinator.current_name}] Timer ON non eseguito: timer già fermato")
+            return
+
+        _LOGGER.info(f"[{self._coordinator.current_name}] Timer ON scaduto - Accensione clima")
+        
+        # Il timer è concluso: lo switch spento qui sotto non deve richiamare stop_timer
+        self._is_running = False
+        self.async_write_ha_state()
+        self._coordinator.async_runtime_changed()
+        
+        # Timer scaduto - accendi il clima con la modalità configurata
         try:
-            while self._remaining_seconds > 0 and self._is_running:
-                await asyncio.sleep(1)
-                
-                # CONTROLLO AGGIUNTIVO: verifica se il timer è stato fermato durante il sleep
-                if not self._is_running:
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.info(f"[{self._coordinator.current_name}] Timer ON fermato durante countdown, esco")
-                    return
-                    
-                self._remaining_seconds -= 1
-                self.async_write_ha_state()
-                
-            # CONTROLLO TRIPLO prima di eseguire lo spegnimento
-            if self._remaining_seconds <= 0 and self._is_running and not self._timer_task.cancelled():
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.info(f"[{self._coordinator.current_name}] Timer ON scaduto - Accensione clima")
-                
-                # Timer scaduto - accendi il clima con la modalità configurata
-                try:
-                    # Determina la modalità HVAC corretta basata sulla stagione
-                    season = await self._coordinator._get_season()
-                    
-                    if season == "summer":
-                        hvac_mode = self._coordinator.get_option("hvac_mode_summer", "cool")
-                        temperature = float(self._coordinator.get_option("temperature_summer", 21))
-                        fan_mode = self._coordinator.fan_mode_summer
-                    elif season == "winter":
-                        hvac_mode = self._coordinator.get_option("hvac_mode_winter", "heat")
-                        temperature = float(self._coordinator.get_option("temperature_winter", 21))
-                        fan_mode = self._coordinator.fan_mode_winter
-                    else:
-                        # Fallback su impostazioni estate
-                        hvac_mode = self._coordinator.get_option("hvac_mode_summer", "cool")
-                        temperature = float(self._coordinator.get_option("temperature_summer", 21))
-                        fan_mode = self._coordinator.fan_mode_summer
-                    
-                    # Controlla compatibilità modalità
-                    if not self._coordinator._check_hvac_mode_compatibility(hvac_mode):
-                        hvac_mode = "cool"  # Fallback
-                    
-                    if fan_mode and not self._coordinator._check_fan_mode_compatibility(fan_mode):
-                        fan_mode = None
-                    
-                    logger.info(f"[{self._coordinator.current_name}] Timer ON scaduto - Accensione clima: modalità {hvac_mode}, temperatura {temperature}°C, stagione {season}")
-                    
-                    # Accendi il clima con la modalità corretta
-                    await self._coordinator.hass.services.async_call(
-                        'climate', 'set_hvac_mode', 
-                        {'entity_id': self._coordinator.climate_entity, 'hvac_mode': hvac_mode}
-                    )
-                    
-                    # Imposta temperatura
-                    await self._coordinator.hass.services.async_call(
-                        'climate', 'set_temperature', 
-                        {'entity_id': self._coordinator.climate_entity, 'temperature': temperature}
-                    )
-                    
-                    # Imposta ventola se supportata
-                    if fan_mode:
-                        await self._coordinator.hass.services.async_call(
-                            'climate', 'set_fan_mode', 
-                            {'entity_id': self._coordinator.climate_entity, 'fan_mode': fan_mode}
-                        )
-                        
-                except Exception as e:
-                    logger.error(f"[{self._coordinator.current_name}] Errore durante accensione clima da timer: {e}")
-                
-                # Spegni lo switch timer associato
-                name = self._coordinator.current_name
-                import re
-                name_slug = re.sub(r'[^\w]', '_', str(name).lower())
-                name_slug = re.sub(r'_+', '_', name_slug).strip('_')
-                switch_id = f"switch.climate_manager_timer_on_{name_slug}"
-                
-                await self._coordinator.hass.services.async_call(
-                    'switch', 'turn_off', 
-                    {'entity_id': switch_id}
-                )
-                
-                logger.info(f"[{self._coordinator.current_name}] Timer ON completato con successo")
+            # Determina la modalità HVAC corretta basata sulla stagione
+            season = await self._coordinator._get_season()
+            
+            if season == "summer":
+                hvac_mode = self._coordinator.get_option("hvac_mode_summer", "cool")
+                temperature = float(self._coordinator.get_option("temperature_summer", 21))
+                fan_mode = self._coordinator.fan_mode_summer
+            elif season == "winter":
+                hvac_mode = self._coordinator.get_option("hvac_mode_winter", "heat")
+                temperature = float(self._coordinator.get_option("temperature_winter", 21))
+                fan_mode = self._coordinator.fan_mode_winter
             else:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.info(f"[{self._coordinator.current_name}] Timer ON non eseguito: running={self._is_running}, remaining={self._remaining_seconds}, cancelled={self._timer_task.cancelled() if self._timer_task else 'None'}")
-                
-            # Ferma il timer in ogni caso
-            self._is_running = False
-            self.async_write_ha_state()
+                # Fallback su impostazioni estate
+                hvac_mode = self._coordinator.get_option("hvac_mode_summer", "cool")
+                temperature = float(self._coordinator.get_option("temperature_summer", 21))
+                fan_mode = self._coordinator.fan_mode_summer
+            
+            # Controlla compatibilità modalità
+            if not self._coordinator._check_hvac_mode_compatibility(hvac_mode):
+                hvac_mode = "cool"  # Fallback
+            
+            if fan_mode and not self._coordinator._check_fan_mode_compatibility(fan_mode):
+                fan_mode = None
+            
+            _LOGGER.info(f"[{self._coordinator.current_name}] Timer ON scaduto - Accensione clima: modalità {hvac_mode}, temperatura {temperature}°C, stagione {season}")
+            
+            # Accendi il clima con modalità, temperatura e ventola della stagione
+            await self._coordinator.commands.async_apply(
+                hvac_mode=hvac_mode, temperature=temperature, fan_mode=fan_mode
+            )
                 
-        except asyncio.CancelledError:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"[{self._coordinator.current_name}] Timer ON cancellato correttamente via CancelledError")
-            self._is_running = False
-            self.async_write_ha_state()
-            raise
+        except Exception as e:
+            _LOGGER.error(f"[{self._coordinator.current_name}] Errore durante accensione clima da timer: {e}")
+        
+        # Spegni lo switch timer associato direttamente (come per il timer OFF): niente
+        # switch.turn_off, che richiamerebbe stop_timer() su questo countdown già concluso
+        switch = self._coordinator.handles.timer_on_switch
+        if switch:
+            switch._is_on = False
+            switch.async_write_ha_state()
+        
+        _LOGGER.info(f"[{self._coordinator.current_name}] Timer ON completato con successo")
 
     async def _update_name(self):
         self.async_write_ha_state()
@@ -304,9 +281,11 @@ class ClimateManagerTimerOffSensor(Entity):
         self._coordinator = coordinator
         self._attr_unique_id = f"climate_manager_{coordinator.entry_id}_timer_off_countdown"
         self._is_running = False
-        self._remaining_seconds = 0
         self._total_seconds = 0
-        self._timer_task = None
+        # Scadenza assoluta: nessun tick al secondo, un solo callback allo scadere.
+        # Lo stop per spegnimento manuale del clima o dello switch arriva dagli eventi
+        # (coordinator._stop_timer_countdown_sensors e switch.async_turn_off).
+        self._timer = DeadlineTimer(coordinator.hass, self._on_deadline)
         coordinator.register_name_change_callback(self._update_name)
 
     @property
@@ -324,23 +303,29 @@ class ClimateManagerTimerOffSensor(Entity):
         
         return f"climate_manager_{entity_name} {name}"
 
+    @property
+    def remaining_seconds(self):
+        """Secondi residui calcolati dalla scadenza"""
+        if not self._is_running:
+            return 0
+        return int(self._timer.remaining())
+
     @property
     def state(self):
         if not self._is_running:
             return "00:00:00"
-        
-        hours = int(self._remaining_seconds // 3600)
-        minutes = int((self._remaining_seconds % 3600) // 60)
-        seconds = int(self._remaining_seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        return format_seconds(self.remaining_seconds)
 
     @property
     def extra_state_attributes(self):
+        remaining = self.remaining_seconds
+        ends_at = self._timer.ends_at
         return {
             "is_running": self._is_running,
-            "remaining_seconds": self._remaining_seconds,
+            "remaining_seconds": remaining,
             "total_seconds": self._total_seconds,
-            "progress_percent": int((self._remaining_seconds / self._total_seconds) * 100) if self._total_seconds > 0 else 0
+            "progress_percent": int((remaining / self._total_seconds) * 100) if self._total_seconds > 0 else 0,
+            "ends_at": ends_at.isoformat() if self._is_running and ends_at else None
         }
 
     @property
@@ -358,289 +343,175 @@ class ClimateManagerTimerOffSensor(Entity):
             "sw_version": "1.0",
         }
 
+    async def async_will_remove_from_hass(self):
+        self._timer.cancel()
+
     async def start_timer(self, minutes):
         """Avvia il countdown"""
         # CONTROLLO ANTI-DUPLICAZIONE: se già running, ferma il timer precedente prima
         if self._is_running:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"[{self._coordinator.current_name}] Timer OFF già attivo, ferma il precedente")
+            _LOGGER.warning(f"[{self._coordinator.current_name}] Timer OFF già attivo, ferma il precedente")
             await self.stop_timer()
             
-        # CONTROLLO TASK: se c'è ancora un task attivo, cancellalo
-        if self._timer_task and not self._timer_task.done():
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"[{self._coordinator.current_name}] Task timer OFF ancora attivo, lo cancello")
-            self._timer_task.cancel()
-            try:
-                await self._timer_task
-            except asyncio.CancelledError:
-                pass
-            except Exception as e:
-                logger.warning(f"[{self._coordinator.current_name}] Errore cancellazione task precedente: {e}")
-            
         self._total_seconds = minutes * 60
-        self._remaining_seconds = self._total_seconds
         self._is_running = True
+        self._timer.start(self._total_seconds)
         
-        # Avvia il task del countdown
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"[{self._coordinator.current_name}] Avvio timer OFF per {minutes} minuti")
-        self._timer_task = asyncio.create_task(self._run_countdown())
+        _LOGGER.info(f"[{self._coordinator.current_name}] Avvio timer OFF per {minutes} minuti (scadenza {self._timer.ends_at})")
         self.async_write_ha_state()
+        self._coordinator.async_runtime_changed()
+
+    async def resume_timer(self, ends_at, total_seconds=None):
+        """Riprende il countdown da una scadenza assoluta salvata prima del riavvio"""
+        remaining = max(0.0, (ends_at - dt_util.utcnow()).total_seconds())
+        self._total_seconds = total_seconds or int(remaining)
+        self._is_running = True
+        self._timer.start_at(ends_at, started_at=ends_at - timedelta(seconds=self._total_seconds))
+        
+        _LOGGER.info(f"[{self._coordinator.current_name}] Ripreso timer OFF dopo il riavvio (scadenza {ends_at}, residui {int(remaining)}s)")
+        self.async_write_ha_state()
+        self._coordinator.async_runtime_changed()
+
+    @property
+    def runtime_state(self):
+        """Scadenza del countdown per lo snapshot runtime (None se fermo)"""
+        if not self._is_running or not self._timer.ends_at:
+            return None
+        return {"ends_at": self._timer.ends_at.isoformat(), "total_seconds": self._total_seconds}
 
     async def stop_timer(self):
         """Ferma il countdown"""
         if not self._is_running:
             return
-            
-        import logging
-        logger = logging.getLogger(__name__)
         
         # Log per debug: chi ha chiamato stop_timer
         import traceback
         stack = traceback.format_stack()
-        logger.info(f"[{self._coordinator.current_name}] Timer OFF fermato manualmente - chiamato da: {stack[-2].strip()}")
+        _LOGGER.info(f"[{self._coordinator.current_name}] Timer OFF fermato manualmente - chiamato da: {stack[-2].strip()}")
             
-        # FERMA IMMEDIATAMENTE il timer
+        # FERMA IMMEDIATAMENTE il timer (un'eventuale azione in corso si interrompe al prossimo controllo)
         self._is_running = False
-        self._remaining_seconds = 0
-        
-        # Cancella il task PRIMA di fare altro per evitare race conditions
-        if self._timer_task and not self._timer_task.done():
-            self._timer_task.cancel()
+        self._timer.cancel()
         
         # Reset impostazioni override quando timer si ferma
         self._coordinator.clear_locked_settings_override()
         
         # RIPRISTINA LE IMPOSTAZIONI GLOBALI quando timer si ferma
         await self._restore_global_settings()
-        
-        # Aspetta che il task sia effettivamente cancellato
-        if self._timer_task and not self._timer_task.done():
-            try:
-                await self._timer_task
-            except asyncio.CancelledError:
-                logger.info(f"[{self._coordinator.current_name}] Task timer OFF cancellato correttamente")
-            except Exception as e:
-                logger.warning(f"[{self._coordinator.current_name}] Errore cancellazione task timer OFF: {e}")
             
         # Forza aggiornamento stato
         self.async_write_ha_state()
+        self._coordinator.async_runtime_changed()
         
-        logger.info(f"[{self._coordinator.current_name}] Timer OFF completamente fermato")
+        _LOGGER.info(f"[{self._coordinator.current_name}] Timer OFF completamente fermato")
 
-    async def _run_countdown(self):
-        """Esegue il countdown ogni secondo"""
+    async def _on_deadline(self, _now):
+        """Eseguito una sola volta allo scadere del timer"""
+        if not self._is_running:
+            _LOGGER.info(f"[{self._coordinator.current_name}] Timer OFF non eseguito: timer già fermato")
+            return
+
+        executed = False
         try:
-            while self._remaining_seconds > 0 and self._is_running:
-                await asyncio.sleep(1)
-                
-                # CONTROLLO AGGIUNTIVO: verifica se il timer è stato fermato durante il sleep
-                if not self._is_running:
-                    return
-                
-                # CONTROLLO CRITICO: verifica se il clima è ancora acceso E se è spegnimento manuale
-                climate_state = self._coordinator.hass.states.get(self._coordinator.climate_entity)
-                if not climate_state or climate_state.state == "off":
-                    # Il timer si ferma SOLO se è spegnimento manuale (NON per automazioni finestre)
-                    # Controlla se ci sono timer finestre attivi o se è spegnimento interno
-                    window_timers_active = (
-                        hasattr(self._coordinator, '_window_timer') and self._coordinator._window_timer or
-                        hasattr(self._coordinator, '_window_off_timer') and self._coordinator._window_off_timer or
-                        hasattr(self._coordinator, '_window_on_timer') and self._coordinator._window_on_timer or
-                        self._coordinator._window_open or
-                        self._coordinator._restore_in_progress or
-                        self._coordinator._internal_shutdown
-                    )
-                    
-                    if not window_timers_active:
-                        # Nessuna automazione finestre attiva: spegnimento manuale
-                        import logging
-                        logger = logging.getLogger(__name__)
-                        logger.info(f"[{self._coordinator.current_name}] Timer OFF fermato: clima spento manualmente")
-                        self._is_running = False
-                        self._remaining_seconds = 0
-                        if self._timer_task and not self._timer_task.done():
-                            self._timer_task.cancel()
-                        self.async_write_ha_state()
-                        return
-                    # Se ci sono automazioni finestre attive, continua il timer normalmente
+            executed = await self._apply_timer_off()
+        finally:
+            if not executed:
+                # Interrotto durante l'esecuzione: il blocco impostazioni deve poter ripartire
+                self._coordinator._timer_in_action = False
+
+        if executed:
+            timer_off_mode = self._coordinator.get_option("timer_off_hvac_mode_selector", "off")
+
+            # Notifica di completamento (solo per spegnimento definitivo, coerente col comportamento originale)
+            try:
+                from .const import get_alexa_messages
+                lang = (self._coordinator.options.get("lingua") or
+                       self._coordinator.config.get("lingua", "it"))
+                messages = get_alexa_messages(lang)
+
+                if timer_off_mode == "off":
+                    template = messages.get("timer_off_executed", "Timer di spegnimento eseguito in {{room}}, clima spento.")
+                    message = self._coordinator._render_message(None, template, room=self._coordinator.current_name)
+                    await self._coordinator._notify(message, "timer_off_executed")
+                # Per modalità diverse da "off" non viene inviata notifica (comportamento originale)
+            except Exception as e:
+                _LOGGER.error(f"[{self._coordinator.current_name}] Errore invio notifica timer OFF: {e}")
+
+            # ESECUZIONE SINGOLA: il timer completa il suo ciclo una sola volta e si ferma,
+            # indipendentemente dalla modalità scelta. Per farlo ripartire occorre riaccendere
+            # manualmente il condizionatore (se auto-timer è attivo) oppure riattivare
+            # manualmente lo switch "Timer Spegnimento".
+            self._turn_off_associated_switch()
+
+            from homeassistant.helpers.event import async_call_later
+            async_call_later(self._coordinator.hass, 5, self._reset_timer_action_flag)
+
+        # Ferma SEMPRE il timer alla fine del ciclo, in ogni caso
+        self._is_running = False
+        self.async_write_ha_state()
+        self._coordinator.async_runtime_changed()
+
+    async def _apply_timer_off(self):
+        """Applica la modalità del timer OFF. Ritorna False se il timer viene fermato nel frattempo"""
+        # Ottieni la modalità configurata per il timer di spegnimento dai selector
+        timer_off_mode = self._coordinator.get_option("timer_off_hvac_mode_selector", "off")
+        
+        # Imposta flag per indicare che è un'azione interna
+        self._coordinator._internal_shutdown = True
+        
+        # IMPORTANTE: Imposta flag per evitare conflitti con blocco impostazioni
+        self._coordinator._timer_in_action = True
+        
+        try:
+            if timer_off_mode == "off":
+                # Modalità classica: spegni il clima
+                await self._coordinator.commands.async_turn_off()
                 
-                # CONTROLLO AGGIUNTIVO: verifica se il timer switch è stato spento manualmente
-                name = self._coordinator.current_name
-                import re
-                name_slug = re.sub(r'[^\w]', '_', str(name).lower())
-                name_slug = re.sub(r'_+', '_', name_slug).strip('_')
-                switch_id = f"switch.climate_manager_timer_off_{name_slug}"
+            else:
+                # Modalità specifica: imposta la modalità scelta con temperatura e ventola
+                season = await self._coordinator._get_season()
                 
-                switch_state = self._coordinator.hass.states.get(switch_id)
-                if not switch_state or switch_state.state == "off":
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.info(f"[{self._coordinator.current_name}] Timer OFF fermato: switch timer disattivato")
-                    self._is_running = False
-                    self._remaining_seconds = 0
-                    if self._timer_task and not self._timer_task.done():
-                        self._timer_task.cancel()
-                    self.async_write_ha_state()
-                    return
-                    
-                self._remaining_seconds -= 1
-                self.async_write_ha_state()
+                if season == "summer":
+                    temperature = float(self._coordinator.get_option("temperature_summer", 21))
+                    default_fan_mode = self._coordinator.fan_mode_summer
+                else:
+                    temperature = float(self._coordinator.get_option("temperature_winter", 21))
+                    default_fan_mode = self._coordinator.fan_mode_winter
                 
-            # CONTROLLO TRIPLO prima di eseguire l'azione
-            import logging
-            logger = logging.getLogger(__name__)
-            if self._remaining_seconds <= 0 and self._is_running and not self._timer_task.cancelled():
+                # Determina la modalità ventola da usare dal selector
+                timer_fan_mode = self._coordinator.get_option("timer_off_fan_mode_selector", "auto")
                 
-                # CONTROLLO CRITICO: verifica se fermato prima di qualsiasi azione
-                if not self._is_running:
-                    return
+                # Se è impostato su "auto", usa la modalità ventola della stagione
+                if timer_fan_mode == "auto":
+                    fan_mode_to_use = default_fan_mode
+                else:
+                    fan_mode_to_use = timer_fan_mode
                 
-                # Ottieni la modalità configurata per il timer di spegnimento dai selector
-                timer_off_mode = self._coordinator.get_option("timer_off_hvac_mode_selector", "off")
+                # Un solo target in coda: se il timer viene fermato, il ripristino lo sostituisce
+                await self._coordinator.commands.async_apply(
+                    hvac_mode=timer_off_mode,
+                    temperature=temperature,
+                    fan_mode=fan_mode_to_use if fan_mode_to_use and self._coordinator._check_fan_mode_compatibility(fan_mode_to_use) else None,
+                )
                 
-                # CONTROLLO CRITICO: verifica di nuovo dopo aver ottenuto le opzioni
+                # CONTROLLO CRITICO: verifica dopo l'applicazione
                 if not self._is_running:
-                    return
-                
-                # Imposta flag per indicare che è un'azione interna
-                self._coordinator._internal_shutdown = True
-                
-                # IMPORTANTE: Imposta flag per evitare conflitti con blocco impostazioni
-                self._coordinator._timer_in_action = True
+                    return False
+            
+                # MEMORIZZA LE IMPOSTAZIONI DEL TIMER per il blocco impostazioni
+                self._coordinator.set_locked_settings_override(
+                    hvac_mode=timer_off_mode,
+                    temperature=temperature,
+                    fan_mode=fan_mode_to_use,
+                    preset_mode=None  # Preset mode non gestito nei timer per ora
+                )
                 
-                try:
-                    # CONTROLLO CRITICO: verifica prima di ogni chiamata di servizio
-                    if not self._is_running:
-                        return
-                        
-                    if timer_off_mode == "off":
-                        # Modalità classica: spegni il clima
-                        await self._coordinator.hass.services.async_call(
-                            'climate', 'set_hvac_mode', 
-                            {'entity_id': self._coordinator.climate_entity, 'hvac_mode': 'off'}
-                        )
-                        
-                    else:
-                        # Modalità specifica: imposta la modalità scelta
-                        await self._coordinator.hass.services.async_call(
-                            'climate', 'set_hvac_mode', 
-                            {'entity_id': self._coordinator.climate_entity, 'hvac_mode': timer_off_mode}
-                        )
-                        
-                        # CONTROLLO CRITICO: verifica dopo il cambio modalità
-                        if not self._is_running:
-                            return
-                        
-                        # Se non è modalità "off", imposta anche temperatura e ventola appropriate
-                        if timer_off_mode != "off":
-                            season = await self._coordinator._get_season()
-                            
-                            # CONTROLLO CRITICO: verifica dopo get_season
-                            if not self._is_running:
-                                return
-                            
-                            if season == "summer":
-                                temperature = float(self._coordinator.get_option("temperature_summer", 21))
-                                default_fan_mode = self._coordinator.fan_mode_summer
-                            else:
-                                temperature = float(self._coordinator.get_option("temperature_winter", 21))
-                                default_fan_mode = self._coordinator.fan_mode_winter
-                            
-                            # CONTROLLO CRITICO: verifica prima di impostare temperatura
-                            if not self._is_running:
-                                return
-                            
-                            # Imposta temperatura
-                            await self._coordinator.hass.services.async_call(
-                                'climate', 'set_temperature', 
-                                {'entity_id': self._coordinator.climate_entity, 'temperature': temperature}
-                            )
-                            
-                            # CONTROLLO CRITICO: verifica dopo impostazione temperatura
-                            if not self._is_running:
-                                return
-                            
-                            # Determina la modalità ventola da usare dal selector
-                            timer_fan_mode = self._coordinator.get_option("timer_off_fan_mode_selector", "auto")
-                            
-                            # Se è impostato su "auto", usa la modalità ventola della stagione
-                            if timer_fan_mode == "auto":
-                                fan_mode_to_use = default_fan_mode
-                            else:
-                                fan_mode_to_use = timer_fan_mode
-                            
-                            # CONTROLLO CRITICO: verifica prima di impostare ventola
-                            if not self._is_running:
-                                return
-                            
-                            # Imposta ventola se supportata
-                            if fan_mode_to_use and self._coordinator._check_fan_mode_compatibility(fan_mode_to_use):
-                                await self._coordinator.hass.services.async_call(
-                                    'climate', 'set_fan_mode', 
-                                    {'entity_id': self._coordinator.climate_entity, 'fan_mode': fan_mode_to_use}
-                                )
-                                
-                                # CONTROLLO CRITICO: verifica dopo impostazione ventola
-                                if not self._is_running:
-                                    return
-                        
-                            # MEMORIZZA LE IMPOSTAZIONI DEL TIMER per il blocco impostazioni
-                            self._coordinator.set_locked_settings_override(
-                                hvac_mode=timer_off_mode,
-                                temperature=temperature,
-                                fan_mode=fan_mode_to_use,
-                                preset_mode=None  # Preset mode non gestito nei timer per ora
-                            )
-                        
-                        
-                except Exception as e:
-                    # Reset flag anche in caso di errore
-                    self._coordinator._timer_in_action = False
-                    logger.error(f"[{self._coordinator.current_name}] Errore durante applicazione impostazioni timer OFF: {e}")
-
-                # Notifica di completamento (solo per spegnimento definitivo, coerente col comportamento originale)
-                try:
-                    from .const import get_alexa_messages
-                    lang = (self._coordinator.options.get("lingua") or
-                           self._coordinator.config.get("lingua", "it"))
-                    messages = get_alexa_messages(lang)
-
-                    if timer_off_mode == "off":
-                        template = messages.get("timer_off_executed", "Timer di spegnimento eseguito in {{room}}, clima spento.")
-                        message = self._coordinator._render_message(template, room=self._coordinator.current_name)
-                        await self._coordinator._notify(message, "timer_off_executed")
-                    # Per modalità diverse da "off" non viene inviata notifica (comportamento originale)
-                except Exception as e:
-                    logger.error(f"[{self._coordinator.current_name}] Errore invio notifica timer OFF: {e}")
-
-                # ESECUZIONE SINGOLA: il timer completa il suo ciclo una sola volta e si ferma,
-                # indipendentemente dalla modalità scelta. Per farlo ripartire occorre riaccendere
-                # manualmente il condizionatore (se auto-timer è attivo) oppure riattivare
-                # manualmente lo switch "Timer Spegnimento".
-                self._turn_off_associated_switch()
-
-                from homeassistant.helpers.event import async_call_later
-                async_call_later(self._coordinator.hass, 5, self._reset_timer_action_flag)
-
-            else:
-                logger.info(f"[{self._coordinator.current_name}] Timer OFF non eseguito: running={self._is_running}, remaining={self._remaining_seconds}, cancelled={self._timer_task.cancelled() if self._timer_task else 'None'}")
-
-            # Ferma SEMPRE il timer alla fine del ciclo, in ogni caso
-            self._is_running = False
-            self._remaining_seconds = 0
-            self.async_write_ha_state()
-
-        except asyncio.CancelledError:
-            self._is_running = False
-            self.async_write_ha_state()
-            # Reset flag anche in caso di cancellazione
+        except Exception as e:
+            # Reset flag anche in caso di errore
             self._coordinator._timer_in_action = False
-            raise
+            _LOGGER.error(f"[{self._coordinator.current_name}] Errore durante applicazione impostazioni timer OFF: {e}")
+
+        return self._is_running
 
     def _turn_off_associated_switch(self):
         """Spegne direttamente lo switch Timer Spegnimento associato.
@@ -651,14 +522,10 @@ class ClimateManagerTimerOffSensor(Entity):
         switch bloccato acceso e il countdown fermo a 00:00:00 senza mai fermarsi.
         """
         try:
-            entry_data = self._coordinator.hass.data.get("climate_manager", {}).get(self._coordinator.entry_id, {})
-            entities_data = entry_data.get("entities", {})
-            switch_entities = entities_data.get("switch", [])
-            for switch in switch_entities:
-                if hasattr(switch, '_attr_unique_id') and switch._attr_unique_id.endswith('_timer_off_switch'):
-                    switch._is_on = False
-                    switch.async_write_ha_state()
-                    break
+            switch = self._coordinator.handles.timer_off_switch
+            if switch:
+                switch._is_on = False
+                switch.async_write_ha_state()
         except Exception as e:
             import logging
             logging.getLogger(__name__).error(f"[{self._coordinator.current_name}] Errore spegnimento switch timer OFF: {e}")
@@ -696,23 +563,14 @@ class ClimateManagerTimerOffSensor(Entity):
                 target_fan_mode = self._coordinator.fan_mode_summer
             
             # Verifica compatibilità e applica le impostazioni
-            if self._coordinator._check_hvac_mode_compatibility(target_hvac_mode):
-                await self._coordinator.hass.services.async_call(
-                    'climate', 'set_hvac_mode',
-                    {'entity_id': self._coordinator.climate_entity, 'hvac_mode': target_hvac_mode}
-                )
-            
-            await self._coordinator.hass.services.async_call(
-                'climate', 'set_temperature',
-                {'entity_id': self._coordinator.climate_entity, 'temperature': target_temperature}
+            if not self._coordinator._check_hvac_mode_compatibility(target_hvac_mode):
+                target_hvac_mode = None
+            if target_fan_mode and not self._coordinator._check_fan_mode_compatibility(target_fan_mode):
+                target_fan_mode = None
+            await self._coordinator.commands.async_apply(
+                hvac_mode=target_hvac_mode, temperature=target_temperature, fan_mode=target_fan_mode
             )
             
-            if target_fan_mode and self._coordinator._check_fan_mode_compatibility(target_fan_mode):
-                await self._coordinator.hass.services.async_call(
-                    'climate', 'set_fan_mode',
-                    {'entity_id': self._coordinator.climate_entity, 'fan_mode': target_fan_mode}
-                )
-            
         except Exception:
             pass
 
@@ -724,12 +582,17 @@ class ClimateManagerTimerOnNotificationSensor(Entity):
         self._attr_unique_id = f"climate_manager_{coordinator.entry_id}_timer_on_notification"
         self._is_running = False
         self._is_paused = False  # Nuovo flag per pausa
-        self._elapsed_seconds = 0
+        self._accumulated_seconds = 0  # Tempo accumulato prima del segmento corrente
+        self._segment_start = None  # Inizio (UTC) del segmento di accensione corrente
         self._start_time = None
         self._pause_time = None  # Tempo di inizio pausa
-        self._timer_task = None
         self._notification_sent = False
+        self._unsub_climate = None
+        # Un solo callback alla scadenza della notifica, nessun contatore al secondo
+        self._timer = DeadlineTimer(coordinator.hass, self._on_deadline)
         coordinator.register_name_change_callback(self._update_name)
+        coordinator.register_automation_status_callback(self._on_automation_status_changed)
+        coordinator.register_options_change_callback(self._on_options_changed)
 
     @property
     def name(self):
@@ -746,27 +609,36 @@ class ClimateManagerTimerOnNotificationSensor(Entity):
         
         return f"climate_manager_{entity_name} {name}"
 
+    @property
+    def elapsed_seconds(self):
+        """Secondi di accensione accumulati, pause escluse"""
+        if not self._is_running:
+            return 0
+        elapsed = self._accumulated_seconds
+        if self._segment_start is not None:
+            elapsed += (dt_util.utcnow() - self._segment_start).total_seconds()
+        return int(elapsed)
+
     @property
     def state(self):
         if not self._is_running:
             return "00:00:00"
         
-        hours = int(self._elapsed_seconds // 3600)
-        minutes = int((self._elapsed_seconds % 3600) // 60)
-        seconds = int(self._elapsed_seconds % 60)
         status = " (PAUSED)" if self._is_paused else ""
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}{status}"
+        return f"{format_seconds(self.elapsed_seconds)}{status}"
 
     @property
     def extra_state_attributes(self):
         notification_minutes = self._coordinator.get_option("timer_on_notification_minutes", 0)
+        ends_at = self._timer.ends_at
         return {
             "is_running": self._is_running,
             "is_paused": self._is_paused,
-            "elapsed_seconds": self._elapsed_seconds,
+            "elapsed_seconds": self.elapsed_seconds,
             "notification_minutes": notification_minutes,
             "notification_sent": self._notification_sent,
-            "notification_enabled": notification_minutes > 0
+            "notification_enabled": notification_minutes > 0,
+            "ends_at": ends_at.isoformat() if ends_at else None
         }
 
     @property
@@ -789,26 +661,33 @@ class ClimateManagerTimerOnNotificationSensor(Entity):
             "sw_version": "1.0",
         }
 
+    async def async_will_remove_from_hass(self):
+        self._timer.cancel()
+        self._unsubscribe_climate()
+
     async def start_timer(self):
         """Avvia il contatore quando il clima si accende"""
         if self._is_running:
             return
             
         import datetime
-        import logging
-        logger = logging.getLogger(__name__)
     
         self._start_time = datetime.datetime.now()
-        self._elapsed_seconds = 0
+        self._accumulated_seconds = 0
+        self._segment_start = dt_util.utcnow()
         self._is_running = True
         self._is_paused = False
         self._pause_time = None
         self._notification_sent = False
         
-        logger.info(f"[{self._coordinator.current_name}] Timer notifica accensione avviato alle {self._start_time}")
+        _LOGGER.info(f"[{self._coordinator.current_name}] Timer notifica accensione avviato alle {self._start_time}")
         
-        # Avvia il task del contatore
-        self._timer_task = asyncio.create_task(self._run_counter())
+        # Pausa/ripresa guidate dagli eventi del clima invece che da un controllo al secondo
+        self._unsubscribe_climate()
+        self._unsub_climate = async_get_dispatcher(self._coordinator.hass).async_track_entity(
+            self._coordinator.climate_entity, self._handle_climate_state
+        )
+        self._schedule_notification()
         self.async_write_ha_state()
 
     async def pause_timer(self):
@@ -817,13 +696,14 @@ class ClimateManagerTimerOnNotificationSensor(Entity):
             return
             
         import datetime
-        import logging
-        logger = logging.getLogger(__name__)
         
+        self._accumulated_seconds = self.elapsed_seconds
+        self._segment_start = None
         self._is_paused = True
         self._pause_time = datetime.datetime.now()
+        self._timer.cancel()
         
-        logger.info(f"[{self._coordinator.current_name}] Timer notifica accensione messo in pausa alle {self._pause_time} (tempo accumulato: {self._elapsed_seconds}s)")
+        _LOGGER.info(f"[{self._coordinator.current_name}] Timer notifica accensione messo in pausa alle {self._pause_time} (tempo accumulato: {self._accumulated_seconds}s)")
         self.async_write_ha_state()
 
     async def resume_timer(self):
@@ -832,14 +712,14 @@ class ClimateManagerTimerOnNotificationSensor(Entity):
             return
             
         import datetime
-        import logging
-        logger = logging.getLogger(__name__)
         
         self._is_paused = False
+        self._segment_start = dt_util.utcnow()
         resume_time = datetime.datetime.now()
         
-        logger.info(f"[{self._coordinator.current_name}] Timer notifica accensione ripreso alle {resume_time} (tempo accumulato: {self._elapsed_seconds}s)")
+        _LOGGER.info(f"[{self._coordinator.current_name}] Timer notifica accensione ripreso alle {resume_time} (tempo accumulato: {self._accumulated_seconds}s)")
         self._pause_time = None
+        self._schedule_notification()
         self.async_write_ha_state()
 
     async def stop_timer(self):
@@ -847,90 +727,94 @@ class ClimateManagerTimerOnNotificationSensor(Entity):
         if not self._is_running:
             return
             
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"[{self._coordinator.current_name}] Timer notifica accensione fermato definitivamente")
+        _LOGGER.info(f"[{self._coordinator.current_name}] Timer notifica accensione fermato definitivamente")
             
         self._is_running = False
         self._is_paused = False
-        self._elapsed_seconds = 0
+        self._accumulated_seconds = 0
+        self._segment_start = None
         self._start_time = None
         self._pause_time = None
         self._notification_sent = False
-        
-        if self._timer_task and not self._timer_task.done():
-            self._timer_task.cancel()
-            try:
-                await self._timer_task
-            except asyncio.CancelledError:
-                logger.info(f"[{self._coordinator.current_name}] Task timer notifica accensione cancellato")
+        self._timer.cancel()
+        self._unsubscribe_climate()
             
         self.async_write_ha_state()
 
-    async def _run_counter(self):
-        """Esegue il contatore ogni secondo"""
-        try:
-            while self._is_running:
-                await asyncio.sleep(1)
-                
-                if not self._is_running:
-                    return
-                
-                # CONTROLLO AGGIUNTIVO: Verifica che il clima sia ancora acceso
-                climate_state = self._coordinator.hass.states.get(self._coordinator.climate_entity)
-                if not climate_state or climate_state.state == "off":
-                    # CONTROLLO TIMEOUT FINESTRE: Se il timeout finestre è scaduto, ferma definitivamente
-                    if getattr(self._coordinator, '_window_timeout_expired', False):
-                        import logging
-                        logger = logging.getLogger(__name__)
-                        logger.info(f"[{self._coordinator.current_name}] 🔴 Timer notifica fermato: timeout finestre scaduto")
-                        await self.stop_timer()
-                        return
-                    
-                    # CONTROLLO AUTOMAZIONI: Se le automazioni sono disabilitate per spegnimento manuale, ferma definitivamente
-                    if not self._coordinator.automation_enabled or self._coordinator.are_automations_disabled_by_shutdown():
-                        import logging
-                        logger = logging.getLogger(__name__)
-                        logger.info(f"[{self._coordinator.current_name}] 🔴 Timer notifica fermato definitivamente: spegnimento manuale")
-                        await self.stop_timer()
-                        return
-                    
-                    # ALTRIMENTI: Spegnimento per finestra (anche se finestra ora chiusa) - metti in pausa
-                    if not self._is_paused:
-                        import logging
-                        logger = logging.getLogger(__name__)
-                        logger.info(f"[{self._coordinator.current_name}] ⏸️ Timer notifica in pausa: clima spento (finestra)")
-                        await self.pause_timer()
-                    # Continua il loop ma non incrementare il contatore
-                    continue
-                else:
-                    # Clima acceso: se era in pausa, riprendi automaticamente
-                    if self._is_paused:
-                        await self.resume_timer()
-                
-                # Incrementa il contatore solo se non è in pausa
-                if not self._is_paused:
-                    self._elapsed_seconds += 1
-                    
-                    # Controlla se è ora di inviare la notifica
-                    notification_minutes = self._coordinator.get_option("timer_on_notification_minutes", 0)
-                    if (notification_minutes > 0 and 
-                        self._elapsed_seconds >= notification_minutes * 60 and 
-                        not self._notification_sent):
-                        
-                        await self._send_notification(notification_minutes)
-                        self._notification_sent = True
-                
-                self.async_write_ha_state()
-                
-        except asyncio.CancelledError:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"[{self._coordinator.current_name}] Counter timer notifica accensione cancellato")
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"[{self._coordinator.current_name}] Errore nel counter timer notifica accensione: {e}")
+    def _unsubscribe_climate(self):
+        if self._unsub_climate:
+            self._unsub_climate()
+            self._unsub_climate = None
+
+    def _schedule_notification(self):
+        """Programma la scadenza della notifica in base al tempo già accumulato"""
+        self._timer.cancel()
+        if not self._is_running or self._is_paused or self._notification_sent:
+            return
+        notification_minutes = self._coordinator.get_option("timer_on_notification_minutes", 0)
+        if notification_minutes <= 0:
+            return
+        self._timer.start(max(0, notification_minutes * 60 - self.elapsed_seconds))
+
+    async def _on_deadline(self, _now):
+        """Scadenza raggiunta: invia la notifica una sola volta"""
+        if not self._is_running or self._is_paused or self._notification_sent:
+            return
+        notification_minutes = self._coordinator.get_option("timer_on_notification_minutes", 0)
+        if notification_minutes <= 0:
+            return
+        await self._send_notification(notification_minutes)
+        self._notification_sent = True
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_climate_state(self, event):
+        """Mette in pausa o riprende il contatore ai cambi di stato del clima"""
+        if not self._is_running:
+            return
+        new_state = event.data.get("new_state")
+        if not new_state or new_state.state == "off":
+            self._coordinator.hass.async_create_task(self._on_climate_off())
+        elif self._is_paused:
+            self._coordinator.hass.async_create_task(self.resume_timer())
+
+    @callback
+    def _on_options_changed(self, changed_keys):
+        """Riprogramma la scadenza se cambiano i minuti della notifica"""
+        if self._is_running and "timer_on_notification_minutes" in changed_keys:
+            self._schedule_notification()
+            self.async_write_ha_state()
+
+    @callback
+    def _on_automation_status_changed(self):
+        """Le automazioni disabilitate a clima spento fermano definitivamente il contatore"""
+        if not self._is_running:
+            return
+        climate_state = self._coordinator.hass.states.get(self._coordinator.climate_entity)
+        if not climate_state or climate_state.state == "off":
+            self._coordinator.hass.async_create_task(self._on_climate_off())
+
+    async def _on_climate_off(self):
+        """Clima spento: ferma il contatore o mettilo in pausa"""
+        if not self._is_running:
+            return
+        
+        # CONTROLLO TIMEOUT FINESTRE: Se il timeout finestre è scaduto, ferma definitivamente
+        if getattr(self._coordinator, '_window_timeout_expired', False):
+            _LOGGER.info(f"[{self._coordinator.current_name}] 🔴 Timer notifica fermato: timeout finestre scaduto")
+            await self.stop_timer()
+            return
+        
+        # CONTROLLO AUTOMAZIONI: Se le automazioni sono disabilitate per spegnimento manuale, ferma definitivamente
+        if not self._coordinator.automation_enabled or self._coordinator.are_automations_disabled_by_shutdown():
+            _LOGGER.info(f"[{self._coordinator.current_name}] 🔴 Timer notifica fermato definitivamente: spegnimento manuale")
+            await self.stop_timer()
+            return
+        
+        # ALTRIMENTI: Spegnimento per finestra (anche se finestra ora chiusa) - metti in pausa
+        if not self._is_paused:
+            _LOGGER.info(f"[{self._coordinator.current_name}] ⏸️ Timer notifica in pausa: clima spento (finestra)")
+            await self.pause_timer()
 
     async def _send_notification(self, minutes):
         """Invia la notifica interattiva quando il timer scade"""
@@ -940,13 +824,10 @@ class ClimateManagerTimerOnNotificationSensor(Entity):
         try:
             room_name = self._coordinator.get_option("room_name", "Stanza")
             
-            # Ottieni il messaggio personalizzato o usa quello di default
-            messages = self._coordinator.messages
-            msg_template = messages.get("timer_on_notification", "Clima acceso da {{minutes}} minuti in {{room}}")
-            
-            # Usa il sistema di template del coordinator per renderizzare correttamente
+            # Messaggio personalizzato (già compilato dal coordinator) o quello di default
             message = self._coordinator._render_message(
-                msg_template,
+                "timer_on_notification",
+                "Clima acceso da {{minutes}} minuti in {{room}}",
                 room=room_name,
                 extra={"minutes": minutes}
             )
@@ -1027,7 +908,8 @@ class ClimateManagerTimerOnNotificationSensor(Entity):
                 ]
             }
             
-            # Invia notifica a tutti i servizi push configurati (evita duplicati)
+            # Invia notifica a tutti i servizi push configurati (evita duplicati), in parallelo
+            deliveries = []
             sent_targets = set()
             for target in push_targets.split(','):
                 target = target.strip()
@@ -1038,41 +920,34 @@ class ClimateManagerTimerOnNotificationSensor(Entity):
                     clean_target = target.replace("notify.", "") if target.startswith("notify.") else target
                     service_name = f"notify.{clean_target}"
                     
-                    try:
-                        if "telegram" in clean_target.lower():
-                            # Telegram: messaggio con pulsanti inline (sintassi corretta)
-                            await self._coordinator.hass.services.async_call(
-                                'notify', clean_target,
-                                {
-                                    'title': f"🔥 Climate Manager - {room_name}",
-                                    'message': message,
-                                    'data': {
-                                        'inline_keyboard': [
-                                            f"{button_turn_off}:/turn_off_climate_{self._coordinator.entry_id}, {button_leave_on}:/ignore_climate_{self._coordinator.entry_id}"
-                                        ]
-                                    }
-                                }
-                            )
-                            logger.info(f"[{room_name}] Notifica Telegram con pulsanti inviata a {service_name}")
-                        else:
-                            # Home Assistant app: messaggio con pulsanti interattivi
-                            await self._coordinator.hass.services.async_call(
-                                'notify', clean_target,
-                                {
-                                    'message': message,
-                                    'title': f"🔥 Climate Manager - {room_name}",
-                                    'data': {
-                                        'tag': notification_id,
-                                        'persistent': True,
-                                        'actions': action_data["actions"],
-                                        'category': 'actionable'
-                                    }
-                                }
-                            )
-                        logger.info(f"[{room_name}] Notifica interattiva inviata a {service_name}")
-                        
-                    except Exception as e:
-                        logger.error(f"[{room_name}] Errore invio notifica a {service_name}: {e}")
+                    if "telegram" in clean_target.lower():
+                        # Telegram: messaggio con pulsanti inline (sintassi corretta)
+                        data = {
+                            'title': f"🔥 Climate Manager - {room_name}",
+                            'message': message,
+                            'data': {
+                                'inline_keyboard': [
+                                    f"{button_turn_off}:/turn_off_climate_{self._coordinator.entry_id}, {button_leave_on}:/ignore_climate_{self._coordinator.entry_id}"
+                                ]
+                            }
+                        }
+                    else:
+                        # Home Assistant app: messaggio con pulsanti interattivi
+                        data = {
+                            'message': message,
+                            'title': f"🔥 Climate Manager - {room_name}",
+                            'data': {
+                                'tag': notification_id,
+                                'persistent': True,
+                                'actions': action_data["actions"],
+                                'category': 'actionable'
+                            }
+                        }
+                    deliveries.append(NotificationDelivery("push", service_name, [('notify', clean_target, data)]))
+            
+            # Esiti e latenze per target sono registrati dal notifier del coordinator
+            self._coordinator.notifier.async_send(deliveries)
+            logger.info(f"[{room_name}] Notifica interattiva inviata a {', '.join(sorted(sent_targets))}")
                             
         except Exception as e:
             logger.error(f"[{room_name}] Errore invio notifiche interattive: {e}")
@@ -1085,10 +960,25 @@ class ClimateManagerSettingsSensor(Entity):
     def __init__(self, coordinator):
         self._coordinator = coordinator
         self._attr_unique_id = f"climate_manager_{coordinator.entry_id}_settings"
+        # Snapshot immutabile degli attributi, ricostruito solo quando cambia la chiave runtime
+        self._snapshot = None
+        self._snapshot_key = None
+        self._options_version = 0
+        self._registry_version = 0
         # Registra callback per aggiornamento nome
         coordinator.register_name_change_callback(self._update_name)
         # Registra callback per aggiornamento stato finestre
         coordinator.register_window_state_callback(self._force_update)
+        # Invalida lo snapshot quando cambiano le options
+        coordinator.register_options_change_callback(self._on_options_changed)
+
+    async def async_added_to_hass(self):
+        # Rinominazioni degli switch e nuove entità notify di Alexa invalidano lo snapshot
+        self.async_on_remove(
+            async_get_dispatcher(self.hass).async_track_entity_registry_updated(self._on_registry_updated)
+        )
+        # Statistiche di consegna delle notifiche aggiornate a fine invio
+        self.async_on_remove(self._coordinator.notifier.async_add_listener(self._force_update))
 
     @property
     def name(self):
@@ -1110,60 +1000,37 @@ class ClimateManagerSettingsSensor(Entity):
         self.async_write_ha_state()
 
     def _force_update(self):
-        """Forza l'aggiornamento dello stato quando cambiano le finestre"""
+        """Forza l'aggiornamento dello stato quando cambiano le finestre (solo se gli attributi cambiano)"""
+        if self.hass is None or not self._refresh_snapshot():
+            return
         self.async_write_ha_state()
 
+    def _on_options_changed(self, changed_keys):
+        self._options_version += 1
+
+    @callback
+    def _on_registry_updated(self, event):
+        entity_id = event.data.get("entity_id") or ""
+        old_entity_id = event.data.get("old_entity_id")
+        watched = {self._find_automation_switch(), self._find_lock_settings_switch()}
+        if entity_id.startswith(("notify.", "media_player.")) or entity_id in watched or old_entity_id in watched:
+            self._registry_version += 1
+
     def _find_automation_switch(self):
-        """Trova lo switch di automazione realmente esistente per questo coordinator"""
-        try:
-            # Import del registry qui per evitare errori di importazione
-            from homeassistant.helpers import entity_registry as er
-            
-            # Ottieni l'entity registry
-            entity_registry = er.async_get(self._coordinator.hass)
-            
-            # Cerca tutte le entità di questo config entry
-            entries = er.async_entries_for_config_entry(entity_registry, self._coordinator.entry_id)
-            for entity_entry in entries:
-                if (entity_entry.domain == 'switch' and 
-                    'climate_manager_automation_enable' in entity_entry.entity_id):
-                    return entity_entry.entity_id
-                    
-        except Exception as e:
-            pass
-        
-        # Se non trova nessuno switch esistente, genera quello teorico dal nome corrente
-        name = self._coordinator.current_name or "unknown"
-        import re
-        name_slug = re.sub(r'[^\w]', '_', str(name).lower())
-        name_slug = re.sub(r'_+', '_', name_slug).strip('_')
-        return f"switch.climate_manager_automation_enable_{name_slug}"
+        """Switch di automazione di questo coordinator"""
+        switch = self._coordinator.handles.automation_switch
+        if switch is not None and switch.entity_id:
+            return switch.entity_id
+        # Se lo switch non è ancora registrato, genera quello teorico dal nome corrente
+        return f"switch.climate_manager_automation_enable_{_name_slug(self._coordinator.current_name)}"
 
     def _find_lock_settings_switch(self):
-        """Trova lo switch "Blocca Impostazioni" per questo coordinator"""
-        try:
-            # Import del registry qui per evitare errori di importazione
-            from homeassistant.helpers import entity_registry as er
-            
-            # Ottieni l'entity registry
-            entity_registry = er.async_get(self._coordinator.hass)
-            
-            # Cerca tutte le entità di questo config entry
-            entries = er.async_entries_for_config_entry(entity_registry, self._coordinator.entry_id)
-            for entity_entry in entries:
-                if (entity_entry.domain == 'switch' and 
-                    'climate_manager_lock_settings' in entity_entry.entity_id):
-                    return entity_entry.entity_id
-                    
-        except Exception as e:
-            pass
-        
-        # Se non trova nessuno switch esistente, genera quello teorico dal nome corrente
-        name = self._coordinator.current_name or "unknown"
-        import re
-        name_slug = re.sub(r'[^\w]', '_', str(name).lower())
-        name_slug = re.sub(r'_+', '_', name_slug).strip('_')
-        return f"switch.climate_manager_lock_settings_{name_slug}"
+        """Switch "Blocca Impostazioni" di questo coordinator"""
+        switch = self._coordinator.handles.lock_settings_switch
+        if switch is not None and switch.entity_id:
+            return switch.entity_id
+        # Se lo switch non è ancora registrato, genera quello teorico dal nome corrente
+        return f"switch.climate_manager_lock_settings_{_name_slug(self._coordinator.current_name)}"
 
     @property
     def state(self):
@@ -1171,6 +1038,38 @@ class ClimateManagerSettingsSensor(Entity):
 
     @property
     def extra_state_attributes(self):
+        self._refresh_snapshot()
+        return self._snapshot
+
+    def _runtime_key(self):
+        """Valori runtime riportati negli attributi: se non cambiano, lo snapshot resta valido"""
+        c = self._coordinator
+        return (
+            self._options_version,
+            self._registry_version,
+            c._window_open,
+            c._window_debouncer.flaps,
+            c.notifier.version,
+            c.window_timeout_expired,
+            c._window_timer is not None,
+            c._window_off_timer is not None,
+            c._window_on_timer is not None,
+            getattr(c, '_settings_locked', False),
+            c._get_current_temperature(),
+            getattr(c, '_timer_on_remaining', None),
+            getattr(c, '_timer_off_remaining', None),
+        )
+
+    def _refresh_snapshot(self):
+        """Ricostruisce lo snapshot solo se la chiave è cambiata. Ritorna True se è stato ricostruito"""
+        key = self._runtime_key()
+        if self._snapshot is not None and key == self._snapshot_key:
+            return False
+        self._snapshot = MappingProxyType(self._build_attributes())
+        self._snapshot_key = key
+        return True
+
+    def _build_attributes(self):
         c = self._coordinator
         opts = c.options or {}
         conf = c.config or {}
@@ -1188,7 +1087,6 @@ class ClimateManagerSettingsSensor(Entity):
         add_if_exists("climate_entity", c.climate_entity)
         
         # --- Switch associato ---
-        # Cerca lo switch effettivamente esistente per questo coordinator
         automation_switch = self._find_automation_switch()
         if automation_switch:
             attrs["automation_switch"] = automation_switch
@@ -1205,6 +1103,8 @@ class ClimateManagerSettingsSensor(Entity):
             attrs["window_sensors"] = window_sensors
             # Aggiungi lo stato del gruppo finestre (on=aperte, off=chiuse)
             attrs["window_group_state"] = "on" if c._window_open else "off"
+            # Filtro anti-rimbalzo: aperture/chiusure brevi scartate
+            attrs["window_flaps"] = c._window_debouncer.flaps
             # Aggiungi informazione sul timeout delle finestre
             attrs["window_timeout_expired"] = c.window_timeout_expired
             # Aggiungi informazioni sui timer attivi
@@ -1236,22 +1136,18 @@ class ClimateManagerSettingsSensor(Entity):
             for device in alexa_config:
                 if device.startswith('media_player.'):
                     device_name = device.replace('media_player.', '')
-                    # Controlla se esistono entità notify con i nuovi suffissi
-                    notify_speak = f"notify.{device_name}_speak"
-                    notify_announce = f"notify.{device_name}_announce"
-                    
-                    if self.hass.states.get(notify_speak):
-                        active_alexa_entities.append(notify_speak)
-                    elif self.hass.states.get(notify_announce):
-                        active_alexa_entities.append(notify_announce)
-                    else:
-                        # Sistema legacy
-                        active_alexa_entities.append(f"alexa_media_{device_name}")
+                    # Entità notify _speak/_announce risolta (e memorizzata) dal coordinator,
+                    # altrimenti sistema legacy
+                    legacy_target = f"alexa_media_{device_name}"
+                    active_alexa_entities.append(c._resolve_alexa_notify_entity(legacy_target) or legacy_target)
             
             if active_alexa_entities:
                 attrs["alexa_media"] = active_alexa_entities
         
         add_if_exists("push_targets", opts.get("push_targets") or conf.get("push_targets"))
+        # Esito delle consegne per target (inviate, fallite, timeout, latenze)
+        if c.notifier.stats:
+            attrs["notification_delivery"] = {target: dict(stats) for target, stats in c.notifier.stats.items()}
         
         # --- Modalità e impostazioni clima ---
         add_if_exists("season", opts.get("season") or conf.get("season"))
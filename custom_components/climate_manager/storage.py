@@ -0,0 +1,168 @@
+"""Persistenza di una stanza: snapshot dello stato runtime e scritture accorpate delle options."""
+import logging
+import time
+from datetime import datetime
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 5  # Secondi: più modifiche ravvicinate producono una sola scrittura su disco
+RESTORE_GRACE_SEC = 300  # Scadenze passate da più di così durante il riavvio non vengono eseguite
+OPTIONS_SAVE_DELAY = 5  # Secondi di quiete prima di scrivere le options nella config entry
+OPTIONS_MAX_DELAY = 60  # Anche con modifiche continue, le options vengono scritte almeno ogni minuto
+
+_MISSING = object()
+
+
+class RuntimeStateStore:
+    """Store per config entry: caricato una volta al setup, salvato in modo ritardato e accorpato.
+
+    ``snapshot`` è la funzione che restituisce lo stato da salvare; viene chiamata
+    solo al momento della scrittura (e alla chiusura di Home Assistant).
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, snapshot=None):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.runtime.{entry_id}")
+        self._snapshot = snapshot
+        self._closed = False
+        self.restored: dict = {}  # Ultimo snapshot letto all'avvio
+
+    async def async_load(self) -> dict:
+        try:
+            data = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning(f"Climate Manager: stato runtime non leggibile, si riparte da zero: {e}")
+            data = None
+        self.restored = data if isinstance(data, dict) else {}
+        return self.restored
+
+    @callback
+    def async_schedule_save(self):
+        """Programma una scrittura; le richieste entro SAVE_DELAY vengono unite."""
+        if self._closed or self._snapshot is None:
+            return
+        self._store.async_delay_save(self._snapshot, SAVE_DELAY)
+
+    async def async_flush(self):
+        """Scrive subito l'ultimo stato e ignora le richieste successive (scaricamento entry)."""
+        if self._closed or self._snapshot is None:
+            return
+        self._closed = True
+        try:
+            await self._store.async_save(self._snapshot())
+        except Exception as e:
+            _LOGGER.error(f"Climate Manager: errore salvataggio stato runtime: {e}")
+
+    async def async_remove(self):
+        self._closed = True
+        await self._store.async_remove()
+
+
+class OptionsWriteBuffer:
+    """Modifiche alle options di una config entry in attesa di essere scritte.
+
+    Ogni async_update_entry riscrive .storage/core.config_entries per tutte le
+    integrazioni: il coordinator applica subito le modifiche, qui vengono solo
+    accumulate e scritte con un'unica chiamata dopo OPTIONS_SAVE_DELAY secondi
+    senza nuove modifiche, allo scaricamento della entry o alla chiusura di HA.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._hass = hass
+        self._entry_id = entry_id
+        self._pending: dict = {}
+        self._base: dict = {}  # Valore nella config entry quando ogni chiave è entrata nel buffer
+        self._first_pending: float | None = None
+        self._cancel_flush = None
+
+    @property
+    def pending(self) -> dict:
+        return dict(self._pending)
+
+    def merged(self, options) -> dict:
+        """Options della config entry con sopra le modifiche non ancora scritte."""
+        return {**dict(options or {}), **self._pending}
+
+    @callback
+    def async_update(self, updates: dict) -> dict:
+        """Accoda updates e ritorna le options complete risultanti."""
+        entry = self._hass.config_entries.async_get_entry(self._entry_id)
+        if entry is None:
+            return dict(updates)
+        for key in updates:
+            if key not in self._pending:
+                self._base[key] = entry.options.get(key, _MISSING)
+        self._pending.update(updates)
+        now = time.monotonic()
+        if self._first_pending is None:
+            self._first_pending = now
+        if self._cancel_flush:
+            self._cancel_flush()
+        # Il timer riparte a ogni modifica, ma senza superare OPTIONS_MAX_DELAY dalla prima
+        delay = min(OPTIONS_SAVE_DELAY, max(0, self._first_pending + OPTIONS_MAX_DELAY - now))
+        self._cancel_flush = async_call_later(self._hass, delay, self._async_flush_later)
+        return self.merged(entry.options)
+
+    @callback
+    def async_discard_overwritten(self, options) -> set:
+        """Scarta le chiavi in attesa che una scrittura esterna (es. options flow) ha cambiato nel frattempo.
+
+        Chi ha salvato per ultimo nella config entry vince: il flush successivo
+        non deve riscrivere il valore vecchio. Ritorna le chiavi scartate.
+        """
+        options = options or {}
+        dropped = {key for key in self._pending if options.get(key, _MISSING) != self._base.get(key, _MISSING)}
+        for key in dropped:
+            self._pending.pop(key, None)
+            self._base.pop(key, None)
+        if not self._pending and self._cancel_flush:
+            self._cancel_flush()
+            self._cancel_flush = None
+            self._first_pending = None
+        return dropped
+
+    @callback
+    def _async_flush_later(self, _now=None):
+        self._cancel_flush = None
+        self.async_flush()
+
+    @callback
+    def async_flush(self, _event=None):
+        """Scrive subito le modifiche in attesa nella config entry (una sola async_update_entry)."""
+        if self._cancel_flush:
+            self._cancel_flush()
+            self._cancel_flush = None
+        self._first_pending = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._base = {}
+        entry = self._hass.config_entries.async_get_entry(self._entry_id)
+        if entry is None:
+            return
+        try:
+            self._hass.config_entries.async_update_entry(entry, options={**dict(entry.options), **pending})
+            _LOGGER.debug(f"Climate Manager: options salvate per {entry.title} ({len(pending)} chiavi)")
+        except Exception as e:
+            _LOGGER.error(f"Climate Manager: errore salvataggio options di {entry.title}: {e}")
+
+
+def deadline_to_str(deadline: datetime | None) -> str | None:
+    return deadline.isoformat() if deadline else None
+
+
+def parse_deadline(value) -> datetime | None:
+    """Scadenza salvata (ISO, UTC) oppure None se assente o non valida."""
+    if not isinstance(value, str):
+        return None
+    parsed = dt_util.parse_datetime(value)
+    if parsed is None:
+        return None
+    return dt_util.as_utc(parsed)
@@ -2,10 +2,9 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback, async_get_current_platform
 from .const import DOMAIN
 import logging
-import asyncio
 _LOGGER = logging.getLogger(__name__)
 
 SWITCH_ENTITY_ID = "switch.climate_manager_automation_enable"
@@ -152,7 +151,7 @@ class ClimateManagerTimerOnSwitch(SwitchEntity, RestoreEntity):
         # Leggi dal sensore countdown se disponibile
         timer_sensor = self._find_timer_sensor()
         if timer_sensor:
-            attrs["remaining_seconds"] = getattr(timer_sensor, '_remaining_seconds', 0)
+            attrs["remaining_seconds"] = getattr(timer_sensor, 'remaining_seconds', 0)
             attrs["countdown_state"] = getattr(timer_sensor, 'state', '00:00:00')
         
         return attrs
@@ -168,23 +167,14 @@ class ClimateManagerTimerOnSwitch(SwitchEntity, RestoreEntity):
         logger = logging.getLogger(__name__)
         logger.info(f"Timer ON switch attivato per {minutes} minuti")
         
-        # Trova e avvia il sensore countdown timer (con retry)
-        timer_sensor = None
-        for attempt in range(5):  # Prova 5 volte
-            timer_sensor = self._find_timer_sensor()
-            if timer_sensor:
-                break
-            logger.warning(f"Tentativo {attempt + 1}/5: sensore timer non trovato, riprovo...")
-            await asyncio.sleep(0.5)  # Aspetta 500ms
+        # Avvia il sensore countdown timer (registrato nel setup della piattaforma sensor)
+        timer_sensor = self._find_timer_sensor()
         
         if timer_sensor:
-            if hasattr(timer_sensor, 'start_timer'):
-                logger.info(f"Avvio timer sensor: {timer_sensor.entity_id}")
-                await timer_sensor.start_timer(minutes)
-            else:
-                logger.error(f"Sensore trovato ma senza metodo start_timer: {timer_sensor}")
+            logger.info(f"Avvio timer sensor: {timer_sensor.entity_id}")
+            await timer_sensor.start_timer(minutes)
         else:
-            logger.error("Nessun sensore timer trovato dopo 5 tentativi!")
+            logger.error("Nessun sensore timer registrato per questa configurazione!")
         
         self.async_write_ha_state()
 
@@ -208,26 +198,20 @@ class ClimateManagerTimerOnSwitch(SwitchEntity, RestoreEntity):
             
         self.async_write_ha_state()
 
+    async def async_resume(self, ends_at, total_seconds=None):
+        """Riaccende lo switch riprendendo il countdown salvato prima del riavvio"""
+        if self._is_on:
+            return
+        timer_sensor = self._find_timer_sensor()
+        if not timer_sensor:
+            return
+        self._is_on = True
+        await timer_sensor.resume_timer(ends_at, total_seconds)
+        self.async_write_ha_state()
+
     def _find_timer_sensor(self):
         """Trova il sensore countdown timer associato"""
-        try:
-            # Metodo diretto: cerca il sensore con unique_id corrispondente
-            expected_unique_id = f"climate_manager_{self._coordinator.entry_id}_timer_on_countdown"
-            
-            # Cerca nelle entità sensor salvate
-            entry_data = self._hass.data.get("climate_manager", {}).get(self._coordinator.entry_id, {})
-            entities_data = entry_data.get("entities", {})
-            sensor_entities = entities_data.get("sensor", [])
-            
-            for entity in sensor_entities:
-                if (hasattr(entity, '_attr_unique_id') and 
-                    entity._attr_unique_id == expected_unique_id):
-                    return entity
-            
-        except Exception as e:
-            import logging
-            logging.getLogger(__name__).error(f"Errore ricerca timer sensor ON: {e}")
-        return None
+        return self._coordinator.handles.timer_on_sensor
 
     async def _update_name(self):
         self.async_write_ha_state()
@@ -295,7 +279,7 @@ class ClimateManagerTimerOffSwitch(SwitchEntity, RestoreEntity):
         # Leggi dal sensore countdown se disponibile
         timer_sensor = self._find_timer_sensor()
         if timer_sensor:
-            attrs["remaining_seconds"] = getattr(timer_sensor, '_remaining_seconds', 0)
+            attrs["remaining_seconds"] = getattr(timer_sensor, 'remaining_seconds', 0)
             attrs["countdown_state"] = getattr(timer_sensor, 'state', '00:00:00')
         
         return attrs
@@ -311,23 +295,14 @@ class ClimateManagerTimerOffSwitch(SwitchEntity, RestoreEntity):
         logger = logging.getLogger(__name__)
         logger.info(f"Timer OFF switch attivato per {minutes} minuti")
         
-        # Trova e avvia il sensore countdown timer (con retry)
-        timer_sensor = None
-        for attempt in range(5):  # Prova 5 volte
-            timer_sensor = self._find_timer_sensor()
-            if timer_sensor:
-                break
-            logger.warning(f"Tentativo {attempt + 1}/5: sensore timer non trovato, riprovo...")
-            await asyncio.sleep(0.5)  # Aspetta 500ms
+        # Avvia il sensore countdown timer (registrato nel setup della piattaforma sensor)
+        timer_sensor = self._find_timer_sensor()
         
         if timer_sensor:
-            if hasattr(timer_sensor, 'start_timer'):
-                logger.info(f"Avvio timer sensor: {timer_sensor.entity_id}")
-                await timer_sensor.start_timer(minutes)
-            else:
-                logger.error(f"Sensore trovato ma senza metodo start_timer: {timer_sensor}")
+            logger.info(f"Avvio timer sensor: {timer_sensor.entity_id}")
+            await timer_sensor.start_timer(minutes)
         else:
-            logger.error("Nessun sensore timer trovato dopo 5 tentativi!")
+            logger.error("Nessun sensore timer registrato per questa configurazione!")
         
         self.async_write_ha_state()
 
@@ -351,26 +326,20 @@ class ClimateManagerTimerOffSwitch(SwitchEntity, RestoreEntity):
             
         self.async_write_ha_state()
 
+    async def async_resume(self, ends_at, total_seconds=None):
+        """Riaccende lo switch riprendendo il countdown salvato prima del riavvio"""
+        if self._is_on:
+            return
+        timer_sensor = self._find_timer_sensor()
+        if not timer_sensor:
+            return
+        self._is_on = True
+        await timer_sensor.resume_timer(ends_at, total_seconds)
+        self.async_write_ha_state()
+
     def _find_timer_sensor(self):
         """Trova il sensore countdown timer associato"""
-        try:
-            # Metodo diretto: cerca il sensore con unique_id corrispondente
-            expected_unique_id = f"climate_manager_{self._coordinator.entry_id}_timer_off_countdown"
-            
-            # Cerca nelle entità sensor salvate
-            entry_data = self._hass.data.get("climate_manager", {}).get(self._coordinator.entry_id, {})
-            entities_data = entry_data.get("entities", {})
-            sensor_entities = entities_data.get("sensor", [])
-            
-            for entity in sensor_entities:
-                if (hasattr(entity, '_attr_unique_id') and 
-                    entity._attr_unique_id == expected_unique_id):
-                    return entity
-            
-        except Exception as e:
-            import logging
-            logging.getLogger(__name__).error(f"Errore ricerca timer sensor OFF: {e}")
-        return None
+        return self._coordinator.handles.timer_off_sensor
 
     async def _update_name(self):
         self.async_write_ha_state()
@@ -435,7 +404,10 @@ class ClimateManagerLockSettingsSwitch(SwitchEntity, RestoreEntity):
         return {
             "description": "Blocca le impostazioni del clima nella configurazione corrente",
             "lock_settings_enabled": self._is_on,
-            "protected_settings": "hvac_mode, temperature, fan_mode"
+            "protected_settings": "hvac_mode, temperature, fan_mode",
+            # Quanto il dispositivo "combatte" il blocco
+            **self._coordinator.lock_stats,
+            "watchdog_interval": self._coordinator._lock_watchdog_interval,
         }
 
     async def async_turn_on(self, **kwargs):
@@ -444,6 +416,7 @@ class ClimateManagerLockSettingsSwitch(SwitchEntity, RestoreEntity):
         
         # Notifica al coordinator che le impostazioni sono bloccate
         self._coordinator._settings_locked = True
+        self._coordinator.async_runtime_changed()
         
         # Forza immediatamente le impostazioni configurate
         await self._coordinator._enforce_locked_settings()
@@ -457,6 +430,7 @@ class ClimateManagerLockSettingsSwitch(SwitchEntity, RestoreEntity):
         
         # Notifica al coordinator che le impostazioni sono sbloccate
         self._coordinator._settings_locked = False
+        self._coordinator.async_runtime_changed()
         
         # Ferma il controllo periodico
         self._coordinator._stop_lock_periodic_check()
@@ -569,19 +543,22 @@ class ClimateManagerAutoTimerSwitch(SwitchEntity, RestoreEntity):
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    handles = coordinator.handles
+    handles.automation_switch = ClimateManagerAutomationSwitch(hass, coordinator)
+    handles.timer_on_switch = ClimateManagerTimerOnSwitch(hass, coordinator)
+    handles.timer_off_switch = ClimateManagerTimerOffSwitch(hass, coordinator)
+    handles.auto_timer_switch = ClimateManagerAutoTimerSwitch(hass, coordinator)
+    handles.lock_settings_switch = ClimateManagerLockSettingsSwitch(hass, coordinator)
     switches = [
-        ClimateManagerAutomationSwitch(hass, coordinator),
-        ClimateManagerTimerOnSwitch(hass, coordinator),
-        ClimateManagerTimerOffSwitch(hass, coordinator),
-        ClimateManagerAutoTimerSwitch(hass, coordinator),
-        ClimateManagerLockSettingsSwitch(hass, coordinator)
+        handles.automation_switch,
+        handles.timer_on_switch,
+        handles.timer_off_switch,
+        handles.auto_timer_switch,
+        handles.lock_settings_switch
     ]
     
-    # Salva le entità per accesso da altre piattaforme
-    if "entities" not in hass.data[DOMAIN][entry.entry_id]:
-        hass.data[DOMAIN][entry.entry_id]["entities"] = {}
-    hass.data[DOMAIN][entry.entry_id]["entities"]["switch"] = switches
-    
-    async_add_entities(switches, True)
+    # Aggiunta attesa: la barriera di avvio del coordinator si sblocca solo a entità aggiunte
+    await async_get_current_platform().async_add_entities(switches, True)
+    coordinator.ready.async_platform_ready("switch")
 
 # In __init__.py dovrai aggiungere la piattaforma switch e istanziare questo switch passando il coordinator. 
\ No newline at end of file
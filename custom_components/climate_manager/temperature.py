@@ -0,0 +1,147 @@
+"""Lettura della temperatura ambiente dagli attributi dell'entità climate."""
+from homeassistant.core import State
+
+# Attributi possibili per la temperatura corrente, in ordine di priorità
+TEMPERATURE_ATTRIBUTES = (
+    "current_temperature",  # Standard Home Assistant
+    "current_temp",         # Alternativo comune
+    "ambient_temperature",  # Alcuni sistemi
+    "room_temperature",     # Alcuni sistemi
+    "inside_temperature",   # Alcuni sistemi
+    "temp",                 # Abbreviato (solo se non è target)
+)
+
+
+def _read_attribute(attributes, attr) -> float | None:
+    value = attributes.get(attr)
+    if value is None:
+        return None
+    try:
+        temp = float(value)
+    except (TypeError, ValueError):
+        return None
+    # Controllo di sicurezza: se l'attributo è 'temp', verifica che non sia uguale alla temperatura target
+    if attr == "temp":
+        target = attributes.get("temperature")
+        try:
+            if target is not None and abs(temp - float(target)) < 0.1:
+                return None
+        except (TypeError, ValueError):
+            pass
+    return temp
+
+
+class ClimateTemperatureResolver:
+    """Impara quale attributo espone la temperatura per un'entità climate e lo memorizza.
+
+    Dopo la prima lettura riuscita viene letto solo l'attributo noto; la scansione
+    completa avviene solo se l'attributo memorizzato manca o dopo invalidate()
+    (es. entità ri-registrata con un'altra integrazione).
+    """
+
+    def __init__(self):
+        self.attribute: str | None = None
+
+    def invalidate(self):
+        self.attribute = None
+
+    def resolve(self, state: State | None) -> float | None:
+        if state is None:
+            return None
+        attributes = state.attributes
+        if self.attribute is not None:
+            temp = _read_attribute(attributes, self.attribute)
+            if temp is not None:
+                return temp
+        for attr in TEMPERATURE_ATTRIBUTES:
+            temp = _read_attribute(attributes, attr)
+            if temp is not None:
+                self.attribute = attr
+                return temp
+        return None
+
+
+def _to_float(value, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class ThresholdEvaluator:
+    """Soglie stagionali con isteresi per sensori di temperatura ad alta frequenza.
+
+    - le soglie vengono lette una volta in configure() (al cambio options)
+    - smoothing: peso del nuovo campione nella media mobile esponenziale (0 = disattivata)
+    - min_dwell: secondi in cui la temperatura deve restare oltre soglia prima di intervenire
+    - deadband: il conteggio del dwell si azzera, e dopo uno spegnimento la soglia si
+      riarma, solo quando la temperatura rientra oltre soglia ± deadband
+    """
+
+    def __init__(self):
+        self.summer_threshold = 19.0
+        self.winter_threshold = 25.0
+        self.deadband = 0.0
+        self.min_dwell = 0.0
+        self.smoothing = 0.0
+        self.value: float | None = None
+        self._beyond_since: float | None = None
+        self._tripped = False
+        self.suppressed = 0
+
+    def configure(self, summer_threshold, winter_threshold, deadband=0, min_dwell=0, smoothing=0):
+        self.summer_threshold = _to_float(summer_threshold, 19.0)
+        self.winter_threshold = _to_float(winter_threshold, 25.0)
+        self.deadband = max(0.0, _to_float(deadband, 0.0))
+        self.min_dwell = max(0.0, _to_float(min_dwell, 0.0))
+        smoothing = _to_float(smoothing, 0.0)
+        self.smoothing = smoothing if 0.0 < smoothing < 1.0 else 0.0
+
+    def threshold_for(self, season) -> float | None:
+        if season == "summer":
+            return self.summer_threshold
+        if season == "winter":
+            return self.winter_threshold
+        return None
+
+    def is_beyond(self, season, temp, margin: float = 0.0) -> bool:
+        """True se temp è fuori soglia (estate: sotto, inverno: sopra) di almeno margin."""
+        threshold = self.threshold_for(season)
+        if threshold is None or temp is None:
+            return False
+        if season == "summer":
+            return temp < threshold + margin
+        return temp > threshold - margin
+
+    def update(self, temp: float) -> float:
+        """Aggiunge un campione e ritorna il valore (eventualmente smussato)."""
+        if self.smoothing and self.value is not None:
+            self.value += self.smoothing * (temp - self.value)
+        else:
+            self.value = temp
+        return self.value
+
+    def rearm(self):
+        """Riarma la soglia (es. clima riacceso): il prossimo sforamento può di nuovo spegnere."""
+        self._tripped = False
+        self._beyond_since = None
+
+    def evaluate(self, season, temp: float, now: float) -> float | None:
+        """Ritorna la soglia superata se il clima va spento ora, altrimenti None."""
+        value = self.update(temp)
+        if not self.is_beyond(season, value, self.deadband):
+            # Rientrata oltre la banda morta: azzera il dwell e riarma
+            self.rearm()
+            return None
+        if not self.is_beyond(season, value):
+            # Dentro la banda morta: lo stato corrente resta invariato
+            return None
+        if self._tripped:
+            self.suppressed += 1
+            return None
+        if self._beyond_since is None:
+            self._beyond_since = now
+        if now - self._beyond_since < self.min_dwell:
+            return None
+        self._tripped = True
+        return self.threshold_for(season)
@@ -0,0 +1,79 @@
+"""Timer a scadenza assoluta per Climate Manager."""
+import logging
+from datetime import datetime, timedelta
+
+from homeassistant.core import HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DeadlineTimer:
+    """Timer con scadenza assoluta (UTC) e un solo callback programmato.
+
+    Non c'è nessun tick periodico: il tempo residuo viene calcolato su richiesta
+    a partire da ``ends_at``, e allo scadere viene eseguita l'azione una sola volta.
+    """
+
+    def __init__(self, hass: HomeAssistant, action):
+        self._hass = hass
+        self._job = HassJob(action)
+        self._unsub = None
+        self.started_at: datetime | None = None
+        self.ends_at: datetime | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.ends_at is not None
+
+    @property
+    def total_seconds(self) -> float:
+        if self.started_at is None or self.ends_at is None:
+            return 0
+        return max(0.0, (self.ends_at - self.started_at).total_seconds())
+
+    def remaining(self, now: datetime | None = None) -> float:
+        """Secondi mancanti alla scadenza (0 se il timer non è attivo)."""
+        if self.ends_at is None:
+            return 0
+        now = now or dt_util.utcnow()
+        return max(0.0, (self.ends_at - now).total_seconds())
+
+    @callback
+    def start(self, seconds: float) -> None:
+        """Programma la scadenza tra ``seconds`` secondi."""
+        now = dt_util.utcnow()
+        self.start_at(now + timedelta(seconds=seconds), started_at=now)
+
+    @callback
+    def start_at(self, ends_at: datetime, started_at: datetime | None = None) -> None:
+        """Programma la scadenza a un istante assoluto (ripristino incluso)."""
+        self.cancel()
+        self.started_at = started_at or dt_util.utcnow()
+        self.ends_at = ends_at
+        self._unsub = async_track_point_in_utc_time(self._hass, self._fire, ends_at)
+
+    @callback
+    def cancel(self) -> None:
+        """Annulla la scadenza programmata."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+        self.started_at = None
+        self.ends_at = None
+
+    @callback
+    def _fire(self, now: datetime) -> None:
+        self._unsub = None
+        self.started_at = None
+        self.ends_at = None
+        self._hass.async_run_hass_job(self._job, now)
+
+
+def format_seconds(seconds: float) -> str:
+    """Formatta i secondi come HH:MM:SS."""
+    seconds = int(seconds)
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    return f"{hours:02d}:{minutes:02d}:{seconds % 60:02d}"
@@ -1,28 +1,102 @@
 """Utils."""
 
 import asyncio
+import gzip
+import hashlib
 import logging
 
 from aiohttp import web
 
+try:
+    import brotli
+except ImportError:  # brotli is optional: gzip only
+    brotli = None
+
 from homeassistant.components.frontend import add_extra_js_url
 from homeassistant.components.lovelace.resources import ResourceStorageCollection
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def register_static_path(app: web.Application, url_path: str, path):
-    """Register static path with CORS for Chromecast."""
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+
+def build_static_variants(path) -> dict:
+    """Read the file once and build its encoded variants (runs in the executor).
+
+    Returns {encoding: (body, etag)}; the strong ETag differs per encoding, as
+    each variant is a different representation of the same resource.
+    """
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    variants = {"identity": (data, f'"{digest}"')}
+    gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gzipped) < len(data):
+        variants["gzip"] = (gzipped, f'"{digest}-gzip"')
+    if brotli is not None:
+        compressed = brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+        if len(compressed) < len(data):
+            variants["br"] = (compressed, f'"{digest}-br"')
+    return variants
+
+
+def _accepted_encodings(header: str) -> set:
+    """Encodings allowed by Accept-Encoding (q=0 excluded)."""
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name)
+    return accepted
+
+
+def _select_variant(variants: dict, accept_encoding: str) -> str:
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding in variants and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
 
-    async def serve_file(request):
-        return web.FileResponse(path)
 
+async def async_register_static_path(hass: HomeAssistant, url_path: str, path, content_type: str = "application/javascript"):
+    """Register a static path with CORS for Chromecast.
+
+    Variants (identity/gzip/br) are built once here and picked by Accept-Encoding.
+    Versioned requests (?v=...) are cached as immutable; every response carries a
+    strong ETag and revalidations answer 304.
+    """
+    variants = await hass.async_add_executor_job(build_static_variants, path)
+
+    async def serve_file(request):
+        encoding = _select_variant(variants, request.headers.get("Accept-Encoding", ""))
+        body, etag = variants[encoding]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": CACHE_IMMUTABLE if request.query.get("v") else CACHE_REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("If-None-Match", "")
+        if if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+            return web.Response(status=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return web.Response(body=body, content_type=content_type, charset="utf-8", headers=headers)
+
+    app = hass.http.app
     route = app.router.add_route("GET", url_path, serve_file)
     if "allow_all_cors" in app:
         app["allow_all_cors"](route)
     elif "allow_cors" in app:
         app["allow_cors"](route)
+    sizes = ", ".join(f"{name} {len(body)} B" for name, (body, _) in variants.items())
+    _LOGGER.debug(f"Static path {url_path}: {sizes}")
 
 
 async def init_resource(hass: HomeAssistant, url: str, ver: str) -> bool:
@@ -31,15 +105,13 @@ async def init_resource(hass: HomeAssistant, url: str, ver: str) -> bool:
     random url to avoid problems with the cache. But chromecast don't support
     extra JS urls and can't load custom card."""
 
-    # possible issue with lovelace not loading prior to this component
-    for _ in range(5):  # CONST_START_LATENCY
-        try:
-            resources: ResourceStorageCollection = hass.data["lovelace"].resources
-            break
-        except AttributeError:
-            await asyncio.sleep(1)
-
-    resources: ResourceStorageCollection = hass.data["lovelace"].resources
+    # called once Home Assistant has started, so lovelace is already loaded
+    lovelace = hass.data.get("lovelace")
+    resources: ResourceStorageCollection | None = getattr(lovelace, "resources", None)
+    if resources is None:
+        # lovelace not available: extra JS url only
+        add_extra_js_url(hass, f"{url}?v={ver}")
+        return True
     # force load storage
     await resources.async_get_info()
 
@@ -70,4 +142,36 @@ async def init_resource(hass: HomeAssistant, url: str, ver: str) -> bool:
         # _LOGGER.debug(f"Add extra JS module: {url2}")
         add_extra_js_url(hass, url2)
 
-    return True 
\ No newline at end of file
+    return True 
+
+
+async def async_wait_for_state(hass: HomeAssistant, entity_id: str, predicate, timeout: float) -> bool:
+    """Attende che lo stato di entity_id soddisfi predicate, senza polling.
+
+    Controlla subito lo stato corrente, poi resta in ascolto dei soli cambi di
+    entity_id. Ritorna True alla prima corrispondenza, False allo scadere del timeout.
+    """
+    def _matches(state: State | None) -> bool:
+        try:
+            return state is not None and bool(predicate(state))
+        except Exception as e:
+            _LOGGER.debug(f"Errore nel predicato di attesa per {entity_id}: {e}")
+            return False
+
+    if _matches(hass.states.get(entity_id)):
+        return True
+
+    future = hass.loop.create_future()
+
+    @callback
+    def _state_listener(event):
+        if not future.done() and _matches(event.data.get("new_state")):
+            future.set_result(True)
+
+    unsub = async_track_state_change_event(hass, [entity_id], _state_listener)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        unsub()
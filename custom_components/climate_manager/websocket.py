@@ -0,0 +1,109 @@
+"""API websocket per la card: snapshot iniziale delle stanze e poi solo i campi cambiati."""
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+
+from .const import DOMAIN
+
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
+SIGNAL_ROOMS_CHANGED = f"{DOMAIN}_rooms_changed"
+
+
+@callback
+def async_register_websocket(hass: HomeAssistant) -> None:
+    websocket_api.async_register_command(hass, ws_subscribe)
+
+
+@callback
+def async_rooms_changed(hass: HomeAssistant) -> None:
+    """Da chiamare quando una stanza viene caricata o scaricata: gli iscritti ricevono un nuovo snapshot."""
+    async_dispatcher_send(hass, SIGNAL_ROOMS_CHANGED)
+
+
+def _coordinators(hass: HomeAssistant, entry_id: str | None = None) -> dict:
+    coordinators = {}
+    for eid, data in hass.data.get(DOMAIN, {}).items():
+        # Salta le chiavi che non sono entry_id (es. _dispatcher)
+        if isinstance(data, dict) and "coordinator" in data and entry_id in (None, eid):
+            coordinators[eid] = data["coordinator"]
+    return coordinators
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): WS_TYPE_SUBSCRIBE,
+    vol.Optional("entry_id"): str,
+})
+@callback
+def ws_subscribe(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Invia {"rooms": {entry_id: stato}} e poi {"changes": {entry_id: {campo: valore}}}.
+
+    Le modifiche avvenute nello stesso ciclo dell'event loop vengono unite in un
+    solo messaggio; i countdown viaggiano come scadenze assolute (ends_at), quindi
+    non generano traffico mentre scorrono.
+    """
+    msg_id = msg["id"]
+    entry_id = msg.get("entry_id")
+    coordinators = {}
+    last = {}
+    pending = set()
+    listener_unsubs = []
+    flush_handle = None
+
+    @callback
+    def _flush():
+        nonlocal flush_handle
+        flush_handle = None
+        changes = {}
+        for eid in pending:
+            coordinator = coordinators.get(eid)
+            if coordinator is None:
+                continue
+            state = coordinator.room_state()
+            previous = last.get(eid, {})
+            diff = {key: value for key, value in state.items() if previous.get(key) != value}
+            if diff:
+                last[eid] = state
+                changes[eid] = diff
+        pending.clear()
+        if changes:
+            connection.send_message(websocket_api.event_message(msg_id, {"changes": changes}))
+
+    def _listener(eid):
+        @callback
+        def _changed():
+            nonlocal flush_handle
+            pending.add(eid)
+            if flush_handle is None:
+                flush_handle = hass.loop.call_soon(_flush)
+
+        return _changed
+
+    @callback
+    def _subscribe_rooms():
+        """(Ri)aggancia le stanze caricate e invia lo snapshot completo."""
+        for unsub in listener_unsubs:
+            unsub()
+        listener_unsubs.clear()
+        coordinators.clear()
+        coordinators.update(_coordinators(hass, entry_id))
+        last.clear()
+        for eid, coordinator in coordinators.items():
+            last[eid] = coordinator.room_state()
+            listener_unsubs.append(coordinator.async_add_runtime_listener(_listener(eid)))
+        connection.send_message(websocket_api.event_message(msg_id, {"rooms": last}))
+
+    unsub_rooms = async_dispatcher_connect(hass, SIGNAL_ROOMS_CHANGED, _subscribe_rooms)
+
+    @callback
+    def _unsubscribe():
+        if flush_handle is not None:
+            flush_handle.cancel()
+        unsub_rooms()
+        for unsub in listener_unsubs:
+            unsub()
+
+    connection.subscriptions[msg_id] = _unsubscribe
+    connection.send_result(msg_id)
+    _subscribe_rooms()
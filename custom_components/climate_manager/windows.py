@@ -0,0 +1,150 @@
+"""Stato aggregato dei sensori finestra di una stanza."""
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_call_later
+
+INVALID_STATES = ("unknown", "unavailable")
+
+
+class WindowGroupState:
+    """Gruppo finestre aggiornato in modo incrementale.
+
+    Tiene l'ultimo stato valido di ogni sensore e il numero di sensori aperti:
+    ogni evento costa O(1) e la transizione del gruppo viene segnalata solo
+    quando il contatore passa da zero a uno o torna a zero.
+    """
+
+    def __init__(self):
+        self._last_valid: dict[str, bool] = {}
+        self._open: set[str] = set()
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._open)
+
+    @property
+    def open_count(self) -> int:
+        return len(self._open)
+
+    @property
+    def open_entities(self) -> list[str]:
+        return sorted(self._open)
+
+    @property
+    def entities(self) -> list[str]:
+        return list(self._last_valid)
+
+    def sync(self, hass: HomeAssistant, entities) -> bool:
+        """Reimposta il gruppo sulle entità indicate leggendo lo stato attuale. Ritorna is_open."""
+        previous = self._last_valid
+        # Sensore mai visto prima (o offline senza storico): assume chiuso per sicurezza
+        self._last_valid = {ent: previous.get(ent, False) for ent in entities}
+        for ent in self._last_valid:
+            state = hass.states.get(ent)
+            if state is not None and state.state not in INVALID_STATES:
+                self._last_valid[ent] = state.state == "on"
+        self._open = {ent for ent, is_open in self._last_valid.items() if is_open}
+        return self.is_open
+
+    def update(self, entity_id: str, new_state: State | None) -> bool | None:
+        """Applica il nuovo stato di un sensore.
+
+        Ritorna True/False quando il gruppo si apre/chiude, None se lo stato del gruppo non cambia.
+        """
+        if entity_id not in self._last_valid:
+            return None
+        # Sensore offline: resta valido l'ultimo stato noto
+        if new_state is None or new_state.state in INVALID_STATES:
+            return None
+        is_open = new_state.state == "on"
+        if self._last_valid[entity_id] == is_open:
+            return None
+        self._last_valid[entity_id] = is_open
+        was_open = bool(self._open)
+        if is_open:
+            self._open.add(entity_id)
+        else:
+            self._open.discard(entity_id)
+        if bool(self._open) == was_open:
+            return None
+        return not was_open
+
+    def sensor_is_open(self, entity_id: str) -> bool:
+        """Ultimo stato valido (già filtrato) di un sensore del gruppo."""
+        return self._last_valid.get(entity_id, False)
+
+
+class WindowDebouncer:
+    """Filtro tra gli eventi grezzi dei sensori e il gruppo finestre.
+
+    Un'apertura viene inoltrata solo se dura almeno min_open secondi, una chiusura
+    solo se dura almeno min_closed secondi (valori per sensore tramite overrides).
+    Se il sensore torna allo stato precedente prima della scadenza l'evento viene
+    scartato e conteggiato come flap. Con durate a 0 gli eventi passano invariati.
+    """
+
+    def __init__(self, hass: HomeAssistant, group: WindowGroupState, action):
+        self._hass = hass
+        self._group = group
+        self._job = HassJob(action)
+        self._pending: dict[str, CALLBACK_TYPE] = {}
+        self.min_open = 0.0
+        self.min_closed = 0.0
+        self.overrides: dict[str, dict] = {}
+        self.flaps = 0
+
+    def configure(self, min_open, min_closed, overrides=None):
+        self.min_open = max(0.0, float(min_open or 0))
+        self.min_closed = max(0.0, float(min_closed or 0))
+        self.overrides = overrides if isinstance(overrides, dict) else {}
+
+    def durations(self, entity_id: str) -> tuple[float, float]:
+        """(min_open, min_closed) effettivi per il sensore."""
+        override = self.overrides.get(entity_id) or {}
+        try:
+            min_open = float(override.get("min_open", self.min_open))
+            min_closed = float(override.get("min_closed", self.min_closed))
+        except (TypeError, ValueError):
+            return self.min_open, self.min_closed
+        return max(0.0, min_open), max(0.0, min_closed)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @callback
+    def async_handle(self, entity_id: str, new_state: State | None) -> bool:
+        """Filtra un evento grezzo. Ritorna True se l'evento è stato scartato come flap."""
+        # Sensore offline: il gruppo mantiene l'ultimo stato valido, il timer pendente resta
+        if new_state is None or new_state.state in INVALID_STATES:
+            return False
+        is_open = new_state.state == "on"
+        if is_open == self._group.sensor_is_open(entity_id):
+            # Ritorno allo stato già confermato: annulla la transizione in attesa
+            cancel = self._pending.pop(entity_id, None)
+            if cancel is None:
+                return False
+            cancel()
+            self.flaps += 1
+            return True
+        min_open, min_closed = self.durations(entity_id)
+        delay = min_open if is_open else min_closed
+        cancel = self._pending.pop(entity_id, None)
+        if cancel:
+            cancel()
+        if delay <= 0:
+            self._hass.async_run_hass_job(self._job, entity_id, new_state)
+            return False
+
+        @callback
+        def _confirm(_now):
+            self._pending.pop(entity_id, None)
+            self._hass.async_run_hass_job(self._job, entity_id, new_state)
+
+        self._pending[entity_id] = async_call_later(self._hass, delay, _confirm)
+        return False
+
+    @callback
+    def cancel(self):
+        for cancel in self._pending.values():
+            cancel()
+        self._pending.clear()
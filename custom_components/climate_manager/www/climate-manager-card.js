@@ -442,6 +442,12 @@ class ClimateManagerCard extends LitElement {
     
     // Gestione menu espandibili timer off settings
     this._expandedTimerOffSettings = new Set();
+
+    // Stato runtime delle stanze via websocket (climate_manager/subscribe)
+    this._rooms = {};
+    this._roomsByClimate = {};
+    this._roomsSubscription = null;
+    this._roomsUnavailable = false;
   }
 
   static getConfigElement() {
@@ -1472,18 +1478,25 @@ class ClimateManagerCard extends LitElement {
   _getContactSensorIcon(entityConfig) {
     // Trova il sensore settings associato a questa climate entity
     const climateEntity = typeof entityConfig === 'string' ? entityConfig : entityConfig.entity;
-    const settingsState = this._getSettingsStateForClimate(climateEntity);
+    const room = this._getRoomState(climateEntity);
+    let isOpen;
+    if (room) {
+      if (!room.window_sensors) return '';
+      isOpen = room.window_open;
+    } else {
+      const settingsState = this._getSettingsStateForClimate(climateEntity);
 
-    // Verifica che ci sia il sensore settings, che abbia finestre configurate e lo stato del gruppo
-    if (!settingsState ||
-        !settingsState.attributes.window_sensors ||
-        !Array.isArray(settingsState.attributes.window_sensors) ||
-        settingsState.attributes.window_sensors.length === 0 ||
-        !settingsState.attributes.window_group_state) {
-      return '';
-    }
+      // Verifica che ci sia il sensore settings, che abbia finestre configurate e lo stato del gruppo
+      if (!settingsState ||
+          !settingsState.attributes.window_sensors ||
+          !Array.isArray(settingsState.attributes.window_sensors) ||
+          settingsState.attributes.window_sensors.length === 0 ||
+          !settingsState.attributes.window_group_state) {
+        return '';
+      }
 
-    const isOpen = settingsState.attributes.window_group_state === 'on';
+      isOpen = settingsState.attributes.window_group_state === 'on';
+    }
     const icon = isOpen ? 'mdi:window-open-variant' : 'mdi:window-closed-variant';
     const title = isOpen ? 'Finestra Aperta' : 'Finestra Chiusa';
 
@@ -1503,8 +1516,97 @@ class ClimateManagerCard extends LitElement {
     return str.charAt(0).toUpperCase() + str.slice(1);
   }
 
+  // Stato runtime delle stanze: snapshot iniziale e poi solo i campi cambiati,
+  // invece di rileggere ad ogni aggiornamento gli attributi del sensore settings
+  _subscribeRooms() {
+    if (this._roomsSubscription || this._roomsUnavailable || !this.hass?.connection) return;
+    this._roomsSubscription = this.hass.connection.subscribeMessage(
+      (msg) => this._handleRoomsMessage(msg),
+      { type: 'climate_manager/subscribe' }
+    );
+    this._roomsSubscription.catch(() => {
+      // Integrazione senza API websocket: si continua a leggere hass.states
+      this._roomsUnavailable = true;
+      this._roomsSubscription = null;
+    });
+  }
+
+  _unsubscribeRooms() {
+    if (!this._roomsSubscription) return;
+    this._roomsSubscription.then((unsub) => unsub()).catch(() => {});
+    this._roomsSubscription = null;
+  }
+
+  _handleRoomsMessage(msg) {
+    if (msg.rooms) {
+      this._rooms = msg.rooms;
+    } else if (msg.changes) {
+      const rooms = { ...this._rooms };
+      for (const [entryId, diff] of Object.entries(msg.changes)) {
+        rooms[entryId] = { ...(rooms[entryId] || {}), ...diff };
+      }
+      this._rooms = rooms;
+    } else {
+      return;
+    }
+    this._roomsByClimate = {};
+    for (const room of Object.values(this._rooms)) {
+      if (room.climate_entity) this._roomsByClimate[room.climate_entity] = room;
+    }
+    this.requestUpdate();
+  }
+
+  // Stato runtime della stanza (null se la sottoscrizione non è attiva)
+  _getRoomState(climateEntity) {
+    return this._roomsByClimate[climateEntity] || null;
+  }
+
+  // Countdown calcolato lato client dalla scadenza assoluta (ends_at):
+  // i sensori countdown non scrivono più lo stato ogni secondo.
+  // runtime: timer della stanza dalla sottoscrizione websocket (null = fermo, undefined = non disponibile)
+  _getCountdown(stateObj, runtime) {
+    const attrs = runtime !== undefined
+      ? (runtime ? { is_running: true, ends_at: runtime.ends_at, total_seconds: runtime.total_seconds } : {})
+      : (stateObj?.attributes || {});
+    if (!attrs.is_running) return { active: false, time: "00:00:00", progress: 0 };
+    let remaining = attrs.remaining_seconds || 0;
+    if (attrs.ends_at) {
+      remaining = Math.max(0, Math.round((new Date(attrs.ends_at).getTime() - Date.now()) / 1000));
+    }
+    const total = attrs.total_seconds || 0;
+    const pad = (n) => String(n).padStart(2, '0');
+    const time = `${pad(Math.floor(remaining / 3600))}:${pad(Math.floor((remaining % 3600) / 60))}:${pad(remaining % 60)}`;
+    this._hasActiveCountdown = true;
+    return { active: true, time, progress: total > 0 ? Math.floor((remaining / total) * 100) : 0 };
+  }
+
+  // Aggiorna la card ogni secondo solo mentre c'è un countdown visibile
+  _syncCountdownTick() {
+    if (this._hasActiveCountdown && !this._countdownTick) {
+      this._countdownTick = setInterval(() => this.requestUpdate(), 1000);
+    } else if (!this._hasActiveCountdown && this._countdownTick) {
+      clearInterval(this._countdownTick);
+      this._countdownTick = null;
+    }
+  }
+
+  connectedCallback() {
+    super.connectedCallback();
+    this._subscribeRooms();
+  }
+
+  disconnectedCallback() {
+    super.disconnectedCallback();
+    this._unsubscribeRooms();
+    if (this._countdownTick) {
+      clearInterval(this._countdownTick);
+      this._countdownTick = null;
+    }
+  }
+
   render() {
     if (!this.config || !this.hass) return html``;
+    this._hasActiveCountdown = false;
 
     // Fix: controllo che ci siano entità configurate
     if (!this.entities || this.entities.length === 0) {
@@ -1969,12 +2071,15 @@ class ClimateManagerCard extends LitElement {
                   
                   const timerOnMinutes = this._getOptimisticTimerOnMinutes(entityId, settings?.attributes?.timer_on_minutes);
                   const timerOffMinutes = this._getOptimisticTimerOffMinutes(entityId, settings?.attributes?.timer_off_minutes);
-                  const timerOnActive = timerOnCountdown?.attributes?.is_running || false;
-                  const timerOffActive = timerOffCountdown?.attributes?.is_running || false;
-                  const timerOnCountdownTime = timerOnCountdown?.state || "00:00:00";
-                  const timerOffCountdownTime = timerOffCountdown?.state || "00:00:00";
-                  const timerOnProgress = timerOnCountdown?.attributes?.progress_percent || 0;
-                  const timerOffProgress = timerOffCountdown?.attributes?.progress_percent || 0;
+                  const room = this._getRoomState(entityId);
+                  const timerOnInfo = this._getCountdown(timerOnCountdown, room ? room.timer_on : undefined);
+                  const timerOffInfo = this._getCountdown(timerOffCountdown, room ? room.timer_off : undefined);
+                  const timerOnActive = timerOnInfo.active;
+                  const timerOffActive = timerOffInfo.active;
+                  const timerOnCountdownTime = timerOnInfo.time;
+                  const timerOffCountdownTime = timerOffInfo.time;
+                  const timerOnProgress = timerOnInfo.progress;
+                  const timerOffProgress = timerOffInfo.progress;
 
                   return html`
                     <div class="timer-section">
@@ -2782,6 +2887,8 @@ class ClimateManagerCard extends LitElement {
 
   updated(changedProps) {
     super.updated(changedProps);
+    this._syncCountdownTick();
+    this._subscribeRooms();
 
     // Set theme attribute on host element
     if (changedProps.has('_theme') || changedProps.has('config')) {
@@ -0,0 +1 @@
+"""Test e benchmark per Climate Manager."""
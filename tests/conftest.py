@@ -0,0 +1,262 @@
+"""Fixture condivise: dispositivi clima simulati, stanze Climate Manager e raccolta metriche."""
+import os
+import resource
+import statistics
+import time
+import tracemalloc
+
+import pytest
+
+try:
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    from custom_components.climate_manager.const import DOMAIN
+except ImportError:  # Home Assistant non installato: i moduli di test vengono saltati con importorskip
+    MockConfigEntry = None
+    DOMAIN = "climate_manager"
+
+HVAC_MODES = ["off", "cool", "heat", "fan_only", "dry", "auto"]
+FAN_MODES = ["auto", "low", "medium", "high"]
+
+# Risultati raccolti durante la sessione, stampati a fine run da pytest_terminal_summary
+BENCH_RESULTS = []
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Abilita il caricamento di custom_components/ in tutti i test."""
+    yield
+
+
+def _rss_bytes():
+    """Memoria residente del processo (Linux: /proc, altrimenti picco da getrusage)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class FakeClimateFleet:
+    """Simula i condizionatori: i servizi climate.* aggiornano subito stato e sensore di potenza."""
+
+    def __init__(self, hass):
+        self.hass = hass
+        self.service_calls = 0
+        self.calls_by_service = {}
+        self._power_sensors = {}
+
+    def add_device(self, climate_id, power_id=None, hvac="cool", temperature=24, fan_mode="auto"):
+        self._power_sensors[climate_id] = power_id
+        self.hass.states.async_set(climate_id, hvac, self._attributes(temperature, fan_mode))
+        if power_id:
+            self.hass.states.async_set(power_id, "off" if hvac == "off" else "on")
+
+    @staticmethod
+    def _attributes(temperature, fan_mode, **extra):
+        return {
+            "hvac_modes": HVAC_MODES,
+            "fan_modes": FAN_MODES,
+            "min_temp": 16,
+            "max_temp": 32,
+            "temperature": temperature,
+            "fan_mode": fan_mode,
+            **extra,
+        }
+
+    def remote_set(self, climate_id, hvac=None, temperature=None, fan_mode=None):
+        """Cambio dal telecomando: lo stato arriva dal dispositivo, non da un servizio."""
+        state = self.hass.states.get(climate_id)
+        attrs = dict(state.attributes)
+        if temperature is not None:
+            attrs["temperature"] = temperature
+        if fan_mode is not None:
+            attrs["fan_mode"] = fan_mode
+        new_hvac = hvac or state.state
+        self.hass.states.async_set(climate_id, new_hvac, attrs)
+        power_id = self._power_sensors.get(climate_id)
+        if power_id:
+            self.hass.states.async_set(power_id, "off" if new_hvac == "off" else "on")
+
+    def register_services(self):
+        for service in ("turn_off", "turn_on", "set_hvac_mode", "set_temperature", "set_fan_mode", "set_preset_mode"):
+            self.hass.services.async_register("climate", service, self._handle_call)
+
+    async def _handle_call(self, call):
+        self.service_calls += 1
+        self.calls_by_service[call.service] = self.calls_by_service.get(call.service, 0) + 1
+        entity_ids = call.data.get("entity_id")
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        for climate_id in entity_ids or []:
+            if call.service == "turn_off":
+                self.remote_set(climate_id, hvac="off")
+            elif call.service == "turn_on":
+                self.remote_set(climate_id, hvac="cool")
+            elif call.service == "set_hvac_mode":
+                self.remote_set(climate_id, hvac=call.data["hvac_mode"])
+            elif call.service == "set_temperature":
+                self.remote_set(climate_id, temperature=call.data["temperature"])
+            elif call.service == "set_fan_mode":
+                self.remote_set(climate_id, fan_mode=call.data["fan_mode"])
+
+
+class Room:
+    """Una stanza di benchmark: config entry, clima simulato, finestre, sensori."""
+
+    def __init__(self, index, windows_per_room):
+        self.index = index
+        self.name = f"Bench Room {index}"
+        self.climate = f"climate.bench_room_{index}"
+        self.windows = [f"binary_sensor.bench_window_{index}_{w}" for w in range(windows_per_room)]
+        self.temperature_sensor = f"sensor.bench_temperature_{index}"
+        self.power_sensor = f"binary_sensor.bench_power_{index}"
+        self.entry = None
+
+    def coordinator(self, hass):
+        return hass.data[DOMAIN][self.entry.entry_id]["coordinator"]
+
+    def entry_data(self):
+        return {
+            "name": self.name,
+            "room_name": self.name,
+            "climate_entity": self.climate,
+            "window_sensors": self.windows,
+            "temperature_sensor": self.temperature_sensor,
+            "climate_power_sensor": self.power_sensor,
+            "season": "summer",
+            "timeout": 15,
+            "delay_before_off": 5,
+            "delay_before_on": 10,
+            "hvac_mode_summer": "cool",
+            "hvac_mode_winter": "heat",
+            "fan_mode_summer": "auto",
+            "fan_mode_winter": "auto",
+            "temperature_summer": 24,
+            "temperature_winter": 21,
+            "summer_temp_threshold": 19,
+            "winter_temp_threshold": 25,
+            "alexa_media": [],
+            "push_targets": "",
+            "messages": {},
+            "command_min_interval": 0,
+        }
+
+
+class BenchMetrics:
+    """Contatori di una misura: latenze per evento, chiamate di servizio, scritture di stato, memoria."""
+
+    def __init__(self, fleet):
+        self.fleet = fleet
+        self.latencies = []
+        self.state_writes = 0
+        self._started = None
+        self._calls_at_start = 0
+        self._writes_at_start = 0
+        self.elapsed = 0.0
+        self.service_calls = 0
+        self.writes = 0
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._calls_at_start = self.fleet.service_calls
+        self._writes_at_start = self.state_writes
+        self.latencies = []
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self._started
+        self.service_calls = self.fleet.service_calls - self._calls_at_start
+        self.writes = self.state_writes - self._writes_at_start
+
+    def percentile(self, p):
+        if not self.latencies:
+            return 0.0
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+    def report(self, scenario, rooms, **extra):
+        row = {
+            "scenario": scenario,
+            "rooms": rooms,
+            "events": len(self.latencies),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "service_calls": self.service_calls,
+            "state_writes": self.writes,
+            "writes_per_s": round(self.writes / self.elapsed, 1) if self.elapsed else 0.0,
+            **extra,
+        }
+        BENCH_RESULTS.append(row)
+        return row
+
+
+@pytest.fixture
+def fleet(hass):
+    fleet = FakeClimateFleet(hass)
+    fleet.register_services()
+    return fleet
+
+
+@pytest.fixture
+def metrics(fleet, monkeypatch):
+    """Conta ogni async_write_ha_state (anche quelle che non cambiano lo stato)."""
+    from homeassistant.helpers.entity import Entity
+
+    bench = BenchMetrics(fleet)
+    original = Entity.async_write_ha_state
+
+    def counting_write(entity, *args, **kwargs):
+        bench.state_writes += 1
+        return original(entity, *args, **kwargs)
+
+    monkeypatch.setattr(Entity, "async_write_ha_state", counting_write)
+    return bench
+
+
+@pytest.fixture
+def setup_rooms(hass, fleet):
+    """Crea N stanze complete (config entry + piattaforme) e misura la memoria per stanza."""
+
+    async def _setup(count, windows_per_room=2):
+        rooms = [Room(i, windows_per_room) for i in range(count)]
+        for room in rooms:
+            fleet.add_device(room.climate, room.power_sensor)
+            hass.states.async_set(room.temperature_sensor, "26", {"unit_of_measurement": "°C"})
+            for window in room.windows:
+                hass.states.async_set(window, "off")
+        await hass.async_block_till_done()
+
+        tracemalloc.start()
+        heap_before = tracemalloc.get_traced_memory()[0]
+        rss_before = _rss_bytes()
+        for room in rooms:
+            room.entry = MockConfigEntry(domain=DOMAIN, title=room.name, data=room.entry_data(), options={})
+            room.entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(room.entry.entry_id)
+        await hass.async_block_till_done()
+        heap_after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        rss_after = _rss_bytes()
+
+        memory = {
+            "heap_kb_per_room": round((heap_after - heap_before) / 1024 / count, 1),
+            "rss_kb_per_room": round(max(0, rss_after - rss_before) / 1024 / count, 1),
+        }
+        return rooms, memory
+
+    return _setup
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not BENCH_RESULTS:
+        return
+    columns = [
+        "scenario", "rooms", "events", "p50_ms", "p95_ms", "p99_ms",
+        "service_calls", "state_writes", "writes_per_s", "heap_kb_per_room", "rss_kb_per_room",
+    ]
+    terminalreporter.section("Climate Manager benchmark")
+    terminalreporter.write_line(" | ".join(columns))
+    for row in BENCH_RESULTS:
+        terminalreporter.write_line(" | ".join(str(row.get(column, "")) for column in columns))
@@ -0,0 +1,161 @@
+"""Benchmark e soak test di ClimateManagerCoordinator con N stanze simulate.
+
+Ogni scenario riproduce una raffica di eventi e registra latenza per evento
+(p50/p95/p99), chiamate di servizio al clima, scritture di stato al secondo e
+memoria per stanza. La tabella riassuntiva viene stampata a fine sessione.
+
+    pytest -m benchmark            # 1, 10, 100 stanze
+    pytest -m soak                 # 500 stanze e scenario lungo
+"""
+import inspect
+import time
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+ROOM_COUNTS = [
+    pytest.param(1, marks=pytest.mark.benchmark),
+    pytest.param(10, marks=pytest.mark.benchmark),
+    pytest.param(100, marks=pytest.mark.benchmark),
+    pytest.param(500, marks=[pytest.mark.benchmark, pytest.mark.soak]),
+]
+
+
+async def _timed(hass, metrics, action):
+    """Esegue un evento e misura il tempo fino al completamento di tutti gli handler."""
+    started = time.perf_counter()
+    result = action()
+    if inspect.isawaitable(result):
+        await result
+    await hass.async_block_till_done()
+    metrics.latencies.append(time.perf_counter() - started)
+
+
+async def _advance(hass, seconds):
+    """Fa scattare timer e ritardi programmati (delay_before_off/on, ripristini)."""
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=seconds))
+    await hass.async_block_till_done()
+
+
+def _listener_count(hass):
+    return sum(hass.bus.async_listeners().values())
+
+
+@pytest.mark.parametrize("rooms_count", ROOM_COUNTS)
+async def test_window_flapping(hass, fleet, metrics, setup_rooms, rooms_count):
+    """Finestre che si aprono e chiudono ripetutamente in tutte le stanze."""
+    rooms, memory = await setup_rooms(rooms_count)
+    await _advance(hass, 10)
+
+    metrics.start()
+    for _ in range(5):
+        for room in rooms:
+            await _timed(hass, metrics, lambda w=room.windows[0]: hass.states.async_set(w, "on"))
+        for room in rooms:
+            await _timed(hass, metrics, lambda w=room.windows[0]: hass.states.async_set(w, "off"))
+    metrics.stop()
+
+    metrics.report("window_flapping", rooms_count, **memory)
+    # Ogni apertura si richiude prima di delay_before_off: nessuno spegnimento, anche a timer scaduti
+    await _advance(hass, 30)
+    assert fleet.calls_by_service.get("turn_off", 0) == 0
+    for room in rooms:
+        assert hass.states.get(room.climate).state == "cool"
+
+
+@pytest.mark.parametrize("rooms_count", ROOM_COUNTS)
+async def test_window_open_turns_climate_off(hass, fleet, metrics, setup_rooms, rooms_count):
+    """Finestra aperta oltre delay_before_off: ogni clima viene spento con un solo comando."""
+    rooms, memory = await setup_rooms(rooms_count)
+    await _advance(hass, 10)
+
+    metrics.start()
+    for room in rooms:
+        await _timed(hass, metrics, lambda w=room.windows[0]: hass.states.async_set(w, "on"))
+    await _advance(hass, 10)
+    metrics.stop()
+
+    metrics.report("window_open_off", rooms_count, **memory)
+    for room in rooms:
+        assert hass.states.get(room.climate).state == "off"
+    assert fleet.calls_by_service.get("turn_off", 0) >= rooms_count
+
+
+@pytest.mark.parametrize("rooms_count", ROOM_COUNTS)
+async def test_remote_control_toggles(hass, fleet, metrics, setup_rooms, rooms_count):
+    """Cambi dal telecomando: temperatura, ventola e accensione/spegnimento."""
+    rooms, memory = await setup_rooms(rooms_count)
+    await _advance(hass, 10)
+
+    metrics.start()
+    for _ in range(3):
+        for room in rooms:
+            await _timed(hass, metrics, lambda c=room.climate: fleet.remote_set(c, hvac="off"))
+            await _timed(hass, metrics, lambda c=room.climate: fleet.remote_set(c, hvac="cool"))
+    # L'accensione manuale applica le impostazioni stagionali: si attende che siano state inviate
+    await _advance(hass, 30)
+    calls_before_settings = fleet.service_calls
+    for step in range(3):
+        for room in rooms:
+            await _timed(hass, metrics, lambda c=room.climate, t=25 + step: fleet.remote_set(c, temperature=t))
+            await _timed(hass, metrics, lambda c=room.climate: fleet.remote_set(c, fan_mode="high"))
+    await _advance(hass, 10)
+    metrics.stop()
+
+    metrics.report("remote_toggles", rooms_count, **memory)
+    # Temperatura e ventola cambiate dal telecomando non vengono rimandate al dispositivo né annullate
+    assert fleet.service_calls == calls_before_settings
+    for room in rooms:
+        state = hass.states.get(room.climate)
+        assert state.state == "cool"
+        assert state.attributes["temperature"] == 27
+        assert state.attributes["fan_mode"] == "high"
+
+
+@pytest.mark.parametrize("rooms_count", ROOM_COUNTS)
+async def test_option_edits(hass, fleet, metrics, setup_rooms, rooms_count):
+    """Modifiche delle opzioni applicate sul posto (senza reload dell'entry)."""
+    rooms, memory = await setup_rooms(rooms_count)
+    await _advance(hass, 10)
+
+    metrics.start()
+    for step in range(3):
+        for room in rooms:
+            options = {**room.entry_data(), "temperature_summer": 25 + step, "fan_mode_summer": "low"}
+            await _timed(
+                hass, metrics,
+                lambda e=room.entry, o=options: hass.config_entries.async_update_entry(e, options=o),
+            )
+    metrics.stop()
+
+    metrics.report("option_edits", rooms_count, **memory)
+    for room in rooms:
+        coordinator = room.coordinator(hass)
+        assert coordinator.get_option("temperature_summer") == 27
+        assert coordinator.get_option("fan_mode_summer") == "low"
+
+
+@pytest.mark.soak
+@pytest.mark.parametrize("rooms_count", [pytest.param(100, marks=pytest.mark.benchmark)])
+async def test_soak_mixed_storm(hass, fleet, metrics, setup_rooms, rooms_count):
+    """Raffiche miste ripetute: nessuna crescita di listener tra un giro e l'altro."""
+    rooms, memory = await setup_rooms(rooms_count)
+    await _advance(hass, 10)
+    listeners_baseline = _listener_count(hass)
+
+    metrics.start()
+    for round_index in range(20):
+        for room in rooms:
+            await _timed(hass, metrics, lambda w=room.windows[round_index % len(room.windows)]: hass.states.async_set(w, "on"))
+            await _timed(hass, metrics, lambda c=room.climate, t=22 + round_index % 3: fleet.remote_set(c, temperature=t))
+            await _timed(hass, metrics, lambda w=room.windows[round_index % len(room.windows)]: hass.states.async_set(w, "off"))
+        await _advance(hass, 30)
+    metrics.stop()
+
+    metrics.report("soak_mixed", rooms_count, **memory)
+    assert _listener_count(hass) == listeners_baseline
@@ -0,0 +1,113 @@
+"""OptionsWriteBuffer: scritture delle options accorpate, limite massimo di attesa e flush allo scaricamento."""
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.climate_manager.const import DOMAIN
+from custom_components.climate_manager.storage import OPTIONS_MAX_DELAY, OPTIONS_SAVE_DELAY, OptionsWriteBuffer
+
+
+@pytest.fixture
+def entry(hass):
+    entry = MockConfigEntry(domain=DOMAIN, title="Soggiorno", data={}, options={"season": "auto", "timeout": 15})
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def writes(hass, monkeypatch):
+    """Options passate a ogni async_update_entry."""
+    calls = []
+    original = hass.config_entries.async_update_entry
+
+    def counting_update(entry, **kwargs):
+        if "options" in kwargs:
+            calls.append(dict(kwargs["options"]))
+        return original(entry, **kwargs)
+
+    monkeypatch.setattr(hass.config_entries, "async_update_entry", counting_update)
+    return calls
+
+
+async def _advance(hass, freezer, seconds):
+    freezer.tick(timedelta(seconds=seconds))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_updates_coalesced_into_one_write(hass, freezer, entry, writes):
+    buffer = OptionsWriteBuffer(hass, entry.entry_id)
+
+    merged = buffer.async_update({"season": "summer"})
+    assert merged == {"season": "summer", "timeout": 15}
+    buffer.async_update({"timeout": 20})
+    buffer.async_update({"season": "winter"})
+    assert entry.options["season"] == "auto"
+
+    await _advance(hass, freezer, OPTIONS_SAVE_DELAY + 1)
+    assert writes == [{"season": "winter", "timeout": 20}]
+    assert entry.options == {"season": "winter", "timeout": 20}
+    assert buffer.pending == {}
+
+
+async def test_quiet_period_restarts_on_each_update(hass, freezer, entry, writes):
+    buffer = OptionsWriteBuffer(hass, entry.entry_id)
+
+    buffer.async_update({"timeout": 16})
+    await _advance(hass, freezer, OPTIONS_SAVE_DELAY - 1)
+    buffer.async_update({"timeout": 17})
+    await _advance(hass, freezer, OPTIONS_SAVE_DELAY - 1)
+    assert writes == []
+
+    await _advance(hass, freezer, 2)
+    assert writes == [{"season": "auto", "timeout": 17}]
+
+
+async def test_continuous_updates_capped_by_max_delay(hass, freezer, entry, writes):
+    buffer = OptionsWriteBuffer(hass, entry.entry_id)
+    step = OPTIONS_SAVE_DELAY - 1
+    elapsed = 0
+    value = 0
+
+    while elapsed + step < OPTIONS_MAX_DELAY:
+        value += 1
+        buffer.async_update({"timeout": value})
+        await _advance(hass, freezer, step)
+        elapsed += step
+    assert writes == []
+
+    value += 1
+    buffer.async_update({"timeout": value})
+    await _advance(hass, freezer, OPTIONS_MAX_DELAY - elapsed)
+    assert len(writes) == 1
+    assert entry.options["timeout"] == value
+
+
+async def test_flush_on_unload_writes_now_and_cancels_timer(hass, freezer, entry, writes):
+    buffer = OptionsWriteBuffer(hass, entry.entry_id)
+
+    buffer.async_update({"season": "summer"})
+    buffer.async_flush()
+    assert writes == [{"season": "summer", "timeout": 15}]
+
+    buffer.async_flush()
+    await _advance(hass, freezer, OPTIONS_MAX_DELAY)
+    assert len(writes) == 1
+
+
+async def test_external_save_wins_over_pending_key(hass, freezer, entry, writes):
+    buffer = OptionsWriteBuffer(hass, entry.entry_id)
+
+    buffer.async_update({"season": "summer", "timeout": 30})
+    # Salvataggio dall'options flow mentre le modifiche sono ancora in attesa
+    hass.config_entries.async_update_entry(entry, options={"season": "winter", "timeout": 15})
+
+    assert buffer.async_discard_overwritten(entry.options) == {"season"}
+    assert buffer.pending == {"timeout": 30}
+
+    await _advance(hass, freezer, OPTIONS_SAVE_DELAY + 1)
+    assert entry.options == {"season": "winter", "timeout": 30}
@@ -0,0 +1,76 @@
+"""ThresholdEvaluator: banda morta, permanenza minima oltre soglia e riarmo dopo lo spegnimento."""
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from custom_components.climate_manager.temperature import ThresholdEvaluator
+
+
+def _evaluator(deadband=0, min_dwell=0, smoothing=0):
+    evaluator = ThresholdEvaluator()
+    evaluator.configure(summer_threshold=19, winter_threshold=25, deadband=deadband, min_dwell=min_dwell, smoothing=smoothing)
+    return evaluator
+
+
+def test_trips_in_season_direction():
+    winter = _evaluator()
+    assert winter.evaluate("winter", 24.9, 0) is None
+    assert winter.evaluate("winter", 25.5, 1) == 25.0
+
+    summer = _evaluator()
+    assert summer.evaluate("summer", 19.5, 0) is None
+    assert summer.evaluate("summer", 18.5, 1) == 19.0
+
+
+def test_deadband_rearms_only_beyond_band():
+    evaluator = _evaluator(deadband=1)
+    assert evaluator.evaluate("winter", 25.5, 0) == 25.0
+
+    # Dentro la banda morta (24 < t <= 25): nessun riarmo
+    assert evaluator.evaluate("winter", 24.5, 1) is None
+    assert evaluator.evaluate("winter", 25.6, 2) is None
+    assert evaluator.suppressed == 1
+
+    # Rientrata oltre la banda: la soglia si riarma
+    assert evaluator.evaluate("winter", 23.9, 3) is None
+    assert evaluator.evaluate("winter", 25.5, 4) == 25.0
+
+
+def test_min_dwell_delays_trip():
+    evaluator = _evaluator(min_dwell=60)
+    assert evaluator.evaluate("winter", 26, 0) is None
+    assert evaluator.evaluate("winter", 26, 59) is None
+    assert evaluator.evaluate("winter", 26, 60) == 25.0
+
+
+def test_dwell_resets_when_back_in_range():
+    evaluator = _evaluator(min_dwell=60)
+    assert evaluator.evaluate("winter", 26, 0) is None
+    assert evaluator.evaluate("winter", 24, 30) is None
+    assert evaluator.evaluate("winter", 26, 40) is None
+    assert evaluator.evaluate("winter", 26, 90) is None
+    assert evaluator.evaluate("winter", 26, 100) == 25.0
+
+
+def test_dwell_survives_samples_inside_deadband():
+    evaluator = _evaluator(deadband=1, min_dwell=60)
+    assert evaluator.evaluate("winter", 26, 0) is None
+    assert evaluator.evaluate("winter", 24.5, 30) is None
+    assert evaluator.evaluate("winter", 26, 60) == 25.0
+
+
+def test_explicit_rearm_allows_next_trip():
+    evaluator = _evaluator(deadband=1)
+    assert evaluator.evaluate("winter", 26, 0) == 25.0
+    assert evaluator.evaluate("winter", 26, 1) is None
+
+    evaluator.rearm()
+    assert evaluator.evaluate("winter", 26, 2) == 25.0
+
+
+def test_smoothing_filters_single_spike():
+    evaluator = _evaluator(smoothing=0.2)
+    assert evaluator.evaluate("winter", 24, 0) is None
+    # Picco isolato: la media mobile resta sotto soglia
+    assert evaluator.evaluate("winter", 28, 1) is None
+    assert evaluator.value == pytest.approx(24.8)
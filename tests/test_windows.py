@@ -0,0 +1,111 @@
+"""WindowDebouncer: aperture/chiusure confermate solo dopo la durata minima, flap scartati."""
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.core import State, callback
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.climate_manager.windows import WindowDebouncer, WindowGroupState
+
+WINDOW = "binary_sensor.finestra_test"
+OTHER = "binary_sensor.porta_test"
+
+
+@pytest.fixture
+def debouncer(hass):
+    """Debouncer con gruppo sincronizzato su due sensori chiusi; le conferme aggiornano il gruppo."""
+    hass.states.async_set(WINDOW, "off")
+    hass.states.async_set(OTHER, "off")
+    group = WindowGroupState()
+    group.sync(hass, [WINDOW, OTHER])
+    confirmed = []
+
+    @callback
+    def _apply(entity_id, new_state):
+        confirmed.append((entity_id, new_state.state))
+        group.update(entity_id, new_state)
+
+    debouncer = WindowDebouncer(hass, group, _apply)
+    debouncer.confirmed = confirmed
+    debouncer.group = group
+    return debouncer
+
+
+async def _advance(hass, freezer, seconds):
+    freezer.tick(timedelta(seconds=seconds))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_zero_durations_pass_through(hass, debouncer):
+    assert debouncer.async_handle(WINDOW, State(WINDOW, "on")) is False
+    assert debouncer.confirmed == [(WINDOW, "on")]
+    assert debouncer.pending_count == 0
+
+
+async def test_open_confirmed_after_min_open(hass, freezer, debouncer):
+    debouncer.configure(min_open=5, min_closed=0)
+
+    debouncer.async_handle(WINDOW, State(WINDOW, "on"))
+    assert debouncer.pending_count == 1
+    await _advance(hass, freezer, 4)
+    assert debouncer.confirmed == []
+
+    await _advance(hass, freezer, 2)
+    assert debouncer.confirmed == [(WINDOW, "on")]
+    assert debouncer.pending_count == 0
+    assert debouncer.group.is_open
+
+
+async def test_flap_is_discarded_and_counted(hass, freezer, debouncer):
+    debouncer.configure(min_open=5, min_closed=0)
+
+    debouncer.async_handle(WINDOW, State(WINDOW, "on"))
+    assert debouncer.async_handle(WINDOW, State(WINDOW, "off")) is True
+    assert debouncer.flaps == 1
+    assert debouncer.pending_count == 0
+
+    await _advance(hass, freezer, 10)
+    assert debouncer.confirmed == []
+    assert not debouncer.group.is_open
+
+
+async def test_close_flap_keeps_window_open(hass, freezer, debouncer):
+    debouncer.configure(min_open=0, min_closed=30)
+    debouncer.async_handle(WINDOW, State(WINDOW, "on"))
+    assert debouncer.group.is_open
+
+    debouncer.async_handle(WINDOW, State(WINDOW, "off"))
+    await _advance(hass, freezer, 10)
+    assert debouncer.async_handle(WINDOW, State(WINDOW, "on")) is True
+
+    await _advance(hass, freezer, 60)
+    assert debouncer.confirmed == [(WINDOW, "on")]
+    assert debouncer.group.is_open
+
+
+async def test_unavailable_keeps_pending_transition(hass, freezer, debouncer):
+    debouncer.configure(min_open=5, min_closed=0)
+
+    debouncer.async_handle(WINDOW, State(WINDOW, "on"))
+    assert debouncer.async_handle(WINDOW, State(WINDOW, "unavailable")) is False
+    assert debouncer.pending_count == 1
+
+    await _advance(hass, freezer, 6)
+    assert debouncer.confirmed == [(WINDOW, "on")]
+
+
+async def test_per_sensor_override(hass, freezer, debouncer):
+    debouncer.configure(min_open=30, min_closed=0, overrides={OTHER: {"min_open": 0}})
+
+    debouncer.async_handle(OTHER, State(OTHER, "on"))
+    debouncer.async_handle(WINDOW, State(WINDOW, "on"))
+    assert debouncer.confirmed == [(OTHER, "on")]
+    assert debouncer.pending_count == 1
+
+    debouncer.cancel()
+    await _advance(hass, freezer, 60)
+    assert debouncer.confirmed == [(OTHER, "on")]